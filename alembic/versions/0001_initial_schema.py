@@ -0,0 +1,135 @@
+"""initial schema
+
+已有数据库（由 create_all 建表）请先执行 `alembic stamp 0001` 再升级。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'parrots',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('breed', sa.String(100), nullable=False, comment='品种'),
+        sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=True, comment='价格'),
+        sa.Column('min_price', sa.Numeric(precision=10, scale=2), nullable=True, comment='最低价格'),
+        sa.Column('max_price', sa.Numeric(precision=10, scale=2), nullable=True, comment='最高价格'),
+        sa.Column('gender', sa.String(10), nullable=False, comment='公母'),
+        sa.Column('birth_date', sa.Date(), nullable=True, comment='出生日期'),
+        sa.Column('ring_number', sa.String(100), unique=True, nullable=True, comment='圈号'),
+        sa.Column('status', sa.String(20), nullable=False, comment='状态: available/sold/returned/breeding'),
+        sa.Column('health_notes', sa.Text(), nullable=True, comment='健康备注'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('sold_at', sa.DateTime(), nullable=True, comment='销售时间'),
+        sa.Column('returned_at', sa.DateTime(), nullable=True, comment='退货时间'),
+        sa.Column('return_reason', sa.String(500), nullable=True, comment='退货原因'),
+        sa.Column('mate_id', sa.Integer(), sa.ForeignKey('parrots.id'), nullable=True, comment='配偶ID'),
+        sa.Column('paired_at', sa.DateTime(), nullable=True, comment='配对时间'),
+        sa.Column('seller', sa.String(100), nullable=True, comment='售卖人'),
+        sa.Column('buyer_name', sa.String(100), nullable=True, comment='购买者姓名'),
+        sa.Column('sale_price', sa.Numeric(precision=10, scale=2), nullable=True, comment='实际销售价格'),
+        sa.Column('contact', sa.String(100), nullable=True, comment='联系方式（微信号或电话）'),
+        sa.Column('follow_up_status', sa.String(20), nullable=True, comment='回访状态: pending/completed/no_contact'),
+        sa.Column('sale_notes', sa.Text(), nullable=True, comment='销售备注'),
+    )
+    op.create_index('ix_parrots_id', 'parrots', ['id'])
+    op.create_index('ix_parrots_breed', 'parrots', ['breed'])
+    op.create_index('ix_parrots_status', 'parrots', ['status'])
+    op.create_index('ix_parrots_sold_at', 'parrots', ['sold_at'])
+
+    op.create_table(
+        'photos',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('parrot_id', sa.Integer(), sa.ForeignKey('parrots.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('file_path', sa.String(500), nullable=False, comment='文件存储路径'),
+        sa.Column('file_name', sa.String(255), nullable=False, comment='原始文件名'),
+        sa.Column('file_type', sa.String(20), nullable=False, comment='文件类型: image/video'),
+        sa.Column('sort_order', sa.Integer(), nullable=False, comment='排序权重'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_photos_id', 'photos', ['id'])
+    op.create_index('ix_photos_parrot_id', 'photos', ['parrot_id'])
+
+    op.create_table(
+        'follow_ups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('parrot_id', sa.Integer(), sa.ForeignKey('parrots.id'), nullable=False, comment='鹦鹉ID'),
+        sa.Column('follow_up_date', sa.DateTime(), nullable=False, comment='回访日期'),
+        sa.Column('follow_up_status', sa.String(20), nullable=False, comment='回访状态: pending/completed/no_contact'),
+        sa.Column('notes', sa.Text(), nullable=True, comment='回访备注'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_follow_ups_id', 'follow_ups', ['id'])
+
+    op.create_table(
+        'sales_history',
+        sa.Column('id', sa.Integer(), primary_key=True, comment='主键ID'),
+        sa.Column('parrot_id', sa.Integer(), sa.ForeignKey('parrots.id'), nullable=False, comment='鹦鹉ID'),
+        sa.Column('seller', sa.String(100), nullable=False, comment='售卖人'),
+        sa.Column('buyer_name', sa.String(100), nullable=False, comment='购买者姓名'),
+        sa.Column('sale_price', sa.Numeric(precision=10, scale=2), nullable=False, comment='销售价格'),
+        sa.Column('contact', sa.String(100), nullable=False, comment='联系方式'),
+        sa.Column('follow_up_status', sa.String(20), nullable=True, comment='回访状态'),
+        sa.Column('sale_notes', sa.Text(), nullable=True, comment='销售备注'),
+        sa.Column('sale_date', sa.DateTime(), nullable=False, comment='销售时间'),
+        sa.Column('return_date', sa.DateTime(), nullable=True, comment='退货时间'),
+        sa.Column('return_reason', sa.String(500), nullable=True, comment='退货原因'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+    )
+    op.create_index('ix_sales_history_id', 'sales_history', ['id'])
+    op.create_index('ix_sales_history_sale_date', 'sales_history', ['sale_date'])
+    op.create_index('ix_sales_history_return_date', 'sales_history', ['return_date'])
+
+    op.create_table(
+        'incubation_records',
+        sa.Column('id', sa.Integer(), primary_key=True, comment='主键ID'),
+        sa.Column('father_id', sa.Integer(), sa.ForeignKey('parrots.id'), nullable=False, comment='父亲鹦鹉ID'),
+        sa.Column('mother_id', sa.Integer(), sa.ForeignKey('parrots.id'), nullable=False, comment='母亲鹦鹉ID'),
+        sa.Column('start_date', sa.Date(), nullable=False, comment='孵化开始日期'),
+        sa.Column('expected_hatch_date', sa.Date(), nullable=False, comment='预计孵化日期'),
+        sa.Column('actual_hatch_date', sa.Date(), nullable=True, comment='实际孵化日期'),
+        sa.Column('eggs_count', sa.Integer(), nullable=True, comment='蛋的数量'),
+        sa.Column('hatched_count', sa.Integer(), nullable=True, comment='成功孵化数量'),
+        sa.Column('status', sa.String(50), nullable=True, comment='孵化状态'),
+        sa.Column('notes', sa.Text(), nullable=True, comment='备注信息'),
+        sa.Column('created_at', sa.DateTime(), nullable=True, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新时间'),
+    )
+    op.create_index('ix_incubation_records_id', 'incubation_records', ['id'])
+
+    op.create_table(
+        'share_links',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('parrot_id', sa.Integer(), sa.ForeignKey('parrots.id', ondelete='CASCADE'), nullable=False, comment='关联的鹦鹉ID'),
+        sa.Column('token', sa.String(64), nullable=False, comment='唯一分享令牌'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, comment='过期时间'),
+        sa.Column('is_active', sa.Boolean(), nullable=False, comment='是否有效（用于软删除）'),
+    )
+    op.create_index('ix_share_links_id', 'share_links', ['id'])
+    op.create_index('ix_share_links_parrot_id', 'share_links', ['parrot_id'])
+    op.create_index('ix_share_links_token', 'share_links', ['token'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table('share_links')
+    op.drop_table('incubation_records')
+    op.drop_table('sales_history')
+    op.drop_table('follow_ups')
+    op.drop_table('photos')
+    op.drop_table('parrots')
@@ -0,0 +1,38 @@
+"""photo video derivatives
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('poster_path', sa.String(500), nullable=True, comment='视频封面帧路径'))
+    op.add_column('photos', sa.Column('stream_path', sa.String(500), nullable=True, comment='转码后的流媒体MP4路径'))
+    op.add_column('photos', sa.Column('duration', sa.Float(), nullable=True, comment='视频时长(秒)'))
+    op.add_column('photos', sa.Column('transcode_status', sa.String(20), nullable=True, comment='转码状态: pending/processing/done/failed'))
+    op.create_index('ix_photos_transcode_status', 'photos', ['transcode_status'])
+
+    # 已有视频标记为待转码，由工作器补处理
+    op.execute(
+        "UPDATE photos SET transcode_status = 'pending' WHERE file_type = 'video'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_photos_transcode_status', table_name='photos')
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('transcode_status')
+        batch_op.drop_column('duration')
+        batch_op.drop_column('stream_path')
+        batch_op.drop_column('poster_path')
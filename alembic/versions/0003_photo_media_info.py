@@ -0,0 +1,29 @@
+"""photo media info
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('mime_type', sa.String(50), nullable=True, comment='文件真实MIME类型'))
+    op.add_column('photos', sa.Column('width', sa.Integer(), nullable=True, comment='图片宽度(像素)'))
+    op.add_column('photos', sa.Column('height', sa.Integer(), nullable=True, comment='图片高度(像素)'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('height')
+        batch_op.drop_column('width')
+        batch_op.drop_column('mime_type')
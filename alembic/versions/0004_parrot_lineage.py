@@ -0,0 +1,36 @@
+"""parrot lineage
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.add_column(sa.Column('incubation_record_id', sa.Integer(), nullable=True, comment='来源孵化记录ID'))
+        batch_op.create_foreign_key(
+            'fk_parrots_incubation_record_id',
+            'incubation_records',
+            ['incubation_record_id'],
+            ['id'],
+            ondelete='SET NULL',
+        )
+    op.create_index('ix_parrots_incubation_record_id', 'parrots', ['incubation_record_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_parrots_incubation_record_id', table_name='parrots')
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.drop_constraint('fk_parrots_incubation_record_id', type_='foreignkey')
+        batch_op.drop_column('incubation_record_id')
@@ -0,0 +1,34 @@
+"""incubation schedule
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'incubation_records',
+        sa.Column('overdue_at', sa.DateTime(), nullable=True, comment='超过预计孵化日期仍未出壳时由调度任务标记的时间'),
+    )
+    op.create_index(
+        'ix_incubation_records_status_expected_hatch_date',
+        'incubation_records',
+        ['status', 'expected_hatch_date'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incubation_records_status_expected_hatch_date', table_name='incubation_records')
+    with op.batch_alter_table('incubation_records') as batch_op:
+        batch_op.drop_column('overdue_at')
@@ -0,0 +1,45 @@
+"""follow up tasks
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+升级后执行 `python -m app.services.follow_up_tasks backfill` 为已有销售生成回访待办。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'follow_up_tasks',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('parrot_id', sa.Integer(), sa.ForeignKey('parrots.id', ondelete='CASCADE'), nullable=False, comment='鹦鹉ID'),
+        sa.Column('sale_history_id', sa.Integer(), sa.ForeignKey('sales_history.id', ondelete='CASCADE'), nullable=True, comment='销售历史ID，为空表示当前销售'),
+        sa.Column('sold_at', sa.DateTime(), nullable=False, comment='所属销售的售出时间'),
+        sa.Column('cadence_days', sa.Integer(), nullable=False, comment='售出后第几天回访'),
+        sa.Column('due_date', sa.Date(), nullable=False, comment='到期日期'),
+        sa.Column('status', sa.String(20), nullable=False, comment='状态: pending/completed/no_contact/cancelled'),
+        sa.Column('buyer_name', sa.String(100), nullable=True, comment='购买者姓名'),
+        sa.Column('contact', sa.String(100), nullable=True, comment='联系方式'),
+        sa.Column('follow_up_id', sa.Integer(), sa.ForeignKey('follow_ups.id', ondelete='SET NULL'), nullable=True, comment='完成时登记的回访记录ID'),
+        sa.Column('completed_at', sa.DateTime(), nullable=True, comment='完成时间'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('parrot_id', 'sold_at', 'cadence_days', name='uq_follow_up_tasks_sale_cadence'),
+    )
+    op.create_index('ix_follow_up_tasks_id', 'follow_up_tasks', ['id'])
+    op.create_index('ix_follow_up_tasks_parrot_id', 'follow_up_tasks', ['parrot_id'])
+    op.create_index('ix_follow_up_tasks_sale_history_id', 'follow_up_tasks', ['sale_history_id'])
+    op.create_index('ix_follow_up_tasks_status_due_date_id', 'follow_up_tasks', ['status', 'due_date', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_table('follow_up_tasks')
@@ -0,0 +1,38 @@
+"""parrot events
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+升级后执行 `python -m app.services.parrot_events backfill` 为已有鹦鹉生成销售时间线事件。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'parrot_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('parrot_id', sa.Integer(), sa.ForeignKey('parrots.id', ondelete='CASCADE'), nullable=False, comment='鹦鹉ID'),
+        sa.Column('event_type', sa.String(20), nullable=False, comment='类型: system/sale/sale_update/return/follow_up/status/incubation'),
+        sa.Column('title', sa.String(50), nullable=False, comment='事件名称'),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False, comment='发生时间'),
+        sa.Column('description', sa.Text(), nullable=True, comment='描述'),
+        sa.Column('details', sa.JSON(), nullable=True, comment='详细信息'),
+        sa.Column('sale_seq', sa.Integer(), nullable=True, comment='第几次销售'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_parrot_events_id', 'parrot_events', ['id'])
+    op.create_index('ix_parrot_events_parrot_occurred', 'parrot_events', ['parrot_id', 'occurred_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_table('parrot_events')
@@ -0,0 +1,54 @@
+"""parrot photo stats
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.add_column(sa.Column('photo_count', sa.Integer(), nullable=False, server_default='0', comment='照片数量'))
+        batch_op.add_column(sa.Column('cover_photo_id', sa.Integer(), nullable=True, comment='封面照片ID'))
+        batch_op.add_column(sa.Column('cover_photo_path', sa.String(500), nullable=True, comment='封面预览图路径（视频为封面帧）'))
+        batch_op.create_foreign_key(
+            'fk_parrots_cover_photo_id',
+            'photos',
+            ['cover_photo_id'],
+            ['id'],
+            ondelete='SET NULL',
+        )
+
+    # 回填：与 app.services.photo_stats 的封面规则一致
+    op.execute(
+        """
+        UPDATE parrots SET
+            photo_count = (SELECT COUNT(*) FROM photos WHERE photos.parrot_id = parrots.id),
+            cover_photo_id = (
+                SELECT photos.id FROM photos WHERE photos.parrot_id = parrots.id
+                ORDER BY photos.sort_order DESC, photos.created_at ASC, photos.id ASC LIMIT 1
+            ),
+            cover_photo_path = (
+                SELECT COALESCE(photos.poster_path, photos.file_path) FROM photos WHERE photos.parrot_id = parrots.id
+                ORDER BY photos.sort_order DESC, photos.created_at ASC, photos.id ASC LIMIT 1
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.drop_constraint('fk_parrots_cover_photo_id', type_='foreignkey')
+        batch_op.drop_column('cover_photo_path')
+        batch_op.drop_column('cover_photo_id')
+        batch_op.drop_column('photo_count')
@@ -0,0 +1,46 @@
+"""sync changes
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+升级前已有的数据没有变更记录，客户端首次同步使用 since=0 时按当前数据全量下发：
+这里为已有的鹦鹉和孵化记录各写入一条变更。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_changes',
+        sa.Column('id', sa.Integer(), primary_key=True, comment='同步版本号'),
+        sa.Column('table_name', sa.String(50), nullable=False, comment='表名'),
+        sa.Column('row_id', sa.Integer(), nullable=False, comment='行ID'),
+        sa.Column('deleted', sa.Boolean(), nullable=False, comment='是否已删除'),
+        sa.Column('changed_at', sa.DateTime(), nullable=False, comment='变更时间'),
+        sa.UniqueConstraint('table_name', 'row_id', name='uq_sync_changes_table_row'),
+        sqlite_autoincrement=True,
+    )
+    sync_changes = sa.table(
+        'sync_changes',
+        sa.column('table_name'), sa.column('row_id'), sa.column('deleted'), sa.column('changed_at'),
+    )
+    for table_name in ('parrots', 'incubation_records'):
+        source = sa.table(table_name, sa.column('id'), sa.column('updated_at'))
+        op.execute(
+            sync_changes.insert().from_select(
+                ['table_name', 'row_id', 'deleted', 'changed_at'],
+                sa.select(sa.literal(table_name), source.c.id, sa.false(), source.c.updated_at).order_by(source.c.id),
+            )
+        )
+
+def downgrade() -> None:
+    op.drop_table('sync_changes')
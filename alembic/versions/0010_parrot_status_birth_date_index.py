@@ -0,0 +1,23 @@
+"""parrot status birth_date index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_parrots_status_birth_date', 'parrots', ['status', 'birth_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_parrots_status_birth_date', table_name='parrots')
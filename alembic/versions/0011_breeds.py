@@ -0,0 +1,96 @@
+"""breeds
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00
+
+品种改为维表：新建 breeds、breed_aliases，parrots 增加 breed_id。
+已有鹦鹉的品种按归一化后的写法分组，每组建一个品种（名称取该组最常用的写法），
+各种写法记为别名，鹦鹉的 breed_id 和 breed 改为该品种。
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+# 与 app.services.breeds 的归一化规则一致（迁移脚本不依赖应用代码，之后应用代码的修改不影响本迁移）
+def _normalize(name):
+    return " ".join(unicodedata.normalize("NFKC", name).split())
+
+
+def _key(name):
+    key = re.sub(r"[\s\-_·•・]+", "", _normalize(name).casefold())
+    if key.endswith("鹦鹉") and len(key) > len("鹦鹉"):
+        key = key[:-len("鹦鹉")]
+    return key
+
+
+def upgrade() -> None:
+    op.create_table(
+        'breeds',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False, unique=True, comment='规范名称'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+    )
+    op.create_index('ix_breeds_id', 'breeds', ['id'])
+    op.create_table(
+        'breed_aliases',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('alias', sa.String(100), nullable=False, unique=True, comment='归一化后的别名'),
+        sa.Column('breed_id', sa.Integer(), sa.ForeignKey('breeds.id', ondelete='CASCADE'), nullable=False, comment='品种ID'),
+    )
+    op.create_index('ix_breed_aliases_id', 'breed_aliases', ['id'])
+    op.create_index('ix_breed_aliases_breed_id', 'breed_aliases', ['breed_id'])
+
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.add_column(sa.Column('breed_id', sa.Integer(), nullable=True, comment='品种ID'))
+        batch_op.create_foreign_key('fk_parrots_breed_id', 'breeds', ['breed_id'], ['id'])
+    op.create_index('ix_parrots_breed_id', 'parrots', ['breed_id'])
+    # 筛选和统计改为按 breed_id，不再需要品种名称上的索引
+    op.drop_index('ix_parrots_breed', table_name='parrots')
+
+    _backfill(op.get_bind())
+
+
+def _backfill(connection) -> None:
+    parrots = sa.table('parrots', sa.column('breed', sa.String), sa.column('breed_id', sa.Integer))
+    breeds = sa.table('breeds', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('created_at', sa.DateTime))
+    aliases = sa.table('breed_aliases', sa.column('alias', sa.String), sa.column('breed_id', sa.Integer))
+
+    spellings = defaultdict(Counter)
+    rows = connection.execute(sa.select(parrots.c.breed, sa.func.count()).group_by(parrots.c.breed))
+    for breed, count in rows:
+        if breed is not None and _key(breed):
+            spellings[_key(breed)][breed] += count
+
+    now = datetime.utcnow()
+    for key, counter in sorted(spellings.items()):
+        name = _normalize(counter.most_common(1)[0][0])
+        connection.execute(breeds.insert().values(name=name, created_at=now))
+        breed_id = connection.execute(sa.select(breeds.c.id).where(breeds.c.name == name)).scalar_one()
+        connection.execute(aliases.insert().values(alias=key, breed_id=breed_id))
+        for spelling in counter:
+            connection.execute(
+                parrots.update().where(parrots.c.breed == spelling).values(breed_id=breed_id, breed=name)
+            )
+
+
+def downgrade() -> None:
+    op.create_index('ix_parrots_breed', 'parrots', ['breed'])
+    op.drop_index('ix_parrots_breed_id', table_name='parrots')
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.drop_constraint('fk_parrots_breed_id', type_='foreignkey')
+        batch_op.drop_column('breed_id')
+    op.drop_table('breed_aliases')
+    op.drop_table('breeds')
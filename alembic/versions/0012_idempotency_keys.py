@@ -0,0 +1,34 @@
+"""idempotency keys
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(100), primary_key=True, comment='客户端提供的 Idempotency-Key'),
+        sa.Column('fingerprint', sa.String(64), nullable=False, comment='请求方法、路径、查询字符串与请求体摘要的 SHA-256'),
+        sa.Column('status_code', sa.Integer(), nullable=True, comment='响应状态码，处理中为空'),
+        sa.Column('content_type', sa.String(100), nullable=True, comment='响应 Content-Type'),
+        sa.Column('body', sa.LargeBinary(), nullable=True, comment='响应体'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+        sa.Column('expires_at', sa.DateTime(), nullable=False, comment='过期时间'),
+    )
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,27 @@
+"""parrot version
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 00:00:00
+
+parrots 增加乐观锁版本号，已有行从 1 开始。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1', comment='版本号'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('parrots') as batch_op:
+        batch_op.drop_column('version')
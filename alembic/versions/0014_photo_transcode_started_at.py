@@ -0,0 +1,25 @@
+"""photo transcode started at
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('transcode_started_at', sa.DateTime(), nullable=True, comment='最近一次开始转码的时间（识别中断的 processing）'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('transcode_started_at')
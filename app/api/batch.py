@@ -0,0 +1,144 @@
+"""批量请求API模块
+
+小程序打开详情页时依次请求详情、照片、配对、销售信息、销售时间线、分享链接，
+移动网络下往返延迟占主要耗时。/api/batch 一次提交多个子请求，在进程内直接交给路由执行
+（不经过压缩、请求日志等中间件），所有子请求共用一个数据库会话，结果一次返回。
+
+子请求按提交顺序依次执行：会话不能被多个线程同时使用，共用会话后同一只鹦鹉在
+后续子请求中可直接从会话的 identity map 取得，也只占用一个连接。
+某个子请求失败时回滚会话中未提交的修改，不影响其他子请求。
+"""
+import logging
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from starlette.exceptions import HTTPException
+from starlette.types import Message
+
+from app.core import BadRequestException, ParrotManagementException
+from app.core.config import settings
+from app.core.database import SessionLocal, shared_session
+from app.core.exceptions import exception_handler
+from app.core.responses import dumps
+from app.schemas import BatchRequest, BatchSubRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/batch", tags=["批量请求"])
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "DELETE"}
+
+# 不能在批量请求中调用的接口：批量请求本身、长连接推送
+EXCLUDED_PREFIXES = ("/api/batch", "/api/events")
+
+
+def _validate(sub: BatchSubRequest) -> None:
+    if sub.method.upper() not in ALLOWED_METHODS:
+        raise BadRequestException(f"不支持的请求方法: {sub.method}")
+    path = urlsplit(sub.path).path
+    if not path.startswith("/api/") or path.startswith(EXCLUDED_PREFIXES):
+        raise BadRequestException(f"不支持批量调用的接口: {sub.path}")
+
+
+async def _dispatch(request: Request, sub: BatchSubRequest) -> Tuple[int, bytes, str]:
+    """在进程内执行一个子请求，返回状态码、响应体和 Content-Type"""
+    url = urlsplit(sub.path)
+    body = dumps(sub.body) if sub.body is not None else b""
+    headers = [(b"host", request.headers.get("host", "").encode("latin-1"))]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    scope = {
+        **request.scope,
+        "method": sub.method.upper(),
+        "path": url.path,
+        "raw_path": url.path.encode("utf-8"),
+        "query_string": url.query.encode("utf-8"),
+        "headers": headers,
+    }
+    for key in ("route", "endpoint", "path_params"):
+        scope.pop(key, None)
+
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status_code = 500
+    content_type = ""
+    chunks: List[bytes] = []
+
+    async def send(message: Message) -> None:
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    content_type = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except HTTPException as exc:
+        # 路由未匹配（404/405）时由应用外层的异常中间件处理，这里直接转换
+        return exc.status_code, dumps({"detail": exc.detail}), "application/json"
+    except Exception as exc:
+        # HTTPException、参数校验错误已由路由处理，这里是应用自定义异常和未处理的异常
+        if not isinstance(exc, ParrotManagementException):
+            logger.exception("批量子请求执行失败: %s %s", sub.method, sub.path)
+        response = exception_handler(request, exc)
+        return response.status_code, response.body, response.media_type
+    return status_code, b"".join(chunks), content_type
+
+
+def _render_item(sub: BatchSubRequest, status_code: int, body: bytes, content_type: str) -> bytes:
+    """子请求结果；JSON 响应体原样嵌入，不重新解析"""
+    head = dumps({"id": sub.id, "status": status_code})[:-1]
+    if not body:
+        payload = b"null"
+    elif content_type.startswith("application/json"):
+        payload = body
+    else:
+        payload = dumps(body.decode("utf-8", errors="replace"))
+    return head + b',"body":' + payload + b"}"
+
+
+@router.post("", summary="批量执行多个请求")
+async def batch(request: Request, payload: BatchRequest):
+    """
+    一次提交多个子请求，按顺序执行并返回全部结果：
+
+        {"requests": [
+            {"id": "detail", "path": "/api/parrots/1"},
+            {"id": "photos", "path": "/api/parrots/1/photos"},
+            {"id": "timeline", "path": "/api/parrots/1/sales-timeline"}
+        ]}
+
+    返回 {"responses": [{"id": "detail", "status": 200, "body": {...}}, ...]}，顺序与请求一致。
+    单个子请求失败只体现在它自己的 status 中，整体仍返回 200。
+    """
+    if len(payload.requests) > settings.BATCH_MAX_REQUESTS:
+        raise BadRequestException(f"单次最多 {settings.BATCH_MAX_REQUESTS} 个子请求")
+    for sub in payload.requests:
+        _validate(sub)
+
+    items: List[bytes] = []
+    db = SessionLocal()
+    try:
+        with shared_session(db):
+            for sub in payload.requests:
+                status_code, body, content_type = await _dispatch(request, sub)
+                if status_code >= 400:
+                    db.rollback()
+                items.append(_render_item(sub, status_code, body, content_type))
+    finally:
+        db.close()
+
+    return Response(content=b'{"responses":[' + b",".join(items) + b"]}", media_type="application/json")
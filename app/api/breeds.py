@@ -0,0 +1,47 @@
+"""品种API模块"""
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core import get_db
+from app.models import Breed
+from app.schemas import BreedAliasCreate, BreedMergeRequest, BreedResponse, BreedSuggestion
+from app.services import breeds
+
+router = APIRouter(prefix="/api/breeds", tags=["品种"])
+
+
+def _breed_response(breed: Breed) -> BreedResponse:
+    return BreedResponse(
+        id=breed.id,
+        name=breed.name,
+        aliases=sorted(alias.alias for alias in breed.aliases),
+    )
+
+
+@router.get("", response_model=List[BreedSuggestion], summary="品种自动补全")
+def suggest_breeds(
+    q: str = Query("", max_length=100, description="输入的品种名称，空字符串返回最常用的品种"),
+    limit: int = Query(10, ge=1, le=50, description="最多返回的品种数"),
+):
+    """
+    从进程内品种字典匹配（不查询数据库）：名称或别名以输入开头的品种在前，
+    包含输入的品种在后，同组按鹦鹉数量降序。输入的全角字符、空白、"鹦鹉"后缀不影响匹配。
+    """
+    return [
+        BreedSuggestion(id=entry.id, name=entry.name, parrot_count=entry.parrot_count)
+        for entry in breeds.breed_dictionary.suggest(q, limit)
+    ]
+
+
+@router.post("/{breed_id}/aliases", response_model=BreedResponse, summary="添加品种别名")
+def add_breed_alias(breed_id: int, payload: BreedAliasCreate, db: Session = Depends(get_db)):
+    """之后录入该别名的鹦鹉归入此品种；别名已属于其他品种时返回 400，应使用合并"""
+    return _breed_response(breeds.add_alias(db, breed_id, payload.alias))
+
+
+@router.post("/{breed_id}/merge", response_model=BreedResponse, summary="合并品种")
+def merge_breed(breed_id: int, payload: BreedMergeRequest, db: Session = Depends(get_db)):
+    """把品种 breed_id（如录错的写法）并入 target_id：鹦鹉改为目标品种，原名称和别名成为目标品种的别名"""
+    return _breed_response(breeds.merge_breeds(db, breed_id, payload.target_id))
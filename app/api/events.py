@@ -0,0 +1,86 @@
+"""实时推送API模块（Server-Sent Events）"""
+import json
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.api.statistics import _monthly_sales, _statistics_overview
+from app.core.cache import statistics_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.events import event_bus, format_event
+from app.services.live_updates import StatisticsBroadcaster
+
+router = APIRouter(prefix="/api/events", tags=["实时推送"])
+
+
+def _statistics_sections() -> Dict[str, Any]:
+    """重算首页统计（广播用，每次变更窗口只执行一次）"""
+    db = SessionLocal()
+    try:
+        return {
+            "overview": _statistics_overview(db).model_dump(),
+            "monthly_sales": _monthly_sales(db)["monthly_sales"],
+        }
+    finally:
+        db.close()
+
+
+def _statistics_snapshot() -> Dict[str, Any]:
+    """新连接的初始统计，与统计接口共用缓存"""
+    db = SessionLocal()
+    try:
+        overview = statistics_cache.get_or_build("overview", lambda: _statistics_overview(db).model_dump())
+        monthly = statistics_cache.get_or_build("monthly-sales", lambda: _monthly_sales(db))
+    finally:
+        db.close()
+    return {
+        "overview": json.loads(overview.raw),
+        "monthly_sales": json.loads(monthly.raw)["monthly_sales"],
+    }
+
+
+statistics_broadcaster = StatisticsBroadcaster(
+    _statistics_sections,
+    tables=statistics_cache.tables,
+    debounce=settings.STATISTICS_BROADCAST_DEBOUNCE_SECONDS,
+)
+
+
+@router.get("/stream", summary="订阅实时更新（SSE）")
+async def stream_events():
+    """
+    text/event-stream 长连接，事件类型：
+
+    - statistics: 连接建立时推送完整的 overview 和 monthly_sales，之后只推送发生变化的部分
+    - change: 每个写事务提交后推送，按表列出 upserted / deleted 的ID；值为 null 表示该表被批量修改，需要整体刷新
+
+    没有事件时每隔 EVENTS_KEEPALIVE_SECONDS 发送一行心跳注释。客户端处理不过来（积压超过
+    EVENTS_QUEUE_SIZE）时服务端断开连接，客户端重连后重新获取完整统计。
+    """
+    # 先订阅再读取初始统计，期间发生的变更不会丢失
+    subscription = event_bus.subscribe()
+    try:
+        snapshot = await run_in_threadpool(_statistics_snapshot)
+    except Exception:
+        subscription.close()
+        raise
+
+    async def frames():
+        try:
+            yield b"retry: 3000\n\n"
+            yield format_event("statistics", snapshot)
+            while not subscription.lagging:
+                # 客户端断开时 StreamingResponse 取消本生成器，在 finally 中退订
+                frame = await subscription.get(settings.EVENTS_KEEPALIVE_SECONDS)
+                yield frame if frame is not None else b": keepalive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,79 @@
+"""回访待办API模块"""
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.models import FollowUpTask, Parrot
+from app.schemas import FollowUpTaskComplete
+from app.core import get_db, NotFoundException
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.schemas.rows import CursorPage, FollowUpTaskRow
+from app.services import follow_up_tasks, parrot_events
+
+router = APIRouter(prefix="/api/follow-ups", tags=["回访管理"])
+
+
+@router.get("/due", summary="获取待回访列表")
+def get_due_follow_ups(
+    until: Optional[date] = Query(None, description="到期日截止（含），默认今天起 FOLLOW_UP_DUE_WINDOW_DAYS 天内"),
+    limit: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取到期（含已逾期）的回访待办，按到期日排序
+    使用键集分页：翻页时传入上一页的 next_cursor，next_cursor 为空表示没有更多数据
+    """
+    until = until or date.today() + timedelta(days=settings.FOLLOW_UP_DUE_WINDOW_DAYS)
+    rows, next_cursor = follow_up_tasks.due_tasks(db, until, limit, cursor)
+
+    items = [
+        FollowUpTaskRow(
+            id=row.id,
+            parrot_id=row.parrot_id,
+            breed=row.breed,
+            ring_number=row.ring_number,
+            sale_history_id=row.sale_history_id,
+            sold_at=row.sold_at,
+            cadence_days=row.cadence_days,
+            due_date=row.due_date,
+            status=row.status,
+            buyer_name=row.buyer_name,
+            contact=row.contact,
+        )
+        for row in rows
+    ]
+    return FastJSONResponse(CursorPage(items=items, next_cursor=next_cursor))
+
+
+@router.post("/tasks/{task_id}/complete", summary="完成回访待办")
+def complete_follow_up_task(task_id: int, data: FollowUpTaskComplete, db: Session = Depends(get_db)):
+    """
+    完成回访待办，同时登记回访记录并更新所属销售的回访状态
+    """
+    task = db.query(FollowUpTask).filter(FollowUpTask.id == task_id).first()
+    if not task:
+        raise NotFoundException(f"未找到ID为 {task_id} 的回访待办")
+
+    follow_up = follow_up_tasks.complete_task(db, task, data.follow_up_status, data.notes)
+    parrot_events.record_follow_up(db, follow_up)
+    db.commit()
+    db.refresh(task)
+
+    parrot = db.query(Parrot.breed, Parrot.ring_number).filter(Parrot.id == task.parrot_id).first()
+    return FastJSONResponse(FollowUpTaskRow(
+        id=task.id,
+        parrot_id=task.parrot_id,
+        breed=parrot.breed if parrot else None,
+        ring_number=parrot.ring_number if parrot else None,
+        sale_history_id=task.sale_history_id,
+        sold_at=task.sold_at,
+        cadence_days=task.cadence_days,
+        due_date=task.due_date,
+        status=task.status,
+        buyer_name=task.buyer_name,
+        contact=task.contact,
+    ))
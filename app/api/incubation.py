@@ -1,5 +1,5 @@
 from typing import List, Optional
-from datetime import date
+from datetime import date, timedelta
 
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlalchemy import func, and_, or_
@@ -13,8 +13,13 @@ from app.schemas import (
     IncubationRecordList,
     IncubationRecordFilter,
     IncubationStatistics,
+    LineageParrot,
+    OffspringLinkRequest,
 )
 from app.core import get_db, NotFoundException, BadRequestException
+from app.core.responses import FastJSONResponse
+from app.services import incubation_scheduler, parrot_events
+from app.services.lineage import validate_offspring
 
 router = APIRouter(prefix="/api/incubation", tags=["孵化管理"])
 
@@ -97,6 +102,7 @@ def get_incubation_records(
                 hatched_count=record.hatched_count,
                 status=record.status,
                 notes=record.notes,
+                overdue_at=record.overdue_at.isoformat() if record.overdue_at else None,
                 created_at=created_at_str,
                 updated_at=updated_at_str,
                 father=record.father,
@@ -107,6 +113,46 @@ def get_incubation_records(
     return IncubationRecordList(total=total, items=items, page=page, size=size)
 
 
+@router.get("/calendar", summary="获取孵化日历")
+def get_incubation_calendar(
+    date_from: date = Query(..., alias="from", description="开始日期"),
+    date_to: date = Query(..., alias="to", description="结束日期（含）"),
+    kind: Optional[str] = Query(None, pattern="^(hatch|follow_up)$", description="条目类型: hatch预计出壳/follow_up回访到期"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取日期区间内的预计出壳和回访到期事项，按到期日排序
+    数据来自内存中的日历索引，不扫描数据表
+    """
+    if date_to < date_from:
+        raise BadRequestException("结束日期不能早于开始日期")
+    if date_to - date_from > timedelta(days=366):
+        raise BadRequestException("查询区间不能超过一年")
+
+    index = incubation_scheduler.ensure_index(db)
+    items = index.between(date_from, date_to, kind)
+    return FastJSONResponse({"from": date_from, "to": date_to, "total": len(items), "items": items})
+
+
+@router.get("/tasks/daily", summary="获取每日任务")
+def get_daily_tasks(
+    day: Optional[date] = Query(None, description="日期，默认今天"),
+    overdue_limit: int = Query(100, ge=0, le=1000, description="最多返回的逾期条目数（按到期日从近到远）"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取某天到期的事项，以及此前已到期仍未处理的事项
+    """
+    tasks = incubation_scheduler.daily_tasks(db, day or date.today())
+    overdue = tasks.overdue[::-1][:overdue_limit]
+    return FastJSONResponse({
+        "date": tasks.date,
+        "due": tasks.due,
+        "overdue_total": len(tasks.overdue),
+        "overdue": overdue,
+    })
+
+
 @router.get("/{record_id}", response_model=IncubationRecordResponse, summary="获取孵化记录详情")
 def get_incubation_record(record_id: int, db: Session = Depends(get_db)):
     record = db.query(IncubationRecord).filter(IncubationRecord.id == record_id).first()
@@ -134,6 +180,7 @@ def get_incubation_record(record_id: int, db: Session = Depends(get_db)):
         hatched_count=record.hatched_count,
         status=record.status,
         notes=record.notes,
+        overdue_at=record.overdue_at.isoformat() if record.overdue_at else None,
         created_at=created_at_str,
         updated_at=updated_at_str,
         father=record.father,
@@ -186,6 +233,8 @@ def create_incubation_record(record: IncubationRecordCreate, db: Session = Depen
     )
 
     db.add(db_record)
+    db.flush()
+    parrot_events.record_incubation_started(db, db_record)
 
     # 更新父鸟和母鸟的状态为孵化中（如果存在）
     if father:
@@ -216,6 +265,7 @@ def create_incubation_record(record: IncubationRecordCreate, db: Session = Depen
         hatched_count=db_record.hatched_count,
         status=db_record.status,
         notes=db_record.notes,
+        overdue_at=db_record.overdue_at.isoformat() if db_record.overdue_at else None,
         created_at=created_at_str,
         updated_at=updated_at_str,
         father=db_record.father,
@@ -266,9 +316,29 @@ def update_incubation_record(
         if update_data["expected_hatch_date"] < db_record.start_date:
             raise BadRequestException("预计孵化日期不能早于开始日期")
 
+    # 更换父母时，已登记的子代不能成为新父母的祖先
+    if "father_id" in update_data or "mother_id" in update_data:
+        offspring_ids = [
+            parrot_id for (parrot_id,) in
+            db.query(Parrot.id).filter(Parrot.incubation_record_id == record_id).all()
+        ]
+        if offspring_ids:
+            validate_offspring(
+                db,
+                update_data.get("father_id", db_record.father_id),
+                update_data.get("mother_id", db_record.mother_id),
+                offspring_ids,
+            )
+
     # 应用更新
+    old_status = db_record.status
     for field, value in update_data.items():
         setattr(db_record, field, value)
+    parrot_events.record_incubation_status(db, db_record, old_status)
+
+    # 预计孵化日期推后到今天及以后时清除逾期标记
+    if db_record.overdue_at and db_record.expected_hatch_date >= date.today():
+        db_record.overdue_at = None
 
     db.commit()
     db.refresh(db_record)
@@ -293,6 +363,7 @@ def update_incubation_record(
         hatched_count=db_record.hatched_count,
         status=db_record.status,
         notes=db_record.notes,
+        overdue_at=db_record.overdue_at.isoformat() if db_record.overdue_at else None,
         created_at=created_at_str,
         updated_at=updated_at_str,
         father=db_record.father,
@@ -329,6 +400,56 @@ def delete_incubation_record(record_id: int, db: Session = Depends(get_db)):
     return None
 
 
+@router.get("/{record_id}/offspring", response_model=List[LineageParrot], summary="获取孵化记录的子代")
+def get_offspring(record_id: int, db: Session = Depends(get_db)):
+    record = db.query(IncubationRecord).filter(IncubationRecord.id == record_id).first()
+    if not record:
+        raise NotFoundException(f"未找到ID为 {record_id} 的孵化记录")
+
+    offspring = db.query(Parrot).filter(Parrot.incubation_record_id == record_id).order_by(Parrot.id).all()
+    return [LineageParrot.model_validate(parrot) for parrot in offspring]
+
+
+@router.post("/{record_id}/offspring", response_model=List[LineageParrot], summary="关联子代鹦鹉")
+def link_offspring(record_id: int, link_data: OffspringLinkRequest, db: Session = Depends(get_db)):
+    """
+    将鹦鹉登记为该窝孵化的子代，用于血统查询
+    已关联到其他孵化记录的鹦鹉会改为关联到本记录
+    """
+    record = db.query(IncubationRecord).filter(IncubationRecord.id == record_id).first()
+    if not record:
+        raise NotFoundException(f"未找到ID为 {record_id} 的孵化记录")
+
+    parrot_ids = set(link_data.parrot_ids)
+    parrots = db.query(Parrot).filter(Parrot.id.in_(parrot_ids)).all()
+    missing = parrot_ids - {parrot.id for parrot in parrots}
+    if missing:
+        raise BadRequestException(f"未找到ID为 {', '.join(str(i) for i in sorted(missing))} 的鹦鹉")
+
+    validate_offspring(db, record.father_id, record.mother_id, parrot_ids)
+
+    for parrot in parrots:
+        parrot.incubation_record_id = record_id
+    db.commit()
+
+    return get_offspring(record_id, db)
+
+
+@router.delete("/{record_id}/offspring/{parrot_id}", status_code=status.HTTP_204_NO_CONTENT, summary="取消关联子代")
+def unlink_offspring(record_id: int, parrot_id: int, db: Session = Depends(get_db)):
+    parrot = db.query(Parrot).filter(
+        Parrot.id == parrot_id,
+        Parrot.incubation_record_id == record_id,
+    ).first()
+    if not parrot:
+        raise NotFoundException(f"鹦鹉 {parrot_id} 不是孵化记录 {record_id} 的子代")
+
+    parrot.incubation_record_id = None
+    db.commit()
+
+    return None
+
+
 @router.get("/statistics/summary", response_model=IncubationStatistics, summary="获取孵化统计信息")
 def get_incubation_statistics(db: Session = Depends(get_db)):
     """
@@ -0,0 +1,71 @@
+"""血统（系谱）查询API模块"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.models import Parrot
+from app.schemas import LineageEntry, LineageParrot, LineageResponse, PedigreeNode
+from app.core import get_db, NotFoundException
+from app.core.config import settings
+from app.services import lineage
+
+router = APIRouter(prefix="/api/lineage", tags=["血统管理"])
+
+
+def _ensure_parrot(db: Session, parrot_id: int) -> None:
+    if not db.query(Parrot.id).filter(Parrot.id == parrot_id).first():
+        raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
+
+
+def _lineage_response(parrot_id: int, generations: int, edges) -> LineageResponse:
+    items = [
+        LineageEntry(
+            depth=edge.depth,
+            parent_id=edge.parent_id,
+            child_id=edge.child_id,
+            relation=edge.relation,
+            parrot=LineageParrot.model_validate(edge.parrot),
+        )
+        for edge in edges
+    ]
+    return LineageResponse(parrot_id=parrot_id, generations=generations, total=len(items), items=items)
+
+
+@router.get("/{parrot_id}/ancestors", response_model=LineageResponse, summary="获取祖先")
+def get_ancestors(
+    parrot_id: int,
+    generations: int = Query(3, ge=1, le=settings.LINEAGE_MAX_GENERATIONS, description="向上查询的代数"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取 N 代以内的祖先，按代数排序
+    """
+    _ensure_parrot(db, parrot_id)
+    return _lineage_response(parrot_id, generations, lineage.ancestors(db, parrot_id, generations))
+
+
+@router.get("/{parrot_id}/descendants", response_model=LineageResponse, summary="获取后代")
+def get_descendants(
+    parrot_id: int,
+    generations: int = Query(3, ge=1, le=settings.LINEAGE_MAX_GENERATIONS, description="向下查询的代数"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取 N 代以内的后代，按代数排序
+    """
+    _ensure_parrot(db, parrot_id)
+    return _lineage_response(parrot_id, generations, lineage.descendants(db, parrot_id, generations))
+
+
+@router.get("/{parrot_id}/tree", response_model=PedigreeNode, summary="获取系谱树")
+def get_pedigree_tree(
+    parrot_id: int,
+    generations: int = Query(3, ge=1, le=settings.LINEAGE_MAX_GENERATIONS, description="系谱树代数"),
+    db: Session = Depends(get_db),
+):
+    """
+    获取祖先系谱树（父系/母系嵌套结构），未知的父母为 null
+    """
+    tree = lineage.build_pedigree(db, parrot_id, generations)
+    if tree is None:
+        raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
+    return PedigreeNode.model_validate(tree)
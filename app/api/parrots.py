@@ -1,12 +1,13 @@
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional
 from decimal import Decimal
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, HTTPException, status, File, UploadFile, Form
 from sqlalchemy import func, or_, and_
 from sqlalchemy.orm import Session
 
-from app.models import Parrot, Photo, FollowUp, SalesHistory
+from app.models import Parrot, Photo, FollowUp, SalesHistory, IncubationRecord
 from app.schemas import (
     ParrotCreate,
     ParrotUpdate,
@@ -22,44 +23,98 @@ from app.schemas import (
     ParrotReturnUpdate,
     PhotoResponse,
 )
-from app.core import get_db, NotFoundException, BadRequestException
+from app.core.config import settings
+from app.core import get_db, NotFoundException, BadRequestException, ConflictException
+from app.core.cache import cached_response, facets_cache
+from app.core.projection import Field, Projection, column_field
+from app.core.responses import FastJSONResponse
+from app.schemas.rows import MateBrief, MateRecommendationRow, Page, ParrotListRow, ParrotListRowWithMate
 from app.utils import FileUploadUtil
+from app.services.video_transcoder import enqueue_transcode
+from app.services.mate_matching import recommend_mates
+from app.services import breeds, follow_up_tasks, parrot_events, parrot_facets
 
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/api/parrots", tags=["鹦鹉管理"])
 
-
-@router.get("", summary="获取鹦鹉列表")
-def get_parrots(
-    db: Session = Depends(get_db),
-    page: int = Query(1, ge=1, description="页码"),
-    size: int = Query(20, ge=1, le=100, description="每页数量"),
-    breed: Optional[str] = Query(None, description="筛选品种"),
+# 鹦鹉列表 fields= 可选字段（与 ParrotListRow 一致）
+PARROT_FIELDS = Projection(Parrot.id, {
+    "id": column_field(Parrot.id),
+    "breed": column_field(Parrot.breed),
+    "breed_id": column_field(Parrot.breed_id),
+    "price": Field((Parrot.price,), lambda row: row.price or None),
+    "gender": column_field(Parrot.gender),
+    "birth_date": column_field(Parrot.birth_date),
+    "ring_number": column_field(Parrot.ring_number),
+    "status": column_field(Parrot.status),
+    "health_notes": column_field(Parrot.health_notes),
+    "created_at": column_field(Parrot.created_at),
+    "updated_at": column_field(Parrot.updated_at),
+    "photo_count": column_field(Parrot.photo_count),
+    "photo_url": Field(
+        (Parrot.cover_photo_path,),
+        lambda row: f"/uploads/{row.cover_photo_path}" if row.cover_photo_path else None,
+    ),
+    "mate_id": column_field(Parrot.mate_id),
+    "paired_at": column_field(Parrot.paired_at),
+})
+
+
+@dataclass(frozen=True)
+class ParrotFilters:
+    """鹦鹉列表的筛选条件（列表与筛选计数共用）"""
+    breed: Optional[str] = None
+    breed_id: Optional[int] = None
+    gender: Optional[str] = None
+    status: Optional[str] = None
+    min_age_days: Optional[int] = None
+    max_age_days: Optional[int] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    keyword: Optional[str] = None
+
+
+def parrot_filters(
+    breed: Optional[str] = Query(None, description="筛选品种（名称或别名，部分匹配）"),
+    breed_id: Optional[int] = Query(None, description="筛选品种ID（见 /api/breeds）"),
     gender: Optional[str] = Query(None, description="筛选性别"),
     status: Optional[str] = Query(None, description="筛选状态"),
-    min_age_days: Optional[int] = Query(None, ge=0, description="最小年龄(天)"),
-    max_age_days: Optional[int] = Query(None, ge=0, description="最大年龄(天)"),
+    min_age_days: Optional[int] = Query(None, ge=0, description="最小年龄(天)，含"),
+    max_age_days: Optional[int] = Query(None, ge=0, description="最大年龄(天)，含"),
     min_price: Optional[float] = Query(None, ge=0, description="最低价格"),
     max_price: Optional[float] = Query(None, ge=0, description="最高价格"),
     keyword: Optional[str] = Query(None, description="搜索关键词(品种/圈号)"),
-    include_mate: bool = Query(False, description="是否包含配偶详细信息"),
-):
-    """
-    获取鹦鹉列表，支持筛选和分页
-    """
-    # 查询构建
-    query = db.query(Parrot)
+) -> ParrotFilters:
+    if min_age_days is not None and max_age_days is not None and min_age_days > max_age_days:
+        raise BadRequestException("最小年龄不能大于最大年龄")
+    return ParrotFilters(
+        breed=breed or None,
+        breed_id=breed_id,
+        gender=gender or None,
+        status=status or None,
+        min_age_days=min_age_days,
+        max_age_days=max_age_days,
+        min_price=min_price,
+        max_price=max_price,
+        keyword=keyword or None,
+    )
+
 
-    # 筛选条件
-    if breed:
-        query = query.filter(Parrot.breed.contains(breed))
+def _apply_parrot_filters(query, filters: ParrotFilters):
+    """按筛选条件过滤鹦鹉查询"""
+    # 品种按整数键过滤：名称先在品种字典中匹配出ID
+    if filters.breed_id is not None:
+        query = query.filter(Parrot.breed_id == filters.breed_id)
 
-    if gender:
-        query = query.filter(Parrot.gender == gender)
+    if filters.breed:
+        query = query.filter(Parrot.breed_id.in_(breeds.breed_dictionary.match(filters.breed)))
 
-    if status:
-        if status == "paired":
+    if filters.gender:
+        query = query.filter(Parrot.gender == filters.gender)
+
+    if filters.status:
+        if filters.status == "paired":
             # 筛选已配对的鹦鹉（有配偶ID且状态为paired的）
             query = query.filter(
                 and_(
@@ -69,86 +124,142 @@ def get_parrots(
             )
         else:
             # 其他状态按原逻辑筛选
-            query = query.filter(Parrot.status == status)
+            query = query.filter(Parrot.status == filters.status)
+
+    # 年龄换算为出生日期区间，可以使用 (status, birth_date) 索引；没有出生日期的鹦鹉不参与年龄筛选
+    today = date.today()
+    if filters.min_age_days is not None and filters.max_age_days is not None:
+        query = query.filter(Parrot.birth_date.between(
+            today - timedelta(days=filters.max_age_days),
+            today - timedelta(days=filters.min_age_days),
+        ))
+    elif filters.min_age_days is not None:
+        query = query.filter(Parrot.birth_date <= today - timedelta(days=filters.min_age_days))
+    elif filters.max_age_days is not None:
+        query = query.filter(Parrot.birth_date >= today - timedelta(days=filters.max_age_days))
+
+    if filters.min_price is not None:
+        query = query.filter(Parrot.price >= filters.min_price)
+
+    if filters.max_price is not None:
+        query = query.filter(Parrot.price <= filters.max_price)
+
+    if filters.keyword:
+        breed_ids = breeds.breed_dictionary.match(filters.keyword)
+        query = query.filter(
+            or_(
+                Parrot.breed_id.in_(breed_ids) if breed_ids else False,
+                Parrot.ring_number.contains(filters.keyword),
+            )
+        )
 
-    if min_age_days is not None:
-        min_date = date.today()
-        query = query.filter(Parrot.birth_date <= min_date)
+    return query
 
-    if max_age_days is not None:
-        max_date = date.today()
-        query = query.filter(Parrot.birth_date >= max_date)
 
-    if min_price is not None:
-        query = query.filter(Parrot.price >= min_price)
+@router.get("", summary="获取鹦鹉列表")
+def get_parrots(
+    db: Session = Depends(get_db),
+    page: int = Query(1, ge=1, description="页码"),
+    size: int = Query(20, ge=1, le=100, description="每页数量"),
+    filters: ParrotFilters = Depends(parrot_filters),
+    include_mate: bool = Query(False, description="是否包含配偶详细信息"),
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,ring_number,breed"),
+):
+    """
+    获取鹦鹉列表，支持筛选和分页
 
-    if max_price is not None:
-        query = query.filter(Parrot.price <= max_price)
+    指定 fields 时只查询所需的列，每行只包含这些字段（include_mate 时另加 mate）。
+    """
+    field_names = PARROT_FIELDS.parse(fields)
 
-    if keyword:
-        query = query.filter(
-            or_(
-                Parrot.breed.contains(keyword),
-                Parrot.ring_number.contains(keyword) if Parrot.ring_number else False
-            )
-        )
+    query = _apply_parrot_filters(db.query(Parrot), filters)
 
     # 统计总数
     total = query.count()
 
     # 分页
     offset = (page - 1) * size
-    parrots = query.order_by(Parrot.created_at.desc()).offset(offset).limit(size).all()
+    query = query.order_by(Parrot.created_at.desc()).offset(offset).limit(size)
+
+    if field_names is not None:
+        columns = PARROT_FIELDS.columns(field_names + ["mate_id"] if include_mate else field_names)
+        records = query.with_entities(*columns).all()
+        items = PARROT_FIELDS.rows(records, field_names)
+        if include_mate:
+            mates = _mate_briefs(db, {record.mate_id for record in records if record.mate_id})
+            for item, record in zip(items, records):
+                item["mate"] = mates.get(record.mate_id)
+        return FastJSONResponse(Page(total=total, items=items, page=page, size=size))
+
+    parrots = query.all()
+
+    # 配偶信息一次查询取得，每页的查询数与行数无关
+    mates = _mate_briefs(db, {parrot.mate_id for parrot in parrots if parrot.mate_id}) if include_mate else {}
 
     # 构建响应
     items = []
     for parrot in parrots:
-        photo_count = db.query(Photo).filter(Photo.parrot_id == parrot.id).count()
-        # 获取第一张照片作为缩略图
-        first_photo = db.query(Photo).filter(Photo.parrot_id == parrot.id).order_by(Photo.sort_order.desc(), Photo.created_at.asc()).first()
-        photo_url = f"/uploads/{first_photo.file_path}" if first_photo else None
-
-        # 转换datetime为字符串
-        created_at_str = parrot.created_at.isoformat() if parrot.created_at else None
-        updated_at_str = parrot.updated_at.isoformat() if parrot.updated_at else None
-        paired_at_str = parrot.paired_at.isoformat() if parrot.paired_at else None
-
-        if include_mate and parrot.mate_id:
-            # 获取配偶详细信息
-            mate = db.query(Parrot).filter(Parrot.id == parrot.mate_id).first()
-            mate_info = {
-                "id": mate.id,
-                "breed": mate.breed,
-                "gender": mate.gender,
-                "ring_number": mate.ring_number,
-                "birth_date": mate.birth_date.isoformat() if mate.birth_date else None,
-            } if mate else None
-        else:
-            mate_info = None
-
-        item_data = {
-            "id": parrot.id,
-            "breed": parrot.breed,
-            "price": float(parrot.price) if parrot.price else None,
-            "gender": parrot.gender,
-            "birth_date": parrot.birth_date,
-            "ring_number": parrot.ring_number,
-            "status": parrot.status,
-            "health_notes": parrot.health_notes,
-            "created_at": created_at_str,
-            "updated_at": updated_at_str,
-            "photo_count": photo_count,
-            "photo_url": photo_url,
-            "mate_id": parrot.mate_id,
-            "paired_at": paired_at_str,
-        }
+        row = ParrotListRow(
+            id=parrot.id,
+            breed=parrot.breed,
+            price=parrot.price or None,
+            gender=parrot.gender,
+            birth_date=parrot.birth_date,
+            ring_number=parrot.ring_number,
+            status=parrot.status,
+            health_notes=parrot.health_notes,
+            created_at=parrot.created_at,
+            updated_at=parrot.updated_at,
+            photo_count=parrot.photo_count,
+            photo_url=parrot.cover_photo_url,
+            mate_id=parrot.mate_id,
+            paired_at=parrot.paired_at,
+        )
 
         if include_mate:
-            item_data["mate"] = mate_info
+            row = ParrotListRowWithMate(**vars(row), mate=mates.get(parrot.mate_id))
+
+        items.append(row)
 
-        items.append(item_data)
+    return FastJSONResponse(Page(total=total, items=items, page=page, size=size))
 
-    return {"total": total, "items": items, "page": page, "size": size}
+
+def _mate_briefs(db: Session, mate_ids: set) -> dict:
+    """一次查询取得多只配偶的简要信息"""
+    if not mate_ids:
+        return {}
+    mates = db.query(
+        Parrot.id, Parrot.breed, Parrot.gender, Parrot.ring_number, Parrot.birth_date,
+    ).filter(Parrot.id.in_(mate_ids)).all()
+    return {
+        mate.id: MateBrief(
+            id=mate.id,
+            breed=mate.breed,
+            gender=mate.gender,
+            ring_number=mate.ring_number,
+            birth_date=mate.birth_date,
+        )
+        for mate in mates
+    }
+
+
+@router.get("/facets", summary="获取筛选计数")
+def get_parrot_facets(
+    request: Request,
+    db: Session = Depends(get_db),
+    filters: ParrotFilters = Depends(parrot_filters),
+):
+    """
+    在当前筛选条件下按品种、性别、状态、价格区间、年龄区间统计数量（一条分组查询），
+    筛选参数与鹦鹉列表相同，结果按筛选条件缓存，鹦鹉数据变更后失效。
+    """
+    # 年龄筛选和年龄区间按当天日期计算，日期变化后缓存自然换新
+    today = date.today()
+    payload = facets_cache.get_or_build(
+        (filters, today),
+        lambda: parrot_facets.facet_counts(db, _apply_parrot_filters(db.query(Parrot), filters), today=today),
+    )
+    return cached_response(request, payload)
 
 
 @router.get("/{parrot_id}", response_model=ParrotResponse, summary="获取鹦鹉详情")
@@ -158,11 +269,6 @@ def get_parrot(parrot_id: int, db: Session = Depends(get_db)):
     if not parrot:
         raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
 
-    photo_count = db.query(Photo).filter(Photo.parrot_id == parrot.id).count()
-    # 获取第一张照片作为缩略图
-    first_photo = db.query(Photo).filter(Photo.parrot_id == parrot.id).order_by(Photo.sort_order.desc(), Photo.created_at.asc()).first()
-    photo_url = f"/uploads/{first_photo.file_path}" if first_photo else None
-
     # 转换datetime为字符串
     created_at_str = parrot.created_at.isoformat() if parrot.created_at else None
     updated_at_str = parrot.updated_at.isoformat() if parrot.updated_at else None
@@ -178,9 +284,10 @@ def get_parrot(parrot_id: int, db: Session = Depends(get_db)):
         health_notes=parrot.health_notes,
         created_at=created_at_str,
         updated_at=updated_at_str,
-        photo_count=photo_count,
-        photo_url=photo_url,
+        photo_count=parrot.photo_count,
+        photo_url=parrot.cover_photo_url,
         mate_id=parrot.mate_id,
+        incubation_record_id=parrot.incubation_record_id,
         paired_at=parrot.paired_at.isoformat() if parrot.paired_at else None,
     )
 
@@ -203,9 +310,17 @@ def create_parrot(parrot_data: ParrotCreate = None, db: Session = Depends(get_db
     ):
         raise BadRequestException("最低价格不能高于最高价格")
 
+    if parrot_data.incubation_record_id is not None:
+        record = db.query(IncubationRecord).filter(IncubationRecord.id == parrot_data.incubation_record_id).first()
+        if not record:
+            raise BadRequestException(f"未找到ID为 {parrot_data.incubation_record_id} 的孵化记录")
+
+    breed_id, breed_name = breeds.ensure_breed(db, parrot_data.breed)
+
     # 创建鹦鹉对象
     parrot = Parrot(
-        breed=parrot_data.breed,
+        breed=breed_name,
+        breed_id=breed_id,
         price=parrot_data.price or parrot_data.max_price or parrot_data.min_price,
         min_price=parrot_data.min_price,
         max_price=parrot_data.max_price,
@@ -213,6 +328,7 @@ def create_parrot(parrot_data: ParrotCreate = None, db: Session = Depends(get_db
         birth_date=parrot_data.birth_date,
         ring_number=parrot_data.ring_number,
         health_notes=parrot_data.health_notes,
+        incubation_record_id=parrot_data.incubation_record_id,
         status="available",
     )
 
@@ -220,6 +336,7 @@ def create_parrot(parrot_data: ParrotCreate = None, db: Session = Depends(get_db
 
     try:
         db.flush()
+        parrot_events.record_created(db, parrot)
         db.commit()
     except IntegrityError as e:
         db.rollback()
@@ -253,6 +370,7 @@ def create_parrot(parrot_data: ParrotCreate = None, db: Session = Depends(get_db
         updated_at=updated_at_str,
         photo_count=0,
         mate_id=parrot.mate_id,
+        incubation_record_id=parrot.incubation_record_id,
         paired_at=parrot.paired_at.isoformat() if parrot.paired_at else None,
     )
 
@@ -281,7 +399,10 @@ def update_parrot(
 
     for field, value in update_data.items():
         if value is not None:
-            setattr(parrot, field, value)
+            if field == "breed":
+                breeds.assign_breed(db, parrot, value)
+            else:
+                setattr(parrot, field, value)
 
     if "price" not in update_data:
         parrot.price = target_max_price or target_min_price or parrot.price
@@ -298,8 +419,6 @@ def update_parrot(
         db.rollback()
         raise BadRequestException(f"更新失败: {str(e)}")
 
-    photo_count = db.query(Photo).filter(Photo.parrot_id == parrot.id).count()
-
     # 转换datetime为字符串
     created_at_str = parrot.created_at.isoformat() if parrot.created_at else None
     updated_at_str = parrot.updated_at.isoformat() if parrot.updated_at else None
@@ -315,8 +434,9 @@ def update_parrot(
         health_notes=parrot.health_notes,
         created_at=created_at_str,
         updated_at=updated_at_str,
-        photo_count=photo_count,
+        photo_count=parrot.photo_count,
         mate_id=parrot.mate_id,
+        incubation_record_id=parrot.incubation_record_id,
         paired_at=parrot.paired_at.isoformat() if parrot.paired_at else None,
     )
 
@@ -328,9 +448,20 @@ def delete_parrot(parrot_id: int, db: Session = Depends(get_db)):
     if not parrot:
         raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
 
+    # 照片记录随鹦鹉级联删除，物理文件需要在提交后单独清理
+    file_paths = [
+        path
+        for photo in parrot.photos
+        for path in (photo.file_path, photo.poster_path, photo.stream_path)
+        if path
+    ]
+
     db.delete(parrot)
     db.commit()
 
+    for file_path in file_paths:
+        FileUploadUtil.delete_file(file_path)
+
     return None
 
 
@@ -343,12 +474,14 @@ def update_parrot_status(
     if not parrot:
         raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
 
+    old_status = parrot.status
     parrot.status = status_data.status
+    parrot_events.record_status_change(db, parrot, old_status)
+    # 从已售出改为其他状态时取消当前销售未完成的回访待办
+    follow_up_tasks.sync_current_sale(db, parrot)
     db.commit()
     db.refresh(parrot)
 
-    photo_count = db.query(Photo).filter(Photo.parrot_id == parrot.id).count()
-
     # 转换datetime为字符串
     created_at_str = parrot.created_at.isoformat() if parrot.created_at else None
     updated_at_str = parrot.updated_at.isoformat() if parrot.updated_at else None
@@ -364,8 +497,9 @@ def update_parrot_status(
         health_notes=parrot.health_notes,
         created_at=created_at_str,
         updated_at=updated_at_str,
-        photo_count=photo_count,
+        photo_count=parrot.photo_count,
         mate_id=parrot.mate_id,
+        incubation_record_id=parrot.incubation_record_id,
         paired_at=parrot.paired_at.isoformat() if parrot.paired_at else None,
     )
 
@@ -379,16 +513,33 @@ def get_parrot_photos(parrot_id: int, db: Session = Depends(get_db)):
 
     photos = db.query(Photo).filter(Photo.parrot_id == parrot_id).order_by(Photo.sort_order, Photo.created_at).all()
 
-    return [{"id": p.id, "file_path": p.file_path, "file_name": p.file_name, "file_type": p.file_type, "sort_order": p.sort_order} for p in photos]
+    return [
+        {
+            "id": p.id,
+            "file_path": p.file_path,
+            "file_name": p.file_name,
+            "file_type": p.file_type,
+            "mime_type": p.mime_type,
+            "width": p.width,
+            "height": p.height,
+            "sort_order": p.sort_order,
+            "poster_path": p.poster_path,
+            "stream_path": p.stream_path,
+            "duration": p.duration,
+            "transcode_status": p.transcode_status,
+        }
+        for p in photos
+    ]
 
 
 @router.post("/{parrot_id}/photos", status_code=status.HTTP_201_CREATED, summary="上传鹦鹉照片或视频")
 async def upload_parrot_photo(
     parrot_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
-    """上传鹦鹉照片或视频"""
+    """上传鹦鹉照片或视频，视频在响应返回后由后台任务转码"""
     from app.utils import FileUploadUtil
 
     parrot = db.query(Parrot).filter(Parrot.id == parrot_id).first()
@@ -398,36 +549,116 @@ async def upload_parrot_photo(
     if not file:
         raise BadRequestException("请选择要上传的文件")
 
-    file_path, original_filename = await FileUploadUtil.upload_photo(file, subfolder="parrots")
+    file_path, original_filename, media = await FileUploadUtil.upload_photo(file, subfolder="parrots")
 
-    # 根据文件扩展名判断文件类型
-    file_ext = original_filename.split('.')[-1].lower()
-    video_exts = {'mp4', 'mov', 'avi', 'mkv', 'webm'}
-    file_type = 'video' if file_ext in video_exts else 'image'
+    # 根据文件头识别的真实类型判断文件类型
+    file_type = media.kind
 
     photo = Photo(
         parrot_id=parrot_id,
         file_path=file_path,
         file_name=original_filename,
         file_type=file_type,
+        mime_type=media.mime_type,
+        width=media.width,
+        height=media.height,
         sort_order=0,
+        transcode_status="pending" if file_type == "video" else None,
     )
 
     db.add(photo)
     db.commit()
     db.refresh(photo)
 
+    if file_type == "video":
+        background_tasks.add_task(enqueue_transcode, photo.id)
+
     return {
         "id": photo.id,
         "parrot_id": photo.parrot_id,
         "file_path": photo.file_path,
         "file_name": photo.file_name,
         "file_type": photo.file_type,
+        "mime_type": photo.mime_type,
+        "width": photo.width,
+        "height": photo.height,
         "sort_order": photo.sort_order,
+        "transcode_status": photo.transcode_status,
         "created_at": photo.created_at.isoformat() if photo.created_at else None,
     }
 
 
+@router.post("/{parrot_id}/photos/batch", response_model=List[PhotoResponse], status_code=status.HTTP_201_CREATED, summary="批量上传鹦鹉照片或视频")
+async def upload_parrot_photos_batch(
+    parrot_id: int,
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+):
+    """
+    一次上传多个照片/视频
+
+    所有文件并发写入磁盘，照片记录在同一个事务中插入；
+    任意文件校验或保存失败时整批回滚，已写入的文件会被删除。
+    """
+    parrot = db.query(Parrot.id).filter(Parrot.id == parrot_id).first()
+    if not parrot:
+        raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
+
+    if not files:
+        raise BadRequestException("请选择要上传的文件")
+
+    if len(files) > settings.MAX_BATCH_UPLOAD_FILES:
+        raise BadRequestException(f"单次最多上传 {settings.MAX_BATCH_UPLOAD_FILES} 个文件")
+
+    uploaded = await FileUploadUtil.upload_many(files, subfolder="parrots")
+
+    photos = [
+        Photo(
+            parrot_id=parrot_id,
+            file_path=file_path,
+            file_name=original_filename,
+            file_type=media.kind,
+            mime_type=media.mime_type,
+            width=media.width,
+            height=media.height,
+            sort_order=0,
+            transcode_status="pending" if media.kind == "video" else None,
+        )
+        for file_path, original_filename, media in uploaded
+    ]
+
+    try:
+        db.add_all(photos)
+        db.commit()
+    except Exception:
+        db.rollback()
+        for file_path, _, _ in uploaded:
+            FileUploadUtil.delete_file(file_path)
+        raise
+
+    for photo in photos:
+        if photo.file_type == "video":
+            background_tasks.add_task(enqueue_transcode, photo.id)
+
+    return [
+        PhotoResponse(
+            id=photo.id,
+            parrot_id=photo.parrot_id,
+            file_path=photo.file_path,
+            file_name=photo.file_name,
+            file_type=photo.file_type,
+            mime_type=photo.mime_type,
+            width=photo.width,
+            height=photo.height,
+            sort_order=photo.sort_order,
+            transcode_status=photo.transcode_status,
+            created_at=photo.created_at.isoformat(),
+        )
+        for photo in photos
+    ]
+
+
 @router.get("/{parrot_id}/mate", summary="获取鹦鹉配偶信息")
 def get_parrot_mate(parrot_id: int, db: Session = Depends(get_db)):
     """获取鹦鹉的配偶信息"""
@@ -456,11 +687,30 @@ def get_parrot_mate(parrot_id: int, db: Session = Depends(get_db)):
     }
 
 
+def _lock_parrots(db: Session, *parrot_ids: int) -> Dict[int, Parrot]:
+    """
+    以 SELECT ... FOR UPDATE 读取并锁定鹦鹉（重新读取会话中已有的对象），事务结束时释放
+
+    按ID升序加锁：配对、取消配对、销售、退货都按同一顺序锁定，同时配对 A-B 和 B-C 不会互相等待死锁。
+    SQLite 不支持 FOR UPDATE（语句中省略），并发修改由 Parrot.version 的比较检测，返回 409。
+    """
+    parrots = (
+        db.query(Parrot)
+        .filter(Parrot.id.in_(sorted(set(parrot_ids))))
+        .order_by(Parrot.id)
+        .with_for_update()
+        .populate_existing()
+        .all()
+    )
+    return {parrot.id: parrot for parrot in parrots}
+
+
 @router.post("/pair", summary="配对两只鹦鹉")
 def pair_parrots(pair_data: ParrotPairRequest, db: Session = Depends(get_db)):
     """将两只鹦鹉配对"""
-    male = db.query(Parrot).filter(Parrot.id == pair_data.male_id).first()
-    female = db.query(Parrot).filter(Parrot.id == pair_data.female_id).first()
+    locked = _lock_parrots(db, pair_data.male_id, pair_data.female_id)
+    male = locked.get(pair_data.male_id)
+    female = locked.get(pair_data.female_id)
 
     if not male:
         raise NotFoundException(f"未找到ID为 {pair_data.male_id} 的公鹦鹉")
@@ -568,6 +818,44 @@ def get_eligible_males(female_id: int, db: Session = Depends(get_db)):
     ]
 
 
+@router.get("/{parrot_id}/mate-recommendations", summary="获取配对推荐")
+def get_mate_recommendations(
+    parrot_id: int,
+    limit: int = Query(10, ge=1, le=100, description="返回的候选数量"),
+    max_kinship: float = Query(settings.MATE_MAX_KINSHIP, ge=0, le=1, description="允许的最大亲缘系数"),
+    db: Session = Depends(get_db),
+):
+    """
+    按亲缘系数、年龄差和品种为未配对的异性种鸟打分，返回得分最高的候选
+    亲缘系数高于 max_kinship 的候选（近亲）不会出现在结果中
+    """
+    parrot = db.query(Parrot).filter(Parrot.id == parrot_id).first()
+
+    if not parrot:
+        raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
+
+    if parrot.gender not in ("公", "母"):
+        raise BadRequestException("未验卡的鹦鹉无法推荐配偶")
+
+    ranked = recommend_mates(db, parrot, limit, max_kinship)
+
+    return FastJSONResponse([
+        MateRecommendationRow(
+            id=item.candidate.id,
+            breed=item.candidate.breed,
+            gender=item.candidate.gender,
+            ring_number=item.candidate.ring_number,
+            birth_date=item.candidate.birth_date,
+            health_notes=item.candidate.health_notes,
+            score=item.score,
+            kinship=round(item.kinship, 6),
+            age_gap_days=item.age_gap_days,
+            same_breed=item.same_breed,
+        )
+        for item in ranked
+    ])
+
+
 @router.post("/unpair/{parrot_id}", summary="取消配对")
 def unpair_parrot(parrot_id: int, db: Session = Depends(get_db)):
     """取消鹦鹉的配对关系"""
@@ -579,9 +867,14 @@ def unpair_parrot(parrot_id: int, db: Session = Depends(get_db)):
     if not parrot.mate_id:
         raise BadRequestException("该鹦鹉未配对")
 
-    mate = db.query(Parrot).filter(Parrot.id == parrot.mate_id).first()
+    # 配偶ID需先读取才知道，两只一起按顺序加锁后确认配对关系没有变化
+    mate_id = parrot.mate_id
+    mate = _lock_parrots(db, parrot_id, mate_id).get(mate_id)
+    if parrot.mate_id != mate_id:
+        raise ConflictException("配对关系已被修改，请刷新后重试")
 
-    if mate:
+    # 配偶已与其他鹦鹉配对时只解除本方，不破坏对方的配对
+    if mate and mate.mate_id == parrot.id:
         mate.mate_id = None
         mate.paired_at = None
         # 如果配偶状态是paired或incubating，改回breeding
@@ -609,11 +902,13 @@ def update_parrot_sale_info(
     db: Session = Depends(get_db)
 ):
     """更新鹦鹉的销售信息"""
-    parrot = db.query(Parrot).filter(Parrot.id == parrot_id).first()
+    parrot = _lock_parrots(db, parrot_id).get(parrot_id)
 
     if not parrot:
         raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
 
+    was_sold = parrot.status == "sold"
+
     # 更新销售信息
     parrot.seller = sale_data.seller
     parrot.buyer_name = sale_data.buyer_name
@@ -623,6 +918,10 @@ def update_parrot_sale_info(
     parrot.sale_notes = sale_data.notes
     parrot.status = "sold"
     parrot.sold_at = datetime.utcnow()
+    parrot_events.record_sale(db, parrot, was_sold)
+
+    # 按回访节奏生成/更新回访待办
+    follow_up_tasks.sync_current_sale(db, parrot)
 
     db.commit()
     db.refresh(parrot)
@@ -686,8 +985,10 @@ def create_follow_up(parrot_id: int, follow_up_data: FollowUpCreate, db: Session
     db.commit()
     db.refresh(follow_up)
 
-    # 更新鹦鹉的回访状态
+    # 更新鹦鹉的回访状态，并关闭最早到期的一条回访待办
     parrot.follow_up_status = follow_up_data.follow_up_status
+    parrot_events.record_follow_up(db, follow_up)
+    follow_up_tasks.record_follow_up(db, follow_up)
     db.commit()
 
     return FollowUpResponse(
@@ -742,7 +1043,7 @@ def get_parrot_follow_ups(
 @router.put("/{parrot_id}/return", response_model=ParrotResponse, summary="处理退货")
 def return_parrot(parrot_id: int, return_data: ParrotReturnUpdate, db: Session = Depends(get_db)):
     """处理鹦鹉退货"""
-    parrot = db.query(Parrot).filter(Parrot.id == parrot_id).first()
+    parrot = _lock_parrots(db, parrot_id).get(parrot_id)
 
     if not parrot:
         raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
@@ -765,10 +1066,13 @@ def return_parrot(parrot_id: int, return_data: ParrotReturnUpdate, db: Session =
             return_reason=return_data.return_reason
         )
         db.add(sales_history)
+        # 回访待办随销售记录转入历史
+        follow_up_tasks.attach_to_history(db, parrot_id, sales_history)
 
     # 记录退货信息
     parrot.returned_at = datetime.utcnow()
     parrot.return_reason = return_data.return_reason
+    parrot_events.record_return(db, parrot)
 
     # 清除当前销售信息（因为已保存到历史表）
     parrot.seller = None
@@ -783,12 +1087,11 @@ def return_parrot(parrot_id: int, return_data: ParrotReturnUpdate, db: Session =
 
     # 退货后状态变为待售（重新上架）
     parrot.status = "available"
+    follow_up_tasks.sync_current_sale(db, parrot)
 
     db.commit()
     db.refresh(parrot)
 
-    photo_count = db.query(Photo).filter(Photo.parrot_id == parrot.id).count()
-
     # 转换datetime为字符串
     created_at_str = parrot.created_at.isoformat() if parrot.created_at else None
     updated_at_str = parrot.updated_at.isoformat() if parrot.updated_at else None
@@ -809,132 +1112,27 @@ def return_parrot(parrot_id: int, return_data: ParrotReturnUpdate, db: Session =
         returned_at=returned_at_str,
         return_reason=parrot.return_reason,
         mate_id=parrot.mate_id,
+        incubation_record_id=parrot.incubation_record_id,
         paired_at=parrot.paired_at,
         status=parrot.status,
         created_at=created_at_str,
         updated_at=updated_at_str,
-        photo_count=photo_count,
+        photo_count=parrot.photo_count,
     )
 
 
 @router.get("/{parrot_id}/sales-timeline", summary="获取销售流程时间线")
 def get_sales_timeline(parrot_id: int, db: Session = Depends(get_db)):
-    """获取鹦鹉的销售流程时间线"""
+    """获取鹦鹉的销售流程时间线（读取按时间顺序追加的鹦鹉事件）"""
     parrot = db.query(Parrot).filter(Parrot.id == parrot_id).first()
 
     if not parrot:
         raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
 
-    timeline = []
-
-    # 1. 出生信息
-    if parrot.birth_date:
-        timeline.append({
-            "event": "出生",
-            "date": parrot.birth_date.isoformat(),
-            "description": f"鹦鹉出生",
-            "type": "birth"
-        })
-
-    # 2. 录入系统时间
-    if parrot.created_at:
-        timeline.append({
-            "event": "录入系统",
-            "date": parrot.created_at.isoformat(),
-            "description": f"鹦鹉信息录入系统",
-            "type": "system"
-        })
-
-    # 3. 销售历史记录
-    sales_history = db.query(SalesHistory).filter(SalesHistory.parrot_id == parrot_id).order_by(SalesHistory.sale_date).all()
-    for history in sales_history:
-        sale_price = float(history.sale_price) if history.sale_price else 0
-
-        timeline.append({
-            "event": f"第{len([h for h in sales_history if h.sale_date <= history.sale_date])}次销售",
-            "date": history.sale_date.isoformat(),
-            "description": f"售卖人: {history.seller}, 购买者: {history.buyer_name}, 价格: ¥{sale_price:.2f}",
-            "type": "sale",
-            "details": {
-                "seller": history.seller,
-                "buyer_name": history.buyer_name,
-                "sale_price": sale_price,
-                "contact": history.contact,
-                "follow_up_status": history.follow_up_status,
-                "notes": history.sale_notes
-            }
-        })
-
-        # 如果该次销售有退货，添加退货记录
-        if history.return_date:
-            timeline.append({
-                "event": "退货",
-                "date": history.return_date.isoformat(),
-                "description": f"退货原因: {history.return_reason}",
-                "type": "return"
-            })
-
-    # 4. 当前销售信息（如果还在销售中）
-    if parrot.sold_at:
-        sale_price = float(parrot.sale_price) if parrot.sale_price else 0
-
-        # 计算这是第几次销售
-        sales_count = len(sales_history) + 1
-
-        timeline.append({
-            "event": f"第{sales_count}次销售",
-            "date": parrot.sold_at.isoformat(),
-            "description": f"售卖人: {parrot.seller}, 购买者: {parrot.buyer_name}, 价格: ¥{sale_price:.2f}",
-            "type": "sale",
-            "details": {
-                "seller": parrot.seller,
-                "buyer_name": parrot.buyer_name,
-                "sale_price": sale_price,
-                "contact": parrot.contact,
-                "follow_up_status": parrot.follow_up_status,
-                "notes": parrot.sale_notes
-            }
-        })
-
-    # 5. 当前退货信息（如果刚退货但还没重新销售，且没有历史记录）
-    # 注意：如果有销售历史记录，退货信息已经在历史记录中显示了
-    if parrot.returned_at and not parrot.sold_at and not sales_history:
-        timeline.append({
-            "event": "退货",
-            "date": parrot.returned_at.isoformat(),
-            "description": f"退货原因: {parrot.return_reason}",
-            "type": "return"
-        })
-
-    # 6. 回访记录（按时间顺序）
-    follow_ups = db.query(FollowUp).filter(FollowUp.parrot_id == parrot_id).order_by(FollowUp.follow_up_date).all()
-    for follow_up in follow_ups:
-        # 将回访状态转换为中文
-        status_map = {
-            "pending": "待回访",
-            "completed": "已回访",
-            "no_contact": "无法联系"
-        }
-        status_text = status_map.get(follow_up.follow_up_status, follow_up.follow_up_status)
-
-        timeline.append({
-            "event": "回访",
-            "date": follow_up.follow_up_date.isoformat() if follow_up.follow_up_date else follow_up.created_at.isoformat(),
-            "description": f"回访状态: {status_text}, 备注: {follow_up.notes or '无'}",
-            "type": "follow_up",
-            "details": {
-                "follow_up_status": status_text,  # 存储中文状态
-                "notes": follow_up.notes
-            }
-        })
-
-    # 按时间排序（从早到晚）
-    timeline.sort(key=lambda x: x["date"])
-
-    return {
+    return FastJSONResponse({
         "parrot_id": parrot_id,
-        "timeline": timeline
-    }
+        "timeline": parrot_events.timeline(db, parrot),
+    })
 
 
 @router.get("/{parrot_id}/photos", response_model=List[PhotoResponse], summary="获取鹦鹉照片列表")
@@ -950,7 +1148,15 @@ def get_parrot_photos(parrot_id: int, db: Session = Depends(get_db)):
             parrot_id=photo.parrot_id,
             file_path=photo.file_path,
             file_name=photo.file_name,
+            file_type=photo.file_type,
+            mime_type=photo.mime_type,
+            width=photo.width,
+            height=photo.height,
             sort_order=photo.sort_order,
+            poster_path=photo.poster_path,
+            stream_path=photo.stream_path,
+            duration=photo.duration,
+            transcode_status=photo.transcode_status,
             created_at=photo.created_at.isoformat(),
         )
         for photo in photos
@@ -960,6 +1166,7 @@ def get_parrot_photos(parrot_id: int, db: Session = Depends(get_db)):
 @router.post("/{parrot_id}/photos", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED, summary="上传鹦鹉照片")
 async def upload_parrot_photo(
     parrot_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     sort_order: Optional[int] = Form(0),
     db: Session = Depends(get_db),
@@ -979,24 +1186,38 @@ async def upload_parrot_photo(
     if not file:
         raise BadRequestException("请选择要上传的文件")
 
-    file_path, original_filename = await FileUploadUtil.upload_photo(file, subfolder="parrots")
+    file_path, original_filename, media = await FileUploadUtil.upload_photo(file, subfolder="parrots")
+    file_type = media.kind
 
     photo = Photo(
         parrot_id=parrot_id,
         file_path=file_path,
         file_name=original_filename,
+        file_type=file_type,
+        mime_type=media.mime_type,
+        width=media.width,
+        height=media.height,
         sort_order=sort_order,
+        transcode_status="pending" if file_type == "video" else None,
     )
 
     db.add(photo)
     db.commit()
     db.refresh(photo)
 
+    if file_type == "video":
+        background_tasks.add_task(enqueue_transcode, photo.id)
+
     return PhotoResponse(
         id=photo.id,
         parrot_id=photo.parrot_id,
         file_path=photo.file_path,
         file_name=photo.file_name,
+        file_type=photo.file_type,
+        mime_type=photo.mime_type,
+        width=photo.width,
+        height=photo.height,
         sort_order=photo.sort_order,
+        transcode_status=photo.transcode_status,
         created_at=photo.created_at.isoformat(),
     )
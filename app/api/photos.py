@@ -1,17 +1,21 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, UploadFile, Form, HTTPException, status
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 
 from app.models import Photo, Parrot
-from app.schemas import PhotoResponse
+from app.schemas import PhotoResponse, PhotoBatchSortRequest
 from app.core import get_db, NotFoundException, BadRequestException
 from app.utils import FileUploadUtil
+from app.services import photo_stats
+from app.services.video_transcoder import enqueue_transcode
 
 router = APIRouter(prefix="/api/photos", tags=["照片管理"])
 
 
 @router.post("/upload", response_model=PhotoResponse, status_code=status.HTTP_201_CREATED, summary="上传照片")
 async def upload_photo(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     parrot_id: Optional[int] = Form(None),
     sort_order: Optional[int] = Form(0),
@@ -33,25 +37,40 @@ async def upload_photo(
         if not parrot:
             raise NotFoundException(f"未找到ID为 {parrot_id} 的鹦鹉")
 
-    file_path, original_filename = await FileUploadUtil.upload_photo(file, subfolder="parrots")
+    file_path, original_filename, media = await FileUploadUtil.upload_photo(file, subfolder="parrots")
+    file_type = media.kind
 
     photo = Photo(
         parrot_id=parrot_id,
         file_path=file_path,
         file_name=original_filename,
+        file_type=file_type,
+        mime_type=media.mime_type,
+        width=media.width,
+        height=media.height,
         sort_order=sort_order,
+        transcode_status="pending" if file_type == "video" else None,
     )
 
     db.add(photo)
     db.commit()
     db.refresh(photo)
 
+    # 视频在响应返回后转码，不阻塞上传请求
+    if file_type == "video":
+        background_tasks.add_task(enqueue_transcode, photo.id)
+
     return PhotoResponse(
         id=photo.id,
         parrot_id=photo.parrot_id,
         file_path=photo.file_path,
         file_name=photo.file_name,
+        file_type=photo.file_type,
+        mime_type=photo.mime_type,
+        width=photo.width,
+        height=photo.height,
         sort_order=photo.sort_order,
+        transcode_status=photo.transcode_status,
         created_at=photo.created_at.isoformat(),
     )
 
@@ -66,16 +85,50 @@ def delete_photo(photo_id: int, db: Session = Depends(get_db)):
     if not photo:
         raise NotFoundException(f"未找到ID为 {photo_id} 的照片")
 
-    file_path = photo.file_path
+    file_paths = [p for p in (photo.file_path, photo.poster_path, photo.stream_path) if p]
 
     db.delete(photo)
     db.commit()
 
-    FileUploadUtil.delete_file(file_path)
+    for file_path in file_paths:
+        FileUploadUtil.delete_file(file_path)
 
     return None
 
 
+@router.put("/sort", summary="批量更新照片排序")
+def update_photo_sort_batch(sort_data: PhotoBatchSortRequest, db: Session = Depends(get_db)):
+    """
+    批量更新照片排序权重，所有修改通过一条 UPDATE ... CASE 语句完成
+    """
+    orders = {item.id: item.sort_order for item in sort_data.items}
+
+    if len(orders) != len(sort_data.items):
+        raise BadRequestException("照片ID不能重复")
+
+    query = db.query(Photo.id, Photo.parrot_id).filter(Photo.id.in_(orders.keys()))
+    if sort_data.parrot_id is not None:
+        query = query.filter(Photo.parrot_id == sort_data.parrot_id)
+
+    rows = query.all()
+    found = {photo_id for photo_id, _ in rows}
+    missing = sorted(set(orders) - found)
+    if missing:
+        raise NotFoundException(f"未找到ID为 {', '.join(map(str, missing))} 的照片")
+
+    db.execute(
+        update(Photo)
+        .where(Photo.id.in_(orders.keys()))
+        .values(sort_order=case(orders, value=Photo.id))
+        .execution_options(synchronize_session=False)
+    )
+    # 批量 UPDATE 不经过 flush 事件，显式更新封面
+    photo_stats.refresh(db, {parrot_id for _, parrot_id in rows})
+    db.commit()
+
+    return [{"id": photo_id, "sort_order": sort_order} for photo_id, sort_order in orders.items()]
+
+
 @router.put("/{photo_id}/sort", summary="更新照片排序")
 def update_photo_sort(
     photo_id: int, sort_order: int = Form(...), db: Session = Depends(get_db)
@@ -97,6 +150,10 @@ def update_photo_sort(
         "parrot_id": photo.parrot_id,
         "file_path": photo.file_path,
         "file_name": photo.file_name,
+        "file_type": photo.file_type,
+        "poster_path": photo.poster_path,
+        "stream_path": photo.stream_path,
+        "duration": photo.duration,
         "sort_order": photo.sort_order,
         "created_at": photo.created_at.isoformat(),
     }
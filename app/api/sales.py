@@ -4,12 +4,40 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 
-from app.models import Parrot, SalesHistory, Photo
-from app.schemas import SaleRecordResponse, SaleRecordList
+from app.models import Parrot, SalesHistory
+from app.schemas import SaleRecordList
 from app.core import get_db
+from app.core.projection import Field, Projection, column_field
+from app.core.responses import FastJSONResponse
+from app.schemas.rows import Page, ParrotBrief, SaleParrotInfo, SaleRecordRow, SalesHistoryRow
+from app.services.breeds import breed_dictionary
 
 router = APIRouter(prefix="/api", tags=["销售管理"])
 
+# 销售记录列表 fields= 可选字段（与 SaleRecordRow 一致）
+SALE_RECORD_FIELDS = Projection(Parrot.id, {
+    "id": column_field(Parrot.id),
+    "parrot_id": column_field(Parrot.id),
+    "seller": column_field(Parrot.seller),
+    "buyer_name": column_field(Parrot.buyer_name),
+    "sale_price": Field((Parrot.sale_price,), lambda row: row.sale_price or None),
+    "contact": column_field(Parrot.contact),
+    "follow_up_status": Field((Parrot.follow_up_status,), lambda row: row.follow_up_status or "pending"),
+    "sale_notes": column_field(Parrot.sale_notes),
+    "sale_date": column_field(Parrot.sold_at),
+    "payment_method": Field((), lambda row: None),
+    "photo_url": Field(
+        (Parrot.cover_photo_path,),
+        lambda row: f"/uploads/{row.cover_photo_path}" if row.cover_photo_path else None,
+    ),
+    "created_at": column_field(Parrot.created_at),
+    "updated_at": column_field(Parrot.updated_at),
+    "parrot": Field(
+        (Parrot.breed, Parrot.ring_number, Parrot.gender),
+        lambda row: SaleParrotInfo(breed=row.breed, ring_number=row.ring_number, gender=row.gender),
+    ),
+})
+
 
 @router.get("/sales-records", response_model=SaleRecordList, summary="获取销售记录列表")
 def get_sales_records(
@@ -21,6 +49,7 @@ def get_sales_records(
     payment_method: Optional[str] = Query(None, description="支付方式"),
     start_date: Optional[str] = Query(None, description="销售开始日期(ISO格式)"),
     end_date: Optional[str] = Query(None, description="销售结束日期(ISO格式)"),
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，如 id,buyer_name,sale_price"),
 ):
     """
     获取销售记录列表(当前在售的鹦鹉)
@@ -38,7 +67,10 @@ def get_sales_records(
     - 销售信息（售卖人、购买者、价格、日期）
     - 回访状态
     - 支持分页
+    - fields: 只查询并返回指定字段
     """
+    field_names = SALE_RECORD_FIELDS.parse(fields)
+
     # 查询构建 - 只查询已售出的鹦鹉
     query = db.query(Parrot).filter(Parrot.status == "sold")
 
@@ -51,9 +83,9 @@ def get_sales_records(
             )
         )
 
-    # 品种筛选
+    # 品种筛选：名称在品种字典中匹配出ID，按整数键过滤
     if breed:
-        query = query.filter(Parrot.breed.contains(breed))
+        query = query.filter(Parrot.breed_id.in_(breed_dictionary.match(breed)))
 
     # 支付方式筛选 (注意: 当前Parrot表没有payment_method字段,这个功能需要扩展)
     # if payment_method:
@@ -79,37 +111,41 @@ def get_sales_records(
 
     # 分页
     offset = (page - 1) * size
-    parrots = query.order_by(Parrot.sold_at.desc()).offset(offset).limit(size).all()
+    query = query.order_by(Parrot.sold_at.desc()).offset(offset).limit(size)
+
+    if field_names is not None:
+        records = query.with_entities(*SALE_RECORD_FIELDS.columns(field_names)).all()
+        items = SALE_RECORD_FIELDS.rows(records, field_names)
+        return FastJSONResponse(Page(total=total, items=items, page=page, size=size))
+
+    parrots = query.all()
 
     # 构建响应
     items = []
     for parrot in parrots:
-        # Get first photo
-        first_photo = db.query(Photo).filter(Photo.parrot_id == parrot.id).order_by(Photo.sort_order.desc(), Photo.created_at.asc()).first()
-        photo_url = f"/uploads/{first_photo.file_path}" if first_photo else None
-
-        items.append(SaleRecordResponse(
+        items.append(SaleRecordRow(
             id=parrot.id,
             parrot_id=parrot.id,
             seller=parrot.seller,
             buyer_name=parrot.buyer_name,
-            sale_price=float(parrot.sale_price) if parrot.sale_price else None,
+            sale_price=parrot.sale_price or None,
             contact=parrot.contact,
             follow_up_status=parrot.follow_up_status or "pending",
             sale_notes=parrot.sale_notes,
-            sale_date=parrot.sold_at.isoformat() if parrot.sold_at else None,
+            sale_date=parrot.sold_at,
             payment_method=None,  # TODO: 需要在Parrot表添加payment_method字段
-            photo_url=photo_url,
-            created_at=parrot.created_at.isoformat() if parrot.created_at else None,
-            updated_at=parrot.updated_at.isoformat() if parrot.updated_at else None,
-            parrot={
-                "breed": parrot.breed,
-                "ring_number": parrot.ring_number,
-                "gender": parrot.gender,
-            }
+            photo_url=parrot.cover_photo_url,
+            created_at=parrot.created_at,
+            updated_at=parrot.updated_at,
+            parrot=SaleParrotInfo(
+                breed=parrot.breed,
+                ring_number=parrot.ring_number,
+                gender=parrot.gender,
+            ),
         ))
 
-    return SaleRecordList(total=total, items=items, page=page, size=size)
+    # 字段与 SaleRecordList 一致，直接序列化跳过 response_model 校验
+    return FastJSONResponse(Page(total=total, items=items, page=page, size=size))
 
 
 
@@ -177,31 +213,26 @@ def get_sales_history(
         # 获取关联的鹦鹉信息
         parrot = db.query(Parrot).filter(Parrot.id == history.parrot_id).first()
         
-        items.append({
-            "id": history.id,
-            "parrot_id": history.parrot_id,
-            "parrot": {
-                "id": parrot.id if parrot else None,
-                "breed": parrot.breed if parrot else None,
-                "gender": parrot.gender if parrot else None,
-                "ring_number": parrot.ring_number if parrot else None,
-            } if parrot else None,
-            "seller": history.seller,
-            "buyer_name": history.buyer_name,
-            "sale_price": float(history.sale_price) if history.sale_price else 0,
-            "contact": history.contact,
-            "follow_up_status": history.follow_up_status,
-            "sale_notes": history.sale_notes,
-            "sale_date": history.sale_date.isoformat() if history.sale_date else None,
-            "return_date": history.return_date.isoformat() if history.return_date else None,
-            "return_reason": history.return_reason,
-            "created_at": history.created_at.isoformat() if history.created_at else None,
-            "updated_at": history.updated_at.isoformat() if history.updated_at else None,
-        })
-
-    return {
-        "total": total,
-        "items": items,
-        "page": page,
-        "size": size
-    }
+        items.append(SalesHistoryRow(
+            id=history.id,
+            parrot_id=history.parrot_id,
+            parrot=ParrotBrief(
+                id=parrot.id,
+                breed=parrot.breed,
+                gender=parrot.gender,
+                ring_number=parrot.ring_number,
+            ) if parrot else None,
+            seller=history.seller,
+            buyer_name=history.buyer_name,
+            sale_price=history.sale_price or 0,
+            contact=history.contact,
+            follow_up_status=history.follow_up_status,
+            sale_notes=history.sale_notes,
+            sale_date=history.sale_date,
+            return_date=history.return_date,
+            return_reason=history.return_reason,
+            created_at=history.created_at,
+            updated_at=history.updated_at,
+        ))
+
+    return FastJSONResponse(Page(total=total, items=items, page=page, size=size))
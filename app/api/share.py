@@ -15,6 +15,7 @@ from app.schemas import (
     ShareLinkListResponse,
 )
 from app.core import get_db, NotFoundException, BadRequestException
+from app.core.cache import Expiring, cached_response, share_cache
 
 router = APIRouter(prefix="/api/share", tags=["分享管理"])
 
@@ -98,44 +99,38 @@ def generate_share_link(
 
 
 @router.get("/{token}", response_model=ShareDataResponse, summary="获取分享数据")
-def get_share_data(token: str, db: Session = Depends(get_db)):
+def get_share_data(token: str, request: Request, db: Session = Depends(get_db)):
     """
     根据token获取分享数据（公开接口）
     - 验证token有效性
     - 检查是否过期
     - 返回鹦鹉信息和媒体列表
     """
+    payload = share_cache.get_or_build(token, lambda: _share_data(db, token))
+    return cached_response(request, payload)
+
+
+def _share_data(db: Session, token: str):
+    """生成分享数据；有效链接的缓存有效期不超过链接的剩余有效期"""
     # 查找分享链接
     share_link = db.query(ShareLink).filter(ShareLink.token == token).first()
     
     if not share_link:
-        return ShareDataResponse(
-            status="invalid",
-            message="链接无效"
-        )
+        return ShareDataResponse(status="invalid", message="链接无效").model_dump()
 
     # 检查是否已删除（软删除）
     if not share_link.is_active:
-        return ShareDataResponse(
-            status="invalid",
-            message="链接已失效"
-        )
+        return ShareDataResponse(status="invalid", message="链接已失效").model_dump()
 
     # 检查是否过期
     now = datetime.utcnow()
     if share_link.expires_at <= now:
-        return ShareDataResponse(
-            status="expired",
-            message="链接已过期"
-        )
+        return ShareDataResponse(status="expired", message="链接已过期").model_dump()
 
     # 获取鹦鹉信息
     parrot = db.query(Parrot).filter(Parrot.id == share_link.parrot_id).first()
     if not parrot:
-        return ShareDataResponse(
-            status="invalid",
-            message="鹦鹉信息不存在"
-        )
+        return ShareDataResponse(status="invalid", message="鹦鹉信息不存在").model_dump()
 
     # 获取照片/视频列表
     photos = db.query(Photo).filter(Photo.parrot_id == parrot.id).order_by(Photo.sort_order, Photo.created_at).all()
@@ -157,16 +152,23 @@ def get_share_data(token: str, db: Session = Depends(get_db)):
             id=p.id,
             file_path=p.file_path,
             file_name=p.file_name,
-            file_type=p.file_type or 'image'
+            file_type=p.file_type or 'image',
+            mime_type=p.mime_type,
+            width=p.width,
+            height=p.height,
+            poster_path=p.poster_path,
+            stream_path=p.stream_path,
+            duration=p.duration,
         )
         for p in photos
     ]
 
-    return ShareDataResponse(
+    response = ShareDataResponse(
         status="valid",
         parrot=parrot_info,
         photos=photo_list
     )
+    return Expiring(response.model_dump(), (share_link.expires_at - now).total_seconds())
 
 
 @router.get("/list/{parrot_id}", response_model=ShareLinkListResponse, summary="获取分享链接列表")
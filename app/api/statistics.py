@@ -1,19 +1,20 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import Dict, List
 from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
 
 from app.models import Parrot
 from app.schemas import StatisticsOverview
 from app.core import get_db
+from app.core.cache import cached_response, statistics_cache
+from app.services.breeds import breed_dictionary
 
 router = APIRouter(prefix="/api", tags=["统计分析"])
 
 
 @router.get("/statistics", response_model=StatisticsOverview, summary="获取统计概览")
-def get_statistics_overview(db: Session = Depends(get_db)):
+def get_statistics_overview(request: Request, db: Session = Depends(get_db)):
     """
     获取统计概览数据
 
@@ -27,6 +28,11 @@ def get_statistics_overview(db: Session = Depends(get_db)):
         - breed_counts: 品种统计
         - total_revenue: 总收入
     """
+    payload = statistics_cache.get_or_build("overview", lambda: _statistics_overview(db).model_dump())
+    return cached_response(request, payload)
+
+
+def _statistics_overview(db: Session) -> StatisticsOverview:
     # 基础统计
     total_parrots = db.query(Parrot).count()
     available_parrots = db.query(Parrot).filter(Parrot.status == "available").count()
@@ -34,13 +40,17 @@ def get_statistics_overview(db: Session = Depends(get_db)):
     returned_parrots = db.query(Parrot).filter(Parrot.status == "returned").count()
     paired_parrots = db.query(Parrot).filter(Parrot.status == "paired").count()
 
-    # 品种统计
+    # 品种统计：按品种ID分组，名称取自品种字典
     breed_stats = (
-        db.query(Parrot.breed, func.count(Parrot.id))
-        .group_by(Parrot.breed)
+        db.query(Parrot.breed_id, func.count(Parrot.id))
+        .group_by(Parrot.breed_id)
         .all()
     )
-    breed_counts: Dict[str, int] = {breed: count for breed, count in breed_stats}
+    names = breed_dictionary.names(db, [breed_id for breed_id, _ in breed_stats])
+    breed_counts: Dict[str, int] = {}
+    for breed_id, count in breed_stats:
+        name = names.get(breed_id, "未知品种")
+        breed_counts[name] = breed_counts.get(name, 0) + count
 
     # 总收入统计 (已售的)
     total_revenue_result = (
@@ -62,7 +72,7 @@ def get_statistics_overview(db: Session = Depends(get_db)):
 
 
 @router.get("/statistics/monthly-sales", summary="获取月度销售数据")
-def get_monthly_sales(db: Session = Depends(get_db)):
+def get_monthly_sales(request: Request, db: Session = Depends(get_db)):
     """
     获取月度销售数据，用于图表展示
 
@@ -79,6 +89,13 @@ def get_monthly_sales(db: Session = Depends(get_db)):
             ]
         }
     """
+    payload = statistics_cache.get_or_build("monthly-sales", lambda: _monthly_sales(db))
+    return cached_response(request, payload)
+
+
+def _monthly_sales(db: Session) -> dict:
+    from dateutil.relativedelta import relativedelta  # 仅此接口使用，延迟导入以加快启动
+
     # 获取过去12个月的数据
     end_date = datetime.now().replace(day=1)  # 当前月第一天
     start_date = end_date - relativedelta(months=11)  # 11个月前
@@ -122,9 +139,8 @@ def get_monthly_sales(db: Session = Depends(get_db)):
     }
 
 
-
 @router.get("/statistics/sales", summary="获取销售统计")
-def get_sales_statistics(db: Session = Depends(get_db)):
+def get_sales_statistics(request: Request, db: Session = Depends(get_db)):
     """
     获取销售统计数据
     
@@ -143,6 +159,11 @@ def get_sales_statistics(db: Session = Depends(get_db)):
     - 退货率 = (退货数量 / 总销售数量) × 100%
     - 平均价格 = 总销售额 / 总销售数量
     """
+    payload = statistics_cache.get_or_build("sales", lambda: _sales_statistics(db))
+    return cached_response(request, payload)
+
+
+def _sales_statistics(db: Session) -> dict:
     from app.models import SalesHistory
     
     # 当前在售数量(Parrot表中status=sold)
@@ -191,7 +212,7 @@ def get_sales_statistics(db: Session = Depends(get_db)):
 
 
 @router.get("/statistics/returns", summary="获取退货统计")
-def get_return_statistics(db: Session = Depends(get_db)):
+def get_return_statistics(request: Request, db: Session = Depends(get_db)):
     """
     获取退货统计数据
     
@@ -209,6 +230,11 @@ def get_return_statistics(db: Session = Depends(get_db)):
     - 退货管理页面的统计卡片
     - 销售质量分析
     """
+    payload = statistics_cache.get_or_build("returns", lambda: _return_statistics(db))
+    return cached_response(request, payload)
+
+
+def _return_statistics(db: Session) -> dict:
     from app.models import SalesHistory
     
     # 总销售数量
@@ -0,0 +1,26 @@
+"""增量同步API模块"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core import get_db
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.services import sync
+
+router = APIRouter(prefix="/api/sync", tags=["增量同步"])
+
+
+@router.get("", summary="获取增量变更")
+def get_sync_changes(
+    since: int = Query(0, ge=0, description="上次同步返回的 version，0 表示全量"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="本次最多返回的变更条数"),
+    db: Session = Depends(get_db),
+):
+    """
+    返回 since 之后新增/修改的鹦鹉（含销售信息）和孵化记录，以及已删除的行ID。
+    客户端按ID合并到本地副本并保存 version；has_more 为 true 时继续拉取。
+    """
+    page = sync.changes_since(db, since, limit or settings.SYNC_PAGE_SIZE)
+    return FastJSONResponse(page)
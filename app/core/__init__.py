@@ -1,5 +1,5 @@
 from app.core.config import settings
 from app.core.database import Base, get_db
-from app.core.exceptions import ParrotManagementException, NotFoundException, BadRequestException
+from app.core.exceptions import ParrotManagementException, NotFoundException, BadRequestException, ConflictException
 
-__all__ = ["settings", "Base", "get_db", "ParrotManagementException", "NotFoundException", "BadRequestException"]
+__all__ = ["settings", "Base", "get_db", "ParrotManagementException", "NotFoundException", "BadRequestException", "ConflictException"]
@@ -0,0 +1,159 @@
+"""响应数据缓存
+
+PayloadCache 按键缓存已经序列化好的 JSON 字节串，同时保存 gzip/br 压缩后的版本，
+命中时根据请求的 Accept-Encoding 直接返回对应字节，不再重复序列化和压缩。
+
+条目在 TTL 到期或相关表发生变更（见 app.core.change_hooks）时失效。
+缓存只在当前进程内有效，多进程部署时各进程独立缓存，依靠 TTL 保证最终一致。
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import Request, Response
+
+from app.core.change_hooks import on_commit
+from app.core.compression import available_encodings, compress, negotiate_encoding
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.responses import dumps
+
+
+@dataclass
+class CachedPayload:
+    """一个缓存条目：原始 JSON 与各编码的压缩版本"""
+    raw: bytes
+    expires_at: float
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def body_for(self, encoding: Optional[str]) -> bytes:
+        if encoding and encoding in self.encoded:
+            return self.encoded[encoding]
+        return self.raw
+
+
+@dataclass
+class Expiring:
+    """build() 返回此对象时可以为单个条目指定更短的有效期（秒）"""
+    content: Any
+    ttl: float
+
+
+def build_payload(content: Any, ttl: float) -> CachedPayload:
+    raw = dumps(content)
+    payload = CachedPayload(raw=raw, expires_at=time.monotonic() + ttl)
+    if settings.COMPRESSION_ENABLED and len(raw) >= settings.COMPRESSION_MINIMUM_SIZE:
+        for encoding in available_encodings():
+            payload.encoded[encoding] = compress(raw, encoding)
+    return payload
+
+
+class PayloadCache:
+    """带 TTL 和容量上限（LRU）的进程内缓存"""
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 1024, tables: Iterable[str] = ()):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.tables = frozenset(tables)
+        self._entries: "OrderedDict[Any, CachedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次 clear() 加一；build() 期间发生过失效时不缓存结果，避免写回失效前读到的旧数据
+        self._generation = 0
+
+    def get(self, key: Any) -> Optional[CachedPayload]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            if payload.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: Any, payload: CachedPayload, generation: Optional[int] = None) -> None:
+        """generation 为开始构建时的代数，其间缓存被清空过则不写入"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_build(self, key: Any, build: Callable[[], Any]) -> CachedPayload:
+        """获取缓存条目，未命中时调用 build() 生成内容并缓存"""
+        payload = self.get(key) if self.ttl > 0 else None
+        record_cache(self.name, payload is not None)
+        if payload is None:
+            generation = self._generation
+            content = build()
+            ttl = self.ttl
+            if isinstance(content, Expiring):
+                content, ttl = content.content, min(content.ttl, self.ttl)
+            payload = build_payload(content, ttl)
+            if ttl > 0:
+                self.set(key, payload, generation)
+        return payload
+
+
+_caches: List[PayloadCache] = []
+
+
+def register_cache(cache: PayloadCache) -> PayloadCache:
+    """登记缓存，关联表变更时自动清空"""
+    _caches.append(cache)
+    return cache
+
+
+@on_commit
+def _invalidate(tables) -> None:
+    for cache in _caches:
+        if cache.tables & tables:
+            cache.clear()
+
+
+def cached_response(request: Request, payload: CachedPayload) -> Response:
+    """按客户端支持的编码返回缓存内容，已压缩的内容不会被压缩中间件再次处理"""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", "")) if payload.encoded else None
+    body = payload.body_for(encoding)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding and encoding in payload.encoded:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# 统计接口缓存：任意销售/鹦鹉数据变更后失效
+statistics_cache = register_cache(PayloadCache(
+    "statistics",
+    ttl=settings.STATISTICS_CACHE_TTL,
+    max_entries=32,
+    tables={"parrots", "sales_history", "follow_ups"},
+))
+
+# 分享页数据缓存：按 token 缓存
+share_cache = register_cache(PayloadCache(
+    "share",
+    ttl=settings.SHARE_CACHE_TTL,
+    max_entries=2048,
+    tables={"parrots", "photos", "share_links"},
+))
+
+# 鹦鹉筛选计数缓存：按筛选条件缓存
+facets_cache = register_cache(PayloadCache(
+    "facets",
+    ttl=settings.FACETS_CACHE_TTL,
+    max_entries=512,
+    tables={"parrots"},
+))
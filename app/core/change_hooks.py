@@ -0,0 +1,74 @@
+"""数据变更通知
+
+在 SessionLocal 上注册 SQLAlchemy 会话事件：flush 时记录本事务中新增/修改/删除的表，
+事务提交后把变更的表名集合通知给注册的监听函数（缓存失效等）。回滚的事务不会通知。
+
+    from app.core.change_hooks import on_commit
+
+    @on_commit
+    def _invalidate(tables):
+        if "parrots" in tables:
+            ...
+
+Query.update()/delete() 批量操作不经过 flush，通过 do_orm_execute 事件记录。
+只在当前进程内通知，多进程部署时其他进程的缓存依靠 TTL 过期。
+"""
+import logging
+from typing import Callable, List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ChangeListener = Callable[[Set[str]], None]
+
+_listeners: List[ChangeListener] = []
+
+_INFO_KEY = "changed_tables"
+
+
+def on_commit(listener: ChangeListener) -> ChangeListener:
+    """注册事务提交后的回调，参数为本事务变更的表名集合；可用作装饰器"""
+    _listeners.append(listener)
+    return listener
+
+
+def _changed(session: Session) -> Set[str]:
+    return session.info.setdefault(_INFO_KEY, set())
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    changed = _changed(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            changed.add(table)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _do_orm_execute(orm_execute_state) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _changed(orm_execute_state.session).add(mapper.local_table.name)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session: Session) -> None:
+    changed = session.info.pop(_INFO_KEY, None)
+    if not changed:
+        return
+    for listener in _listeners:
+        try:
+            listener(changed)
+        except Exception:
+            logger.exception("变更通知处理失败: %s", listener)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
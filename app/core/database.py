@@ -1,6 +1,10 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool, QueuePool
 from app.core.config import settings
 import logging
@@ -49,8 +53,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# 批量请求（/api/batch）期间各子请求共用的会话
+_shared_session: ContextVar[Optional[Session]] = ContextVar("shared_session", default=None)
+
+
 def get_db():
     """获取数据库会话"""
+    shared = _shared_session.get()
+    if shared is not None:
+        # 共用会话由创建方关闭
+        yield shared
+        return
     db = SessionLocal()
     try:
         yield db
@@ -58,6 +71,16 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def shared_session(db: Session):
+    """在此上下文中（包括线程池中执行的同步接口）get_db 返回同一个会话"""
+    token = _shared_session.set(db)
+    try:
+        yield db
+    finally:
+        _shared_session.reset(token)
+
+
 def init_db():
     """初始化数据库表"""
     Base.metadata.create_all(bind=engine)
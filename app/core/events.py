@@ -0,0 +1,173 @@
+"""进程内事件总线（实时推送）
+
+写操作提交后发布事件（见 app.services.live_updates），/api/events/stream 的 SSE 连接订阅总线。
+每个事件只序列化一次，格式化好的 SSE 帧经后端传递，再原样分发给当前进程的所有订阅者。
+
+    from app.core.events import event_bus
+
+    event_bus.publish("change", {"parrots": {"upserted": [1], "deleted": []}})
+
+后端由 EVENT_BUS_URL 决定：
+- 留空：LocalBackend，只在当前进程内分发（单进程部署、本地开发）
+- redis://...：RedisBackend，经 Redis pub/sub 在多个 worker 之间广播（需要安装 redis）
+
+publish() 可以在任意线程调用（同步接口运行在线程池中），分发在事件循环中进行；
+事件总线未启动（命令行工具）时 LocalBackend 的事件直接丢弃。
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Optional, Set
+
+from app.core.config import settings
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[bytes], None]
+
+
+class LocalBackend:
+    """进程内后端：发布的消息直接交给本进程分发"""
+
+    cross_process = False
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def stop(self) -> None:
+        self._deliver = None
+
+    def publish(self, message: bytes) -> None:
+        if self._deliver is not None:
+            self._deliver(message)
+
+
+class RedisBackend:
+    """Redis pub/sub 后端：发布到频道，后台线程订阅频道并分发给本进程"""
+
+    cross_process = True
+
+    def __init__(self, url: str, channel: str):
+        import redis  # 可选依赖，只在配置了 Redis 时导入
+
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: lambda message: deliver(message["data"])})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def publish(self, message: bytes) -> None:
+        self._client.publish(self.channel, message)
+
+
+def create_backend(url: str, channel: str):
+    if not url:
+        return LocalBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url, channel)
+    raise ValueError(f"不支持的 EVENT_BUS_URL: {url}")
+
+
+def format_event(event: str, data: Any) -> bytes:
+    """格式化为一个 SSE 帧（JSON 不含换行，data 只占一行）"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """一个订阅者的消息队列，队列满时标记为落后，由连接方断开后重连"""
+
+    def __init__(self, bus: "EventBus", max_size: int):
+        self._bus = bus
+        self._queue: "asyncio.Queue[bytes]" = asyncio.Queue(max_size)
+        self.lagging = False
+
+    def put(self, frame: bytes) -> None:
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """等待下一个事件帧，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """发布事件到后端，并把后端收到的事件分发给本进程的订阅者"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def has_listeners(self) -> bool:
+        """是否可能有订阅者（跨进程后端无法得知其他进程的订阅情况）"""
+        return self.backend.cross_process or bool(self._subscribers)
+
+    def start(self) -> None:
+        """在应用 lifespan 中调用，绑定当前事件循环"""
+        self._loop = asyncio.get_running_loop()
+        self.backend.start(self._deliver)
+
+    def stop(self) -> None:
+        self.backend.stop()
+        self._loop = None
+        self._subscribers.clear()
+
+    def publish(self, event: str, data: Any) -> None:
+        """发布事件，可在任意线程调用；失败只记录日志，不影响写操作"""
+        try:
+            self.backend.publish(format_event(event, data))
+        except Exception:
+            logger.exception("事件发布失败: %s", event)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, settings.EVENTS_QUEUE_SIZE)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def _deliver(self, frame: bytes) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._fanout, frame)
+
+    def _fanout(self, frame: bytes) -> None:
+        for subscription in list(self._subscribers):
+            subscription.put(frame)
+
+
+event_bus = EventBus(create_backend(settings.EVENT_BUS_URL, settings.EVENT_BUS_CHANNEL))
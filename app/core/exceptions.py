@@ -1,6 +1,7 @@
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.requests import Request
+from sqlalchemy.orm.exc import StaleDataError
 
 
 class ParrotManagementException(Exception):
@@ -29,6 +30,13 @@ class FileUploadException(ParrotManagementException):
         super().__init__(self.message)
 
 
+class ConflictException(ParrotManagementException):
+    """并发修改冲突异常（数据已被其他请求修改）"""
+    def __init__(self, message: str = "数据已被修改，请刷新后重试"):
+        self.message = message
+        super().__init__(self.message)
+
+
 def exception_handler(request: Request, exc: Exception):
     """全局异常处理"""
     if isinstance(exc, NotFoundException):
@@ -46,6 +54,17 @@ def exception_handler(request: Request, exc: Exception):
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"detail": exc.message}
         )
+    elif isinstance(exc, ConflictException):
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": exc.message}
+        )
+    elif isinstance(exc, StaleDataError):
+        # 带版本号的行在读取之后被其他事务修改（version 比较失败）
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": ConflictException().message}
+        )
     else:
         # 对于未处理的异常，返回500错误
         return JSONResponse(
@@ -0,0 +1,301 @@
+"""写请求幂等（Idempotency-Key）
+
+小程序在网络不稳定时会重试销售、退货、配对、上传等写请求，重复执行会产生重复的销售历史、
+重复的照片文件。客户端为每次操作生成一个键，放在 Idempotency-Key 请求头中，重试时沿用同一个键：
+
+- 第一次请求在 idempotency_keys 表插入一行占位（主键为键本身，多进程并发时只有一个能插入成功），
+  执行完成后保存状态码和响应体
+- 同一个键的重试只按主键查一行：已完成时直接返回保存的响应（响应头 Idempotent-Replayed: true），
+  不再执行；仍在处理中时返回 409，客户端稍后重试；用于其他接口或请求体不同（如改了价格、
+  换了文件）时返回 422
+- 5xx、未处理的异常、409/429 不保存结果，删除占位，重试会重新执行；处理中的占位超过
+  IDEMPOTENCY_LOCK_TIMEOUT_SECONDS 仍未完成（进程中断）时允许重新执行
+
+只处理 /api/ 下带 Idempotency-Key 请求头的 POST/PUT/PATCH/DELETE 请求，没有该请求头时不做任何事。
+结果保存 IDEMPOTENCY_TTL_SECONDS，过期的行由后台任务 purge_expired() 清理。
+"""
+import hashlib
+import logging
+import re
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.exceptions import ParrotManagementException, exception_handler
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+MAX_KEY_LENGTH = 100
+
+# 这些状态码表示暂时无法处理，重试可能得到不同结果，不保存
+_TRANSIENT_STATUS = {409, 429}
+
+# 请求体先读入临时文件，超过这个大小时写入磁盘（上传的照片/视频）
+_SPOOL_MEMORY_BYTES = 1024 * 1024
+
+_CHUNK_SIZE = 64 * 1024
+
+_BOUNDARY = re.compile(r'boundary="?([^";,]+)"?', re.IGNORECASE)
+
+_table = IdempotencyKey.__table__
+
+
+def fingerprint(method: str, path: str, query_string: bytes, body_digest: str) -> str:
+    """请求摘要：同一个键只能用于同一个接口、同样的请求体"""
+    return hashlib.sha256(b"\n".join([method.encode(), path.encode(), query_string, body_digest.encode()])).hexdigest()
+
+
+class _BodyHasher:
+    """
+    请求体摘要；multipart 请求的分隔符（boundary）每次请求随机生成，计算时去掉，
+    同一个文件的重试得到同样的摘要
+    """
+
+    def __init__(self, boundary: Optional[bytes]):
+        self._hash = hashlib.sha256()
+        self._boundary = boundary
+        self._carry = b""
+
+    def update(self, chunk: bytes) -> None:
+        if not self._boundary:
+            self._hash.update(chunk)
+            return
+        data = (self._carry + chunk).replace(self._boundary, b"")
+        # 末尾可能是被分块截断的分隔符，留到下一块一起处理
+        keep = min(len(self._boundary) - 1, len(data))
+        self._hash.update(data[:len(data) - keep])
+        self._carry = data[len(data) - keep:]
+
+    def hexdigest(self) -> str:
+        self._hash.update(self._carry)
+        self._carry = b""
+        return self._hash.hexdigest()
+
+
+class _BufferedBody:
+    """先读完请求体并计算摘要（执行前需确定请求指纹），再按原样交给应用读取"""
+
+    def __init__(self, receive: Receive):
+        self._receive = receive
+        self._spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_BYTES)
+        self._size = 0
+        self._sent = 0
+        self._replayed = False
+        self.digest = ""
+        self.disconnected = False
+
+    async def read(self, scope: Scope) -> None:
+        content_type = Headers(scope=scope).get("content-type", "")
+        match = _BOUNDARY.search(content_type) if content_type.lower().startswith("multipart/") else None
+        hasher = _BodyHasher(match.group(1).encode("latin-1") if match else None)
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self.disconnected = True
+                return
+            chunk = message.get("body", b"")
+            hasher.update(chunk)
+            if self._size + len(chunk) > _SPOOL_MEMORY_BYTES:
+                await run_in_threadpool(self._spool.write, chunk)
+            else:
+                self._spool.write(chunk)
+            self._size += len(chunk)
+            if not message.get("more_body", False):
+                break
+        self._spool.seek(0)
+        self.digest = hasher.hexdigest()
+
+    async def receive(self) -> Message:
+        if self._replayed:
+            # 请求体已全部交给应用，之后的 receive 用于检测客户端断开
+            return await self._receive()
+        if self._size > _SPOOL_MEMORY_BYTES:
+            chunk = await run_in_threadpool(self._spool.read, _CHUNK_SIZE)
+        else:
+            chunk = self._spool.read(_CHUNK_SIZE)
+        self._sent += len(chunk)
+        more_body = self._sent < self._size
+        self._replayed = not more_body
+        return {"type": "http.request", "body": chunk, "more_body": more_body}
+
+    def close(self) -> None:
+        self._spool.close()
+
+
+def _claim(key: str, digest: str) -> Optional[tuple]:
+    """插入占位行；键已存在时返回已有的行"""
+    now = datetime.utcnow()
+    try:
+        with engine.begin() as connection:
+            connection.execute(insert(_table).values(
+                key=key,
+                fingerprint=digest,
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            ))
+        return None
+    except IntegrityError:
+        pass
+    with engine.connect() as connection:
+        return connection.execute(
+            select(_table.c.fingerprint, _table.c.status_code, _table.c.content_type, _table.c.body)
+            .where(_table.c.key == key)
+        ).first()
+
+
+def _take_over(key: str) -> bool:
+    """删除已过期或处理中断的行；多个请求同时接管时只有一个删除成功"""
+    now = datetime.utcnow()
+    abandoned = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+    with engine.begin() as connection:
+        result = connection.execute(delete(_table).where(
+            _table.c.key == key,
+            or_(
+                _table.c.expires_at < now,
+                and_(_table.c.status_code.is_(None), _table.c.created_at < abandoned),
+            ),
+        ))
+    return result.rowcount == 1
+
+
+def _complete(key: str, status_code: int, content_type: Optional[str], body: bytes) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            update(_table)
+            .where(_table.c.key == key)
+            .values(status_code=status_code, content_type=content_type, body=body)
+        )
+
+
+def _release(key: str) -> None:
+    """删除处理中的占位，重试时重新执行"""
+    with engine.begin() as connection:
+        connection.execute(delete(_table).where(_table.c.key == key, _table.c.status_code.is_(None)))
+
+
+def purge_expired() -> int:
+    """删除过期的幂等键（后台定时任务）"""
+    with engine.begin() as connection:
+        deleted = connection.execute(delete(_table).where(_table.c.expires_at < datetime.utcnow())).rowcount
+    if deleted:
+        logger.info("已清理过期幂等键: %d 条", deleted)
+    return deleted
+
+
+class IdempotencyMiddleware:
+    """按 Idempotency-Key 请求头去重写请求；需在 CORS 中间件内层，重放的响应也带跨域响应头"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        key = Headers(scope=scope).get(HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key 长度应为 1-{MAX_KEY_LENGTH} 个字符")(scope, receive, send)
+            return
+
+        body = _BufferedBody(receive)
+        try:
+            await body.read(scope)
+            if body.disconnected:
+                return
+            digest = fingerprint(scope["method"], scope["path"], scope.get("query_string", b""), body.digest)
+            existing = await run_in_threadpool(_claim, key, digest)
+            if existing is not None and await run_in_threadpool(_take_over, key):
+                existing = await run_in_threadpool(_claim, key, digest)
+
+            if existing is not None:
+                await _replay(existing, digest)(scope, body.receive, send)
+                return
+
+            await self._execute(key, scope, body.receive, send)
+        finally:
+            body.close()
+
+    async def _execute(self, key: str, scope: Scope, receive: Receive, send: Send) -> None:
+        status_code = 500
+        content_type: Optional[str] = None
+        chunks: List[bytes] = []
+        size = 0
+        completed = False
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code, content_type, size, completed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type")
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                    chunks.append(body)
+                if not message.get("more_body", False):
+                    completed = True
+                    await self._finish(key, status_code, content_type, b"".join(chunks), size)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except Exception as exc:
+            if completed:
+                raise
+            if isinstance(exc, ParrotManagementException):
+                # 应用异常由最外层的异常处理器转换为 4xx 响应，这里按同样的转换保存结果
+                response = exception_handler(None, exc)
+                await self._finish(key, response.status_code, response.media_type, response.body, len(response.body))
+            else:
+                await run_in_threadpool(_release, key)
+            raise
+        if not completed:
+            await run_in_threadpool(_release, key)
+
+    async def _finish(self, key: str, status_code: int, content_type: Optional[str], body: bytes, size: int) -> None:
+        if status_code >= 500 or status_code in _TRANSIENT_STATUS:
+            await run_in_threadpool(_release, key)
+        elif size > settings.IDEMPOTENCY_MAX_RESPONSE_BYTES:
+            logger.warning("响应体 %d 字节超过 IDEMPOTENCY_MAX_RESPONSE_BYTES，不保存幂等结果: %s", size, key)
+            await run_in_threadpool(_release, key)
+        else:
+            await run_in_threadpool(_complete, key, status_code, content_type, body)
+
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+
+def _replay(row: Tuple, digest: str):
+    stored_fingerprint, status_code, content_type, body = row
+    if stored_fingerprint != digest:
+        return _error(422, "Idempotency-Key 已用于其他请求（接口或请求体不同）")
+    if status_code is None:
+        response = _error(409, "相同 Idempotency-Key 的请求正在处理，请稍后重试")
+        response.headers["Retry-After"] = "1"
+        return response
+    return Response(
+        content=body or b"",
+        status_code=status_code,
+        media_type=content_type,
+        headers={"Idempotent-Replayed": "true"},
+    )
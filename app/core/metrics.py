@@ -0,0 +1,216 @@
+"""Prometheus 监控指标
+
+prometheus-client 为可选依赖，未安装时所有记录函数为空操作，
+/metrics 退回到进程内的SQL统计输出。指标对象在第一次使用时才创建。
+
+多进程部署（uvicorn --workers N / gunicorn）时需要在启动前设置
+PROMETHEUS_MULTIPROC_DIR 环境变量指向一个空目录，各进程的指标写入该目录，
+/metrics 汇总所有进程的数据；进程中的 Gauge 按存活进程求和。
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.exceptions import exception_handler
+from app.core.query_stats import RequestQueryStats, current_query_stats, query_stats_registry, route_template
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class _Metrics:
+    """指标对象集合，首次使用时创建"""
+
+    def __init__(self):
+        from prometheus_client import Counter, Gauge, Histogram
+
+        self.request_latency = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by templated route",
+            ["method", "route", "status"],
+            buckets=_LATENCY_BUCKETS,
+        )
+        self.requests_in_progress = Gauge(
+            "http_requests_in_progress",
+            "HTTP requests currently being handled",
+            ["method"],
+            multiprocess_mode="livesum",
+        )
+        self.db_statements = Histogram(
+            "db_statements_per_request",
+            "SQL statements executed per request",
+            ["route"],
+            buckets=_STATEMENT_BUCKETS,
+        )
+        self.db_time = Histogram(
+            "db_time_per_request_seconds",
+            "Time spent in SQL per request",
+            ["route"],
+            buckets=_LATENCY_BUCKETS,
+        )
+        self.db_pool_checked_out = Gauge(
+            "db_pool_checked_out_connections",
+            "Connections currently checked out of the pool",
+            multiprocess_mode="livesum",
+        )
+        self.db_pool_overflow = Gauge(
+            "db_pool_overflow_connections",
+            "Connections opened beyond pool_size",
+            multiprocess_mode="livesum",
+        )
+        self.upload_bytes = Counter(
+            "upload_bytes",
+            "Bytes written by file uploads (use rate() for bytes/sec)",
+            ["kind"],
+        )
+        self.cache_requests = Counter(
+            "cache_requests",
+            "Cache lookups by cache name and result",
+            ["cache", "result"],
+        )
+
+
+_metrics: Optional[_Metrics] = None
+_unavailable = False
+_init_lock = threading.Lock()
+
+
+def get_metrics() -> Optional[_Metrics]:
+    """
+    返回指标集合；未安装 prometheus-client 时返回 None
+
+    prometheus_client 导入较慢，推迟到第一次记录指标时再导入，不计入应用启动时间。
+    """
+    global _metrics, _unavailable
+    if _metrics is not None or _unavailable:
+        return _metrics
+
+    with _init_lock:
+        if _metrics is None and not _unavailable:
+            try:
+                _metrics = _Metrics()
+            except ImportError:  # 可选依赖
+                _unavailable = True
+    return _metrics
+
+
+def metrics_enabled() -> bool:
+    return get_metrics() is not None
+
+
+def _multiprocess_dir() -> Optional[str]:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+
+
+def render_metrics() -> bytes:
+    """生成 /metrics 输出"""
+    if get_metrics() is None:
+        return query_stats_registry.render_prometheus().encode("utf-8")
+
+    import prometheus_client
+
+    if _multiprocess_dir():
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry)
+
+    return prometheus_client.generate_latest()
+
+
+def mark_process_dead() -> None:
+    """多进程模式下进程退出时清理该进程的 live gauge 数据"""
+    if _metrics is not None and _multiprocess_dir():
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def observe_request_db(route: str, stats: RequestQueryStats) -> None:
+    """记录单个请求的SQL语句数和耗时"""
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.db_statements.labels(route).observe(stats.count)
+    metrics.db_time.labels(route).observe(stats.total_time)
+
+
+def record_upload_bytes(size: int, kind: str = "media") -> None:
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.upload_bytes.labels(kind).inc(size)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """记录缓存命中情况，命中率 = hit / (hit + miss)"""
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.cache_requests.labels(cache, "hit" if hit else "miss").inc()
+
+
+def install_pool_metrics(engine: Engine) -> None:
+    """在连接池签出/归还时刷新连接池指标（仅 QueuePool 有这些统计）"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "overflow"):
+        return
+
+    def _update(*_args):
+        metrics = get_metrics()
+        if metrics is not None:
+            metrics.db_pool_checked_out.set(pool.checkedout())
+            metrics.db_pool_overflow.set(max(pool.overflow(), 0))
+
+    event.listen(pool, "checkout", _update)
+    event.listen(pool, "checkin", _update)
+
+
+class MetricsMiddleware:
+    """
+    记录每个请求的延迟直方图和处理中请求数
+
+    需要注册在 QueryStatsMiddleware 内层，以便读取当前请求的SQL统计。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        metrics = get_metrics() if scope["type"] == "http" else None
+        if metrics is None:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = metrics.requests_in_progress.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as exc:
+            # 未在内层转换为响应的异常由最外层的异常处理器转换，这里按同样的转换记录状态码
+            status_code = exception_handler(None, exc).status_code
+            raise
+        finally:
+            in_progress.dec()
+            route = route_template(scope)
+            metrics.request_latency.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+
+            stats = current_query_stats()
+            if stats is not None:
+                observe_request_db(route, stats)
@@ -0,0 +1,66 @@
+"""稀疏字段（列表接口的 fields= 参数）
+
+列表接口默认返回完整的数据行。选择器等只需要少数字段的页面可以传 fields=id,ring_number,breed，
+每个输出字段声明它依赖的列，查询只 SELECT 这些列（Query.with_entities），不加载
+health_notes、sale_notes 等大文本列；每行序列化为只含所选字段的字典。
+
+    PARROT_FIELDS = Projection(Parrot.id, {
+        "id": column_field(Parrot.id),
+        "photo_url": Field((Parrot.cover_photo_path,), lambda row: ...),
+    })
+
+    names = PARROT_FIELDS.parse(fields)          # None 表示未指定，返回完整数据行
+    rows = query.with_entities(*PARROT_FIELDS.columns(names)).all()
+    items = PARROT_FIELDS.rows(rows, names)
+"""
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.exceptions import BadRequestException
+
+
+@dataclass(frozen=True)
+class Field:
+    """一个输出字段：依赖的列，以及从查询行计算字段值的函数"""
+    columns: Tuple[Any, ...]
+    value: Callable[[Any], Any]
+
+
+def column_field(column) -> Field:
+    """直接输出一列的字段"""
+    return Field((column,), attrgetter(column.key))
+
+
+class Projection:
+    """一个列表接口的可选字段；key 为总是查询的主键列"""
+
+    def __init__(self, key, fields: Dict[str, Field]):
+        self.key = key
+        self.fields = fields
+
+    def parse(self, fields: Optional[str]) -> Optional[List[str]]:
+        """解析逗号分隔的字段列表，保持请求中的顺序；未指定时返回 None"""
+        if fields is None:
+            return None
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        if not names:
+            return None
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise BadRequestException(
+                f"不支持的字段: {', '.join(unknown)}，可选字段: {', '.join(self.fields)}"
+            )
+        return names
+
+    def columns(self, names: Iterable[str]) -> List[Any]:
+        """所选字段依赖的列（去重，包含主键列）"""
+        columns: Dict[str, Any] = {self.key.key: self.key}
+        for name in names:
+            for column in self.fields[name].columns:
+                columns.setdefault(column.key, column)
+        return list(columns.values())
+
+    def rows(self, records: Iterable[Any], names: List[str]) -> List[Dict[str, Any]]:
+        getters = [(name, self.fields[name].value) for name in names]
+        return [{name: value(record) for name, value in getters} for record in records]
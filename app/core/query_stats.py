@@ -0,0 +1,252 @@
+"""请求级SQL统计
+
+通过 SQLAlchemy 的 before/after_cursor_execute 事件统计每个请求执行的语句数、
+数据库总耗时和最慢语句，由中间件输出为 Server-Timing 响应头和结构化日志，
+并按路由模板汇总供 /metrics 导出。超过阈值的慢查询会记录 SQL 及其执行计划。
+"""
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.exceptions import exception_handler
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("app.request")
+slow_query_logger = logging.getLogger("app.slow_query")
+
+# 日志中保留的SQL最大长度
+STATEMENT_LOG_LIMIT = 2000
+
+_EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+@dataclass
+class RequestQueryStats:
+    """单个请求的SQL统计"""
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """当前请求的SQL统计，不在请求上下文中时返回 None"""
+    return _current_stats.get()
+
+
+@dataclass
+class RouteQueryTotals:
+    """单个路由的累计统计"""
+    requests: int = 0
+    statements: int = 0
+    db_seconds: float = 0.0
+    request_seconds: float = 0.0
+
+
+class QueryStatsRegistry:
+    """按 (方法, 路由模板) 汇总的进程内统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteQueryTotals] = {}
+        self.slow_queries_total = 0
+
+    def record_request(self, method: str, route: str, stats: RequestQueryStats, duration: float) -> None:
+        with self._lock:
+            totals = self._routes.setdefault((method, route), RouteQueryTotals())
+            totals.requests += 1
+            totals.statements += stats.count
+            totals.db_seconds += stats.total_time
+            totals.request_seconds += duration
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self.slow_queries_total += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], RouteQueryTotals]:
+        with self._lock:
+            return {key: RouteQueryTotals(**vars(value)) for key, value in self._routes.items()}
+
+    def render_prometheus(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = [
+            "# HELP app_db_statements_total SQL statements executed, by route",
+            "# TYPE app_db_statements_total counter",
+        ]
+        snapshot = self.snapshot()
+        for (method, route), totals in sorted(snapshot.items()):
+            lines.append(f'app_db_statements_total{{method="{method}",route="{route}"}} {totals.statements}')
+
+        lines += [
+            "# HELP app_db_seconds_total Time spent in SQL statements, by route",
+            "# TYPE app_db_seconds_total counter",
+        ]
+        for (method, route), totals in sorted(snapshot.items()):
+            lines.append(f'app_db_seconds_total{{method="{method}",route="{route}"}} {totals.db_seconds:.6f}')
+
+        lines += [
+            "# HELP app_requests_total Requests handled, by route",
+            "# TYPE app_requests_total counter",
+        ]
+        for (method, route), totals in sorted(snapshot.items()):
+            lines.append(f'app_requests_total{{method="{method}",route="{route}"}} {totals.requests}')
+
+        lines += [
+            "# HELP app_slow_queries_total SQL statements slower than the configured threshold",
+            "# TYPE app_slow_queries_total counter",
+            f"app_slow_queries_total {self.slow_queries_total}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+query_stats_registry = QueryStatsRegistry()
+
+
+def _explain(conn, cursor, statement: str, parameters) -> Optional[list]:
+    """使用同一个 DBAPI 连接获取 SELECT 语句的执行计划"""
+    prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if not prefix or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        return [tuple(row) for row in explain_cursor.fetchall()]
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 计时保存在执行上下文上，SQLite 的 StaticPool 下多个请求共享同一个连接
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, "_query_start_time", None)
+    if start_time is None:
+        return
+    elapsed = time.perf_counter() - start_time
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    query_stats_registry.record_slow_query()
+
+    plan = None
+    if settings.SLOW_QUERY_EXPLAIN and not executemany:
+        try:
+            plan = _explain(conn, cursor, statement, parameters)
+        except Exception as e:
+            logger.debug("获取执行计划失败: %s", e)
+
+    slow_query_logger.warning(json.dumps({
+        "event": "slow_query",
+        "duration_ms": round(elapsed * 1000, 2),
+        "statement": statement[:STATEMENT_LOG_LIMIT],
+        "parameters": repr(parameters)[:STATEMENT_LOG_LIMIT],
+        "plan": [list(map(str, row)) for row in plan] if plan else None,
+    }, ensure_ascii=False))
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """在引擎上注册SQL计时事件"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope: Scope) -> str:
+    """返回匹配到的路由模板（如 /api/parrots/{parrot_id}），避免按原始路径统计"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("endpoint") is not None:
+        # 挂载的静态目录等
+        return scope.get("root_path") or "<mount>"
+    return "<unmatched>"
+
+
+class QueryStatsMiddleware:
+    """为每个HTTP请求收集SQL统计，写入 Server-Timing 响应头和请求日志"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries", '
+                    f'db-slowest;dur={stats.slowest_time * 1000:.2f}, '
+                    f'app;dur={app_ms:.2f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except Exception as exc:
+            # 未在内层转换为响应的异常由最外层的异常处理器转换（没有 Server-Timing），日志记录同样的状态码
+            status_code = exception_handler(None, exc).status_code
+            raise
+        finally:
+            _current_stats.reset(token)
+            duration = time.perf_counter() - start
+            route = route_template(scope)
+            query_stats_registry.record_request(scope["method"], route, stats, duration)
+
+            if settings.REQUEST_LOG_ENABLED:
+                request_logger.info(json.dumps({
+                    "event": "request",
+                    "method": scope["method"],
+                    "route": route,
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "db_queries": stats.count,
+                    "db_time_ms": round(stats.total_time * 1000, 2),
+                    "db_slowest_ms": round(stats.slowest_time * 1000, 2),
+                    "db_slowest_statement": (stats.slowest_statement or "")[:200] or None,
+                }, ensure_ascii=False))
@@ -0,0 +1,58 @@
+"""JSON 响应序列化
+
+FastJSONResponse 作为应用的默认响应类，使用 orjson 序列化，原生支持 datetime/date、
+dataclass，Decimal 按 float 输出（与 jsonable_encoder 的行为一致）。
+未安装 orjson 时退回标准库 json。
+
+列表接口直接返回 FastJSONResponse(Page(...))，数据行为 app.schemas.rows 中的 dataclass，
+跳过 FastAPI 的 jsonable_encoder / response_model 二次校验。
+"""
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """orjson 不能直接序列化的类型"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """序列化为 UTF-8 JSON 字节串"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_stdlib_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """基于 orjson 的 JSON 响应"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
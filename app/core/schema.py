@@ -0,0 +1,90 @@
+"""启动时的数据库结构处理
+
+由 SCHEMA_MODE 配置决定，在应用 lifespan 中执行一次（不在模块导入时访问数据库）：
+
+- create: 直接 create_all 建表，适合本地开发和 SQLite
+- check:  结构由 Alembic 迁移维护（部署时执行 alembic upgrade head），
+          启动时只检查数据库版本是否为最新、模型中的表是否都存在，不一致则拒绝启动
+- off:    不做任何处理
+"""
+import logging
+import os
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models  # noqa: F401  确保所有模型已注册到 Base.metadata
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_MODES = ("create", "check", "off")
+
+_ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+class SchemaMismatchError(RuntimeError):
+    """数据库结构与代码不一致"""
+
+
+def alembic_head() -> Optional[str]:
+    """迁移脚本的最新版本号；未安装 alembic 时返回 None"""
+    try:
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+    except ImportError:
+        return None
+
+    config = Config(_ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(_ALEMBIC_INI), "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return None
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def missing_tables(engine: Engine) -> List[str]:
+    existing = set(inspect(engine).get_table_names())
+    return sorted(name for name in Base.metadata.tables if name not in existing)
+
+
+def check_schema(engine: Engine) -> None:
+    """检查数据库已迁移到最新版本，不一致时抛出 SchemaMismatchError"""
+    missing = missing_tables(engine)
+    head = alembic_head()
+
+    if head is not None:
+        revision = current_revision(engine)
+        if revision is None:
+            if missing:
+                raise SchemaMismatchError("数据库没有 Alembic 版本记录，请先执行: alembic upgrade head")
+            raise SchemaMismatchError(
+                "数据库已有表但没有 Alembic 版本记录：由旧版本自动建表的数据库请执行 "
+                "alembic stamp 0001 && alembic upgrade head，按当前模型建表的数据库执行 alembic stamp head"
+            )
+        if revision != head:
+            raise SchemaMismatchError(f"数据库版本 {revision} 不是最新的 {head}，请执行: alembic upgrade head")
+    else:
+        logger.warning("未安装 alembic，只检查表是否存在")
+
+    if missing:
+        raise SchemaMismatchError(f"数据库缺少表: {', '.join(missing)}")
+
+
+def prepare_schema(engine: Engine, mode: Optional[str] = None) -> None:
+    """按 SCHEMA_MODE 处理数据库结构"""
+    mode = (mode or settings.SCHEMA_MODE).lower()
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"未知的 SCHEMA_MODE: {mode}，可选值: {', '.join(SCHEMA_MODES)}")
+
+    if mode == "create":
+        Base.metadata.create_all(bind=engine)
+    elif mode == "check":
+        check_schema(engine)
+        logger.info("数据库结构检查通过")
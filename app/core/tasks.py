@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    在应用生命周期内周期性执行的后台任务
+
+    同步函数通过 asyncio.to_thread 在线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], object], initial_delay: Optional[float] = None):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.initial_delay = interval if initial_delay is None else initial_delay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+            logger.info("后台任务已启动: %s (间隔 %ss)", self.name, self.interval)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            try:
+                await asyncio.to_thread(self.func)
+            except Exception:
+                logger.exception("后台任务执行失败: %s", self.name)
+            await asyncio.sleep(self.interval)
@@ -1,8 +1,13 @@
 from app.models.parrot import Parrot
+from app.models.breed import Breed, BreedAlias
 from app.models.photo import Photo
 from app.models.follow_up import FollowUp
 from app.models.sales_history import SalesHistory
 from app.models.incubation_record import IncubationRecord
 from app.models.share_link import ShareLink
+from app.models.follow_up_task import FollowUpTask
+from app.models.parrot_event import ParrotEvent
+from app.models.sync_change import SyncChange
+from app.models.idempotency_key import IdempotencyKey
 
-__all__ = ["Parrot", "Photo", "FollowUp", "SalesHistory", "IncubationRecord", "ShareLink"]
+__all__ = ["Parrot", "Breed", "BreedAlias", "Photo", "FollowUp", "SalesHistory", "IncubationRecord", "ShareLink", "FollowUpTask", "ParrotEvent", "SyncChange", "IdempotencyKey"]
@@ -0,0 +1,33 @@
+from datetime import datetime
+from app.core.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+
+
+class Breed(Base):
+    """品种维表；鹦鹉通过 breed_id 关联，筛选和统计按整数键进行"""
+    __tablename__ = "breeds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False, comment="规范名称")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, comment="创建时间")
+
+    # 别名（包括规范名称本身），录入时按别名归并到同一品种
+    aliases = relationship("BreedAlias", back_populates="breed", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<Breed(id={self.id}, name={self.name})>"
+
+
+class BreedAlias(Base):
+    """品种别名：归一化后的写法 -> 品种（见 app.services.breeds.breed_key）"""
+    __tablename__ = "breed_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    alias = Column(String(100), unique=True, nullable=False, comment="归一化后的别名")
+    breed_id = Column(Integer, ForeignKey("breeds.id", ondelete="CASCADE"), nullable=False, index=True, comment="品种ID")
+
+    breed = relationship("Breed", back_populates="aliases")
+
+    def __repr__(self):
+        return f"<BreedAlias(alias={self.alias}, breed_id={self.breed_id})>"
@@ -0,0 +1,39 @@
+from datetime import datetime
+from app.core.database import Base
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+
+class FollowUpTask(Base):
+    """
+    回访待办
+
+    每次销售按 FOLLOW_UP_CADENCE_DAYS 生成若干条（如售出后第 3/7/30 天），
+    sale_history_id 为空表示鹦鹉当前这次销售，退货后指向转存的销售历史记录。
+    """
+    __tablename__ = "follow_up_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    parrot_id = Column(Integer, ForeignKey("parrots.id", ondelete="CASCADE"), nullable=False, index=True, comment="鹦鹉ID")
+    sale_history_id = Column(Integer, ForeignKey("sales_history.id", ondelete="CASCADE"), nullable=True, index=True, comment="销售历史ID，为空表示当前销售")
+    sold_at = Column(DateTime, nullable=False, comment="所属销售的售出时间")
+    cadence_days = Column(Integer, nullable=False, comment="售出后第几天回访")
+    due_date = Column(Date, nullable=False, comment="到期日期")
+    status = Column(String(20), nullable=False, default="pending", comment="状态: pending/completed/no_contact/cancelled")
+    buyer_name = Column(String(100), nullable=True, comment="购买者姓名")
+    contact = Column(String(100), nullable=True, comment="联系方式")
+    follow_up_id = Column(Integer, ForeignKey("follow_ups.id", ondelete="SET NULL"), nullable=True, comment="完成时登记的回访记录ID")
+    completed_at = Column(DateTime, nullable=True, comment="完成时间")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("parrot_id", "sold_at", "cadence_days", name="uq_follow_up_tasks_sale_cadence"),
+        # 待办列表按 (到期日, ID) 做键集分页
+        Index("ix_follow_up_tasks_status_due_date_id", "status", "due_date", "id"),
+    )
+
+    parrot = relationship("Parrot", back_populates="follow_up_tasks")
+
+    def __repr__(self):
+        return f"<FollowUpTask(id={self.id}, parrot_id={self.parrot_id}, due_date={self.due_date}, status={self.status})>"
@@ -0,0 +1,22 @@
+from app.core.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+
+
+class IdempotencyKey(Base):
+    """
+    写请求的幂等键（见 app.core.idempotency）
+
+    status_code 为空表示请求正在处理；完成后保存状态码和响应体，过期后清理。
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(100), primary_key=True, comment="客户端提供的 Idempotency-Key")
+    fingerprint = Column(String(64), nullable=False, comment="请求方法、路径、查询字符串与请求体摘要的 SHA-256")
+    status_code = Column(Integer, nullable=True, comment="响应状态码，处理中为空")
+    content_type = Column(String(100), nullable=True, comment="响应 Content-Type")
+    body = Column(LargeBinary, nullable=True, comment="响应体")
+    created_at = Column(DateTime, nullable=False, comment="创建时间")
+    expires_at = Column(DateTime, nullable=False, index=True, comment="过期时间")
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key={self.key}, status_code={self.status_code})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -16,9 +16,17 @@ class IncubationRecord(Base):
     hatched_count = Column(Integer, default=0, comment="成功孵化数量")
     status = Column(String(50), default="incubating", comment="孵化状态：incubating孵化中/hatched已孵化/completed已完成/failed失败")
     notes = Column(Text, nullable=True, comment="备注信息")
+    overdue_at = Column(DateTime, nullable=True, comment="超过预计孵化日期仍未出壳时由调度任务标记的时间")
     created_at = Column(DateTime, default=datetime.utcnow, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
 
+    __table_args__ = (
+        # 调度器按状态取进行中的记录并按预计孵化日期排序
+        Index("ix_incubation_records_status_expected_hatch_date", "status", "expected_hatch_date"),
+    )
+
     # 关联关系
     father = relationship("Parrot", foreign_keys=[father_id])
     mother = relationship("Parrot", foreign_keys=[mother_id])
+    # 该窝孵出并已录入系统的子代
+    offspring = relationship("Parrot", foreign_keys="Parrot.incubation_record_id", back_populates="incubation_record")
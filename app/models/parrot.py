@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Optional
 from app.core.database import Base
-from sqlalchemy import Column, Integer, String, DateTime, Date, Numeric, Text, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Date, Numeric, Text, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
 
@@ -8,7 +9,9 @@ class Parrot(Base):
     __tablename__ = "parrots"
 
     id = Column(Integer, primary_key=True, index=True)
-    breed = Column(String(100), nullable=False, index=True, comment="品种")
+    # 品种名称与 breeds.name 一致（冗余，便于直接显示），写入时由 app.services.breeds 归一化并设置 breed_id
+    breed = Column(String(100), nullable=False, comment="品种")
+    breed_id = Column(Integer, ForeignKey("breeds.id", name="fk_parrots_breed_id"), nullable=True, index=True, comment="品种ID")
     price = Column(Numeric(precision=10, scale=2), nullable=True, comment="价格")
     min_price = Column(Numeric(precision=10, scale=2), nullable=True, comment="最低价格")
     max_price = Column(Numeric(precision=10, scale=2), nullable=True, comment="最高价格")
@@ -22,11 +25,39 @@ class Parrot(Base):
     sold_at = Column(DateTime, nullable=True, index=True, comment="销售时间")
     returned_at = Column(DateTime, nullable=True, comment="退货时间")
     return_reason = Column(String(500), nullable=True, comment="退货原因")
+    # 乐观锁版本号：ORM 每次 UPDATE 加 1，并以 WHERE version = 读取时的值 比较，
+    # 读取之后被其他事务修改过时抛出 StaleDataError（全局异常处理器返回 409）
+    version = Column(Integer, nullable=False, default=1, server_default="1", comment="版本号")
+
+    __table_args__ = (
+        # 按状态 + 年龄（出生日期区间）筛选；计数查询只需读取索引
+        Index("ix_parrots_status_birth_date", "status", "birth_date"),
+    )
+    __mapper_args__ = {"version_id_col": version}
 
     # 配对相关字段
     mate_id = Column(Integer, ForeignKey("parrots.id"), nullable=True, comment="配偶ID")
     paired_at = Column(DateTime, nullable=True, comment="配对时间")
 
+    # 血统：出壳于哪一窝孵化记录（父母即该记录的 father_id/mother_id）
+    incubation_record_id = Column(
+        Integer,
+        ForeignKey("incubation_records.id", ondelete="SET NULL", use_alter=True, name="fk_parrots_incubation_record_id"),
+        nullable=True,
+        index=True,
+        comment="来源孵化记录ID",
+    )
+
+    # 照片统计（冗余字段，由 app.services.photo_stats 在照片变化时维护）
+    photo_count = Column(Integer, nullable=False, default=0, server_default="0", comment="照片数量")
+    cover_photo_id = Column(
+        Integer,
+        ForeignKey("photos.id", ondelete="SET NULL", use_alter=True, name="fk_parrots_cover_photo_id"),
+        nullable=True,
+        comment="封面照片ID",
+    )
+    cover_photo_path = Column(String(500), nullable=True, comment="封面预览图路径（视频为封面帧）")
+
     # 销售信息字段
     seller = Column(String(100), nullable=True, comment="售卖人")
     buyer_name = Column(String(100), nullable=True, comment="购买者姓名")
@@ -35,8 +66,10 @@ class Parrot(Base):
     follow_up_status = Column(String(20), default="pending", comment="回访状态: pending/completed/no_contact")
     sale_notes = Column(Text, nullable=True, comment="销售备注")
 
+    # 关联品种
+    breed_ref = relationship("Breed")
     # 关联照片
-    photos = relationship("Photo", back_populates="parrot", cascade="all, delete-orphan")
+    photos = relationship("Photo", back_populates="parrot", foreign_keys="Photo.parrot_id", cascade="all, delete-orphan")
     # 自引用关系，用于配对
     mate = relationship("Parrot", foreign_keys=[mate_id], remote_side=[id], back_populates="paired_parrots")
     paired_parrots = relationship("Parrot", foreign_keys=[mate_id], back_populates="mate")
@@ -48,5 +81,16 @@ class Parrot(Base):
     father_incubation_records = relationship("IncubationRecord", foreign_keys="IncubationRecord.father_id", back_populates="father", cascade="all, delete-orphan")
     # 关联孵化记录（作为母亲）
     mother_incubation_records = relationship("IncubationRecord", foreign_keys="IncubationRecord.mother_id", back_populates="mother", cascade="all, delete-orphan")
+    # 来源孵化记录
+    incubation_record = relationship("IncubationRecord", foreign_keys=[incubation_record_id], back_populates="offspring")
     # 关联分享链接
     share_links = relationship("ShareLink", back_populates="parrot", cascade="all, delete-orphan")
+    # 关联回访待办
+    follow_up_tasks = relationship("FollowUpTask", back_populates="parrot", cascade="all, delete-orphan")
+    # 关联事件（销售时间线）
+    events = relationship("ParrotEvent", back_populates="parrot", cascade="all, delete-orphan")
+
+    @property
+    def cover_photo_url(self) -> Optional[str]:
+        """封面预览图URL，无照片时为 None"""
+        return f"/uploads/{self.cover_photo_path}" if self.cover_photo_path else None
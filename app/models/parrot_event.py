@@ -0,0 +1,34 @@
+from datetime import datetime
+from app.core.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+
+class ParrotEvent(Base):
+    """
+    鹦鹉事件（只追加）
+
+    销售、退货、回访、状态变更、孵化等写操作各追加一条，销售时间线按
+    (parrot_id, occurred_at, id) 索引顺序读取即可，不再从多张表拼装。
+    sale_seq 为第几次销售，仅销售相关事件有值。
+    """
+    __tablename__ = "parrot_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    parrot_id = Column(Integer, ForeignKey("parrots.id", ondelete="CASCADE"), nullable=False, comment="鹦鹉ID")
+    event_type = Column(String(20), nullable=False, comment="类型: system/sale/sale_update/return/follow_up/status/incubation")
+    title = Column(String(50), nullable=False, comment="事件名称")
+    occurred_at = Column(DateTime, nullable=False, comment="发生时间")
+    description = Column(Text, nullable=True, comment="描述")
+    details = Column(JSON, nullable=True, comment="详细信息")
+    sale_seq = Column(Integer, nullable=True, comment="第几次销售")
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_parrot_events_parrot_occurred", "parrot_id", "occurred_at", "id"),
+    )
+
+    parrot = relationship("Parrot", back_populates="events")
+
+    def __repr__(self):
+        return f"<ParrotEvent(id={self.id}, parrot_id={self.parrot_id}, type={self.event_type})>"
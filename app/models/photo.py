@@ -1,6 +1,6 @@
 from datetime import datetime
 from app.core.database import Base
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
 from sqlalchemy.orm import relationship
 
 
@@ -15,5 +15,22 @@ class Photo(Base):
     sort_order = Column(Integer, nullable=False, default=0, comment="排序权重")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
+    # 上传时从文件头读取的媒体信息，便于客户端预留布局
+    mime_type = Column(String(50), nullable=True, comment="文件真实MIME类型")
+    width = Column(Integer, nullable=True, comment="图片宽度(像素)")
+    height = Column(Integer, nullable=True, comment="图片高度(像素)")
+
+    # 视频衍生文件（由转码工作器生成）
+    poster_path = Column(String(500), nullable=True, comment="视频封面帧路径")
+    stream_path = Column(String(500), nullable=True, comment="转码后的流媒体MP4路径")
+    duration = Column(Float, nullable=True, comment="视频时长(秒)")
+    transcode_status = Column(String(20), nullable=True, index=True, comment="转码状态: pending/processing/done/failed")
+    transcode_started_at = Column(DateTime, nullable=True, comment="最近一次开始转码的时间（识别中断的 processing）")
+
     # 关联鹦鹉
-    parrot = relationship("Parrot", back_populates="photos")
+    parrot = relationship("Parrot", back_populates="photos", foreign_keys=[parrot_id])
+
+    @property
+    def preview_path(self) -> str:
+        """列表/分享页使用的轻量预览图：视频优先使用封面帧"""
+        return self.poster_path or self.file_path
@@ -0,0 +1,28 @@
+from datetime import datetime
+from app.core.database import Base
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, UniqueConstraint
+
+
+class SyncChange(Base):
+    """
+    增量同步变更日志
+
+    id 单调递增，作为同步版本号；每行数据只保留最近一次变更（再次变更时删除旧记录、
+    插入新记录），deleted=True 表示该行已删除（墓碑）。
+    """
+    __tablename__ = "sync_changes"
+
+    id = Column(Integer, primary_key=True, comment="同步版本号")
+    table_name = Column(String(50), nullable=False, comment="表名")
+    row_id = Column(Integer, nullable=False, comment="行ID")
+    deleted = Column(Boolean, nullable=False, default=False, comment="是否已删除")
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow, comment="变更时间")
+
+    __table_args__ = (
+        UniqueConstraint("table_name", "row_id", name="uq_sync_changes_table_row"),
+        # 变更时会删除旧记录，SQLite 需要 AUTOINCREMENT 才能保证不复用已删除的最大ID
+        {"sqlite_autoincrement": True},
+    )
+
+    def __repr__(self):
+        return f"<SyncChange(id={self.id}, table={self.table_name}, row_id={self.row_id}, deleted={self.deleted})>"
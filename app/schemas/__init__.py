@@ -3,6 +3,9 @@ from app.schemas.photo import *
 from app.schemas.statistics import *
 from app.schemas.incubation import *
 from app.schemas.share import *
+from app.schemas.lineage import *
+from app.schemas.batch import *
+from app.schemas.breed import *
 
 __all__ = [
     "ParrotCreate",
@@ -17,9 +20,12 @@ __all__ = [
     "FollowUpCreate",
     "FollowUpResponse",
     "FollowUpList",
+    "FollowUpTaskComplete",
     "ParrotReturnUpdate",
     "PhotoUpload",
     "PhotoResponse",
+    "PhotoSortItem",
+    "PhotoBatchSortRequest",
     "StatisticsOverview",
     "IncubationRecordCreate",
     "IncubationRecordUpdate",
@@ -33,4 +39,15 @@ __all__ = [
     "ParrotShareInfo",
     "PhotoInfo",
     "ShareLinkListResponse",
+    "LineageParrot",
+    "LineageEntry",
+    "LineageResponse",
+    "PedigreeNode",
+    "OffspringLinkRequest",
+    "BatchSubRequest",
+    "BatchRequest",
+    "BreedSuggestion",
+    "BreedResponse",
+    "BreedAliasCreate",
+    "BreedMergeRequest",
 ]
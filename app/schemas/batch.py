@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class BatchSubRequest(BaseModel):
+    """批量请求中的一个子请求"""
+    id: Optional[str] = Field(None, description="客户端自定义标识，原样返回")
+    method: str = Field("GET", description="GET / POST / PUT / DELETE")
+    path: str = Field(..., description="接口路径，可带查询参数，如 /api/parrots/1/photos")
+    body: Optional[Any] = Field(None, description="JSON 请求体")
+
+
+class BatchRequest(BaseModel):
+    """批量请求：子请求按顺序执行，共用一个数据库会话"""
+    requests: List[BatchSubRequest] = Field(..., min_length=1, description="子请求列表")
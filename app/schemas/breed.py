@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class BreedSuggestion(BaseModel):
+    """品种自动补全条目"""
+    id: int
+    name: str
+    parrot_count: int = Field(..., description="鹦鹉数量（品种字典加载时统计）")
+
+
+class BreedResponse(BaseModel):
+    """品种详情"""
+    id: int
+    name: str
+    aliases: List[str] = Field(default_factory=list, description="归一化后的别名")
+
+
+class BreedAliasCreate(BaseModel):
+    """添加品种别名请求"""
+    alias: str = Field(..., min_length=1, max_length=100, description="别名，如常见的错别字或简称")
+
+
+class BreedMergeRequest(BaseModel):
+    """合并品种请求"""
+    target_id: int = Field(..., description="并入的品种ID")
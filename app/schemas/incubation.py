@@ -57,6 +57,7 @@ class IncubationRecordResponse(BaseModel):
     hatched_count: int
     status: str
     notes: Optional[str] = None
+    overdue_at: Optional[str] = None
     created_at: str
     updated_at: str
     father: Optional[ParrotInfo] = None
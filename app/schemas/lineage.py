@@ -0,0 +1,44 @@
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class LineageParrot(BaseModel):
+    """系谱中的鹦鹉信息"""
+    id: int
+    breed: str
+    gender: str
+    ring_number: Optional[str] = None
+    birth_date: Optional[date] = None
+    status: str
+
+    class Config:
+        from_attributes = True
+
+
+class LineageEntry(BaseModel):
+    """系谱中的一条亲子关系"""
+    depth: int = Field(..., description="相对查询鹦鹉的代数，1 表示父母/子女")
+    parent_id: int
+    child_id: int
+    relation: str = Field(..., description="father/mother，表示 parent 是 child 的父亲还是母亲")
+    parrot: LineageParrot = Field(..., description="该关系中远离查询鹦鹉一端的鹦鹉")
+
+
+class LineageResponse(BaseModel):
+    """祖先/后代查询响应"""
+    parrot_id: int
+    generations: int
+    total: int
+    items: List[LineageEntry]
+
+
+class PedigreeNode(LineageParrot):
+    """系谱树节点"""
+    father: Optional["PedigreeNode"] = None
+    mother: Optional["PedigreeNode"] = None
+
+
+class OffspringLinkRequest(BaseModel):
+    """关联子代请求"""
+    parrot_ids: List[int] = Field(..., min_length=1, description="子代鹦鹉ID列表")
@@ -18,6 +18,7 @@ class ParrotBase(BaseModel):
     return_reason: Optional[str] = Field(None, max_length=500, description="退货原因")
     mate_id: Optional[int] = Field(None, description="配偶ID")
     paired_at: Optional[datetime] = Field(None, description="配对时间")
+    incubation_record_id: Optional[int] = Field(None, description="来源孵化记录ID（出生窝）")
 
     @field_serializer('price')
     def serialize_price(self, price: Optional[Decimal], _info):
@@ -120,6 +121,12 @@ class FollowUpCreate(BaseModel):
     notes: Optional[str] = Field(None, description="回访备注")
 
 
+class FollowUpTaskComplete(BaseModel):
+    """完成回访待办请求"""
+    follow_up_status: str = Field(..., pattern="^(completed|no_contact)$", description="回访结果")
+    notes: Optional[str] = Field(None, description="回访备注")
+
+
 class FollowUpResponse(BaseModel):
     """回访记录响应"""
     id: int
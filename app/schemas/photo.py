@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class PhotoBase(BaseModel):
@@ -16,6 +16,26 @@ class PhotoResponse(PhotoBase):
     id: int
     parrot_id: int
     created_at: str
+    file_type: str = "image"
+    mime_type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # 视频衍生文件，转码完成前为空
+    poster_path: Optional[str] = None
+    stream_path: Optional[str] = None
+    duration: Optional[float] = None
+    transcode_status: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+
+class PhotoSortItem(BaseModel):
+    id: int
+    sort_order: int
+
+
+class PhotoBatchSortRequest(BaseModel):
+    """批量更新照片排序请求"""
+    items: List[PhotoSortItem] = Field(..., min_length=1, description="照片ID及新的排序权重")
+    parrot_id: Optional[int] = Field(None, description="限定照片所属的鹦鹉ID")
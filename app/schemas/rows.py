@@ -0,0 +1,206 @@
+"""列表接口的数据行
+
+列表接口每页可能有上百行，用普通 dataclass 代替 Pydantic 模型：
+数据来自数据库不需要再校验，构造开销小，并由 FastJSONResponse(orjson) 直接序列化。
+Decimal 输出为数字，datetime/date 输出为 ISO 格式字符串。
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Union
+
+
+@dataclass
+class Page:
+    """分页结果"""
+    total: int
+    items: List[Any]
+    page: int
+    size: int
+
+
+@dataclass
+class MateBrief:
+    """列表中的配偶信息"""
+    id: int
+    breed: str
+    gender: str
+    ring_number: Optional[str]
+    birth_date: Optional[date]
+
+
+@dataclass
+class ParrotListRow:
+    """鹦鹉列表行"""
+    id: int
+    breed: str
+    price: Optional[Decimal]
+    gender: str
+    birth_date: Optional[date]
+    ring_number: Optional[str]
+    status: str
+    health_notes: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    photo_count: int
+    photo_url: Optional[str]
+    mate_id: Optional[int]
+    paired_at: Optional[datetime]
+
+
+@dataclass
+class ParrotListRowWithMate(ParrotListRow):
+    """include_mate=true 时的鹦鹉列表行"""
+    mate: Optional[MateBrief] = None
+
+
+@dataclass
+class ParrotBrief:
+    """销售记录中的鹦鹉信息"""
+    id: int
+    breed: str
+    gender: str
+    ring_number: Optional[str]
+
+
+@dataclass
+class SaleParrotInfo:
+    breed: str
+    ring_number: Optional[str]
+    gender: str
+
+
+@dataclass
+class SaleRecordRow:
+    """在售销售记录行（字段与 SaleRecordResponse 一致）"""
+    id: int
+    parrot_id: int
+    seller: Optional[str]
+    buyer_name: Optional[str]
+    sale_price: Optional[Decimal]
+    contact: Optional[str]
+    follow_up_status: str
+    sale_notes: Optional[str]
+    sale_date: Optional[datetime]
+    payment_method: Optional[str]
+    photo_url: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    parrot: SaleParrotInfo
+
+
+@dataclass
+class SalesHistoryRow:
+    """销售历史行"""
+    id: int
+    parrot_id: int
+    parrot: Optional[ParrotBrief]
+    seller: str
+    buyer_name: str
+    sale_price: Union[Decimal, int]
+    contact: str
+    follow_up_status: Optional[str]
+    sale_notes: Optional[str]
+    sale_date: Optional[datetime]
+    return_date: Optional[datetime]
+    return_reason: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@dataclass
+class TimelineEvent:
+    """销售时间线事件；date 保留为字符串，日期与时间混合排序"""
+    event: str
+    date: str
+    description: str
+    type: str
+    details: Optional[dict] = None
+
+
+@dataclass
+class MateRecommendationRow:
+    """配对推荐候选；kinship 为二者的亲缘系数（即后代的近交系数）"""
+    id: int
+    breed: str
+    gender: str
+    ring_number: Optional[str]
+    birth_date: Optional[date]
+    health_notes: Optional[str]
+    score: float
+    kinship: float
+    age_gap_days: Optional[int]
+    same_breed: bool
+
+
+@dataclass
+class FollowUpTaskRow:
+    """回访待办行；sale_history_id 不为空表示该次销售已退货"""
+    id: int
+    parrot_id: int
+    breed: str
+    ring_number: Optional[str]
+    sale_history_id: Optional[int]
+    sold_at: datetime
+    cadence_days: int
+    due_date: date
+    status: str
+    buyer_name: Optional[str]
+    contact: Optional[str]
+
+
+@dataclass
+class CursorPage:
+    """键集分页结果；next_cursor 为空表示没有更多数据"""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+@dataclass
+class SyncParrotRow(ParrotListRow):
+    """增量同步的鹦鹉行：列表字段 + 销售信息（销售记录列表即售出的鹦鹉）"""
+    min_price: Optional[Decimal]
+    max_price: Optional[Decimal]
+    incubation_record_id: Optional[int]
+    sold_at: Optional[datetime]
+    returned_at: Optional[datetime]
+    return_reason: Optional[str]
+    seller: Optional[str]
+    buyer_name: Optional[str]
+    sale_price: Optional[Decimal]
+    contact: Optional[str]
+    follow_up_status: Optional[str]
+    sale_notes: Optional[str]
+
+
+@dataclass
+class SyncIncubationRow:
+    """增量同步的孵化记录行（父母信息从本地鹦鹉副本关联）"""
+    id: int
+    father_id: Optional[int]
+    mother_id: Optional[int]
+    start_date: date
+    expected_hatch_date: date
+    actual_hatch_date: Optional[date]
+    eggs_count: int
+    hatched_count: int
+    status: str
+    notes: Optional[str]
+    overdue_at: Optional[datetime]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@dataclass
+class SyncPage:
+    """
+    增量同步结果
+
+    version 为下次请求的 since；has_more 为 true 时应立即继续拉取。
+    deleted 按表名列出已删除的行ID。
+    """
+    version: int
+    has_more: bool
+    parrots: List[SyncParrotRow]
+    incubation_records: List[SyncIncubationRow]
+    deleted: Dict[str, List[int]]
@@ -22,6 +22,12 @@ class PhotoInfo(BaseModel):
     file_path: str
     file_name: str
     file_type: str  # 'image' or 'video'
+    mime_type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    poster_path: Optional[str] = None  # 视频封面帧
+    stream_path: Optional[str] = None  # 转码后的流媒体版本
+    duration: Optional[float] = None
 
 
 class ParrotShareInfo(BaseModel):
@@ -0,0 +1,5 @@
+"""后台服务模块
+
+各服务既可在应用内调用，也可通过 `python -m app.services.<模块名>` 作为独立命令运行，
+因此这里不做统一导出，避免命令行运行时重复导入模块。
+"""
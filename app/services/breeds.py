@@ -0,0 +1,256 @@
+"""品种维表与进程内品种字典
+
+鹦鹉的品种原先是自由文本，"玄凤"、"玄凤鹦鹉"、"玄凤 鹦鹉" 会被当成三个品种，筛选用
+contains() 无法走索引，统计按字符串分组。现在品种存放在 breeds 表，鹦鹉通过 breed_id 关联：
+
+- 录入时按别名表（breed_aliases）归并：名称经 breed_key() 归一化（全角转半角、忽略大小写
+  和空白、去掉"鹦鹉"后缀）后查找已有品种，找不到才新建；Parrot.breed 保存规范名称
+- 列表、统计、筛选计数按 breed_id 过滤和分组；按品种名称筛选时先在字典中匹配出ID
+- 字典（别名 -> ID、ID -> 名称、各品种鹦鹉数量）在启动时加载，用于自动补全，
+  本进程内品种变更提交后重新加载，其他进程的变更在 BREED_DICTIONARY_TTL_SECONDS 后生效
+
+录入的品种写法有误时，用 merge_breeds() 把错误的品种并入正确的品种，原写法成为别名。
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import BadRequestException, NotFoundException
+from app.core.change_hooks import on_commit
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Breed, BreedAlias, Parrot
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r"[\s\-_·•・]+")
+
+_SUFFIX = "鹦鹉"
+
+
+def normalize_breed_name(name: str) -> str:
+    """显示用的规范写法：全角转半角，去掉首尾空白，连续空白合并为一个空格"""
+    return " ".join(unicodedata.normalize("NFKC", name).split())
+
+
+def breed_key(name: str) -> str:
+    """别名查找键：在规范写法基础上忽略大小写、空白和分隔符，去掉"鹦鹉"后缀"""
+    key = _SEPARATORS.sub("", normalize_breed_name(name).casefold())
+    if key.endswith(_SUFFIX) and len(key) > len(_SUFFIX):
+        key = key[:-len(_SUFFIX)]
+    return key
+
+
+@dataclass(frozen=True)
+class BreedEntry:
+    """字典中的一个品种；parrot_count 为加载时的鹦鹉数量，只用于自动补全排序"""
+    id: int
+    name: str
+    parrot_count: int
+
+
+class BreedDictionary:
+    """
+    进程内品种字典，首次使用或过期时加载
+
+    加载使用独立的会话，只包含已提交的品种；请求所在事务中刚新建的品种通过参数中的会话查询。
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, BreedEntry] = {}
+        self._aliases: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        db = SessionLocal()
+        try:
+            names = dict(db.query(Breed.id, Breed.name))
+            counts = dict(db.query(Parrot.breed_id, func.count(Parrot.id)).group_by(Parrot.breed_id))
+            aliases = dict(db.query(BreedAlias.alias, BreedAlias.breed_id))
+        finally:
+            db.close()
+        entries = {
+            breed_id: BreedEntry(id=breed_id, name=name, parrot_count=counts.get(breed_id, 0))
+            for breed_id, name in names.items()
+        }
+        for entry in entries.values():
+            aliases.setdefault(breed_key(entry.name), entry.id)
+        with self._lock:
+            self._entries = entries
+            self._aliases = aliases
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ensure(self) -> Tuple[Dict[int, BreedEntry], Dict[str, int]]:
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > settings.BREED_DICTIONARY_TTL_SECONDS:
+            self.load()
+        with self._lock:
+            return self._entries, self._aliases
+
+    def names(self, db: Session, breed_ids: Iterable[Optional[int]]) -> Dict[int, str]:
+        """品种ID -> 规范名称；字典中没有的ID（其他进程新建的品种）查询数据库"""
+        entries, _ = self._ensure()
+        breed_ids = {breed_id for breed_id in breed_ids if breed_id is not None}
+        result = {breed_id: entries[breed_id].name for breed_id in breed_ids if breed_id in entries}
+        missing = breed_ids - result.keys()
+        if missing:
+            result.update(db.query(Breed.id, Breed.name).filter(Breed.id.in_(missing)))
+            self.invalidate()
+        return result
+
+    def resolve(self, db: Session, name: str) -> Optional[int]:
+        """按别名精确查找品种ID；字典中没有时再查一次数据库"""
+        key = breed_key(name)
+        _, aliases = self._ensure()
+        if key in aliases:
+            return aliases[key]
+        return db.query(BreedAlias.breed_id).filter(BreedAlias.alias == key).scalar()
+
+    def match(self, text: str) -> List[int]:
+        """名称筛选：别名精确匹配时只返回该品种，否则返回别名包含输入的全部品种"""
+        key = breed_key(text)
+        _, aliases = self._ensure()
+        if key in aliases:
+            return [aliases[key]]
+        if not key:
+            return []
+        return sorted({breed_id for alias, breed_id in aliases.items() if key in alias})
+
+    def suggest(self, text: str, limit: int) -> List[BreedEntry]:
+        """自动补全：别名以输入开头的品种在前，其次是包含输入的品种，同组按鹦鹉数量降序"""
+        key = breed_key(text) if text else ""
+        entries, aliases = self._ensure()
+        ranks: Dict[int, int] = {}
+        for alias, breed_id in aliases.items():
+            if alias.startswith(key):
+                ranks[breed_id] = 0
+            elif key in alias:
+                ranks.setdefault(breed_id, 1)
+        ranked = sorted(
+            (entries[breed_id] for breed_id in ranks if breed_id in entries),
+            key=lambda entry: (ranks[entry.id], -entry.parrot_count, entry.name),
+        )
+        return ranked[:limit]
+
+
+breed_dictionary = BreedDictionary()
+
+
+@on_commit
+def _invalidate(tables) -> None:
+    if "breeds" in tables or "breed_aliases" in tables:
+        breed_dictionary.invalidate()
+
+
+def load_dictionary() -> None:
+    """应用启动时加载品种字典；失败时（如数据库尚未迁移）在首次使用时再加载"""
+    try:
+        breed_dictionary.load()
+        logger.info("品种字典已加载: %d 个品种", len(breed_dictionary))
+    except Exception:
+        logger.warning("品种字典加载失败，将在首次使用时重试", exc_info=True)
+
+
+def ensure_breed(db: Session, name: str) -> Tuple[int, str]:
+    """
+    按别名归并录入的品种，没有匹配的品种时新建（随当前事务提交）
+
+    多个请求同时新建同一品种时，只有一个插入成功；其余请求在保存点内插入失败后回滚保存点，
+    改用已提交的品种，当前事务中之前的修改不受影响。
+
+    Returns:
+        (品种ID, 规范名称)
+    """
+    display = normalize_breed_name(name)
+    if not display:
+        raise BadRequestException("品种不能为空")
+    breed_id = breed_dictionary.resolve(db, display)
+    if breed_id is not None:
+        return breed_id, breed_dictionary.names(db, [breed_id])[breed_id]
+
+    key = breed_key(display)
+    try:
+        with db.begin_nested():
+            breed = Breed(name=display, aliases=[BreedAlias(alias=key)])
+            db.add(breed)
+        return breed.id, breed.name
+    except IntegrityError:
+        # 加共享锁读取，可重复读隔离级别下也能读到其他事务刚提交的品种
+        existing = (
+            db.query(Breed.id, Breed.name)
+            .join(BreedAlias, BreedAlias.breed_id == Breed.id)
+            .filter(BreedAlias.alias == key)
+            .with_for_update(read=True)
+            .first()
+        )
+        if existing is None:
+            raise
+        return existing.id, existing.name
+
+
+def assign_breed(db: Session, parrot: Parrot, name: str) -> None:
+    """设置鹦鹉的品种（breed_id 与规范名称）"""
+    parrot.breed_id, parrot.breed = ensure_breed(db, name)
+
+
+def add_alias(db: Session, breed_id: int, alias: str) -> Breed:
+    breed = db.get(Breed, breed_id)
+    if breed is None:
+        raise NotFoundException(f"未找到ID为 {breed_id} 的品种")
+    key = breed_key(alias)
+    if not key:
+        raise BadRequestException("别名不能为空")
+    existing = db.query(BreedAlias).filter(BreedAlias.alias == key).first()
+    if existing is not None:
+        if existing.breed_id == breed_id:
+            return breed
+        owner = db.get(Breed, existing.breed_id)
+        raise BadRequestException(f"别名 {alias} 已属于品种 {owner.name}，如为同一品种请合并")
+    breed.aliases.append(BreedAlias(alias=key))
+    db.commit()
+    db.refresh(breed)
+    return breed
+
+
+def merge_breeds(db: Session, source_id: int, target_id: int) -> Breed:
+    """把 source 品种并入 target：鹦鹉改为 target，source 的名称和别名都成为 target 的别名"""
+    if source_id == target_id:
+        raise BadRequestException("不能把品种合并到自身")
+    source = db.get(Breed, source_id)
+    if source is None:
+        raise NotFoundException(f"未找到ID为 {source_id} 的品种")
+    target = db.get(Breed, target_id)
+    if target is None:
+        raise NotFoundException(f"未找到ID为 {target_id} 的品种")
+
+    db.query(Parrot).filter(Parrot.breed_id == source_id).update(
+        {Parrot.breed_id: target_id, Parrot.breed: target.name}, synchronize_session="fetch"
+    )
+    db.query(BreedAlias).filter(BreedAlias.breed_id == source_id).update(
+        {BreedAlias.breed_id: target_id}, synchronize_session="fetch"
+    )
+    source_key = breed_key(source.name)
+    if db.query(BreedAlias.id).filter(BreedAlias.alias == source_key).first() is None:
+        db.add(BreedAlias(alias=source_key, breed_id=target_id))
+    db.flush()
+    db.expire(source, ["aliases"])
+    db.delete(source)
+    db.commit()
+    db.refresh(target)
+    return target
@@ -0,0 +1,327 @@
+"""回访待办
+
+回访状态原本分散在 Parrot.follow_up_status、SalesHistory.follow_up_status 和 FollowUp 记录中，
+这里为每次销售按 FOLLOW_UP_CADENCE_DAYS 生成回访待办（follow_up_tasks 表），
+待办列表按 (status, due_date, id) 索引做键集分页，不需要合并三处数据。
+
+- 售出/修改销售信息时 sync_current_sale() 生成或更新当前销售的待办
+- 退货时 attach_to_history() 把当前销售的待办转到对应的销售历史记录
+- 完成待办时同时登记 FollowUp 记录，并回写所属销售的 follow_up_status
+
+已有数据通过命令行补建待办：
+
+    python -m app.services.follow_up_tasks backfill
+    python -m app.services.follow_up_tasks backfill --pending-window-days 30
+"""
+import argparse
+import logging
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.exceptions import BadRequestException
+from app.models import FollowUp, FollowUpTask, Parrot, SalesHistory
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+CANCELLED = "cancelled"
+DONE_STATUSES = ("completed", "no_contact")
+
+
+def cadence_days() -> List[int]:
+    return sorted({int(days) for days in settings.FOLLOW_UP_CADENCE_DAYS if int(days) >= 0})
+
+
+def sync_current_sale(db: Session, parrot: Parrot) -> None:
+    """
+    按鹦鹉当前的销售信息同步待办（调用方负责提交）
+
+    已售出：补齐缺少的节点，未完成的待办按最新售出时间和买家信息更新；
+    未售出：取消当前销售尚未完成的待办。
+    """
+    # 会话关闭了 autoflush，先写入本事务中已做的修改（如退货时转入历史的待办）
+    db.flush()
+    # 包含已取消的待办：售出 -> 在售 -> 售出 时售出时间不变，取消的待办恢复即可，
+    # 再插入同样 (parrot_id, sold_at, cadence_days) 的行会违反唯一约束
+    current = db.query(FollowUpTask).filter(
+        FollowUpTask.parrot_id == parrot.id,
+        FollowUpTask.sale_history_id.is_(None),
+    ).all()
+
+    if parrot.status != "sold" or parrot.sold_at is None:
+        for task in current:
+            if task.status == PENDING:
+                task.status = CANCELLED
+        return
+
+    for days in cadence_days():
+        due_date = parrot.sold_at.date() + timedelta(days=days)
+        tasks = [task for task in current if task.cadence_days == days]
+        # 优先使用售出时间相同的行（唯一键已存在），其次是未取消的待办
+        task = next((t for t in tasks if t.sold_at == parrot.sold_at), None)
+        if task is None:
+            task = next((t for t in tasks if t.status == PENDING), None) \
+                or next((t for t in tasks if t.status != CANCELLED), None)
+        for other in tasks:
+            if other is not task and other.status == PENDING:
+                other.status = CANCELLED
+
+        if task is None:
+            db.add(FollowUpTask(
+                parrot_id=parrot.id,
+                sold_at=parrot.sold_at,
+                cadence_days=days,
+                due_date=due_date,
+                status=PENDING,
+                buyer_name=parrot.buyer_name,
+                contact=parrot.contact,
+            ))
+        elif task.status in (PENDING, CANCELLED):
+            task.status = PENDING
+            task.sold_at = parrot.sold_at
+            task.due_date = due_date
+            task.buyer_name = parrot.buyer_name
+            task.contact = parrot.contact
+
+
+def attach_to_history(db: Session, parrot_id: int, history: SalesHistory) -> None:
+    """退货时当前销售转存为销售历史，待办随之指向该历史记录（调用方负责提交）"""
+    if history.id is None:
+        db.flush()
+    tasks = db.query(FollowUpTask).filter(
+        FollowUpTask.parrot_id == parrot_id,
+        FollowUpTask.sale_history_id.is_(None),
+    ).all()
+    for task in tasks:
+        task.sale_history_id = history.id
+
+
+def complete_task(db: Session, task: FollowUpTask, status: str, notes: Optional[str] = None) -> FollowUp:
+    """完成待办：登记回访记录并回写所属销售的回访状态（调用方负责提交）"""
+    if status not in DONE_STATUSES:
+        raise BadRequestException(f"无效的回访状态: {status}")
+    if task.status != PENDING:
+        raise BadRequestException("该回访待办已处理")
+
+    follow_up = FollowUp(parrot_id=task.parrot_id, follow_up_status=status, notes=notes)
+    db.add(follow_up)
+    db.flush()
+
+    _close(task, status, follow_up.id)
+    if task.sale_history_id is not None:
+        history = db.query(SalesHistory).filter(SalesHistory.id == task.sale_history_id).first()
+        if history:
+            history.follow_up_status = status
+    else:
+        parrot = db.query(Parrot).filter(Parrot.id == task.parrot_id).first()
+        if parrot:
+            parrot.follow_up_status = status
+    return follow_up
+
+
+def record_follow_up(db: Session, follow_up: FollowUp) -> Optional[FollowUpTask]:
+    """直接登记回访记录时，关闭当前销售最早到期的一条待办（调用方负责提交）"""
+    if follow_up.follow_up_status not in DONE_STATUSES:
+        return None
+    db.flush()
+    task = db.query(FollowUpTask).filter(
+        FollowUpTask.parrot_id == follow_up.parrot_id,
+        FollowUpTask.sale_history_id.is_(None),
+        FollowUpTask.status == PENDING,
+    ).order_by(FollowUpTask.due_date, FollowUpTask.id).first()
+    if task:
+        _close(task, follow_up.follow_up_status, follow_up.id)
+    return task
+
+
+def _close(task: FollowUpTask, status: str, follow_up_id: Optional[int]) -> None:
+    task.status = status
+    task.follow_up_id = follow_up_id
+    task.completed_at = datetime.utcnow()
+
+
+# ---- 待办列表 ----
+
+def encode_cursor(task_due_date: date, task_id: int) -> str:
+    return f"{task_due_date.isoformat()}~{task_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        due_part, id_part = cursor.split("~", 1)
+        return date.fromisoformat(due_part), int(id_part)
+    except ValueError:
+        raise BadRequestException("无效的分页游标")
+
+
+def due_tasks(db: Session, until: date, limit: int, cursor: Optional[str] = None):
+    """
+    到期日不晚于 until 的待处理待办，按 (到期日, ID) 升序，键集分页
+
+    Returns:
+        (rows, next_cursor)，rows 为 (FollowUpTask 列, 鹦鹉品种, 圈号) 的行
+    """
+    query = (
+        select(
+            FollowUpTask.id,
+            FollowUpTask.parrot_id,
+            FollowUpTask.sale_history_id,
+            FollowUpTask.sold_at,
+            FollowUpTask.cadence_days,
+            FollowUpTask.due_date,
+            FollowUpTask.status,
+            FollowUpTask.buyer_name,
+            FollowUpTask.contact,
+            Parrot.breed,
+            Parrot.ring_number,
+        )
+        .join(Parrot, Parrot.id == FollowUpTask.parrot_id)
+        .where(FollowUpTask.status == PENDING, FollowUpTask.due_date <= until)
+    )
+    if cursor:
+        after_due, after_id = decode_cursor(cursor)
+        query = query.where(or_(
+            FollowUpTask.due_date > after_due,
+            and_(FollowUpTask.due_date == after_due, FollowUpTask.id > after_id),
+        ))
+
+    rows = db.execute(query.order_by(FollowUpTask.due_date, FollowUpTask.id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].due_date, rows[-1].id)
+    return rows, next_cursor
+
+
+# ---- 补建 ----
+
+def _initial_status(follow_up_status: Optional[str], due_date: date, stale_before: Optional[date]) -> str:
+    if follow_up_status in DONE_STATUSES:
+        return follow_up_status
+    if stale_before is not None and due_date < stale_before:
+        return CANCELLED
+    return PENDING
+
+
+def backfill(db: Session, batch_size: int = 1000, pending_window_days: Optional[int] = None) -> Dict[str, int]:
+    """
+    为已有的当前销售和销售历史补建待办，可重复执行（已存在的节点跳过）
+
+    Args:
+        pending_window_days: 到期日早于今天该天数之前、且未回访的节点直接记为 cancelled，
+            避免历史数据全部堆进待办列表；None 表示全部保留为 pending
+    """
+    stale_before = date.today() - timedelta(days=pending_window_days) if pending_window_days is not None else None
+    counts = {"sales": 0, "created": 0}
+    table = FollowUpTask.__table__
+    now = datetime.utcnow()
+
+    def existing_keys(parrot_ids: Set[int]) -> Set[Tuple[int, datetime, int]]:
+        rows = db.execute(
+            select(FollowUpTask.parrot_id, FollowUpTask.sold_at, FollowUpTask.cadence_days)
+            .where(FollowUpTask.parrot_id.in_(parrot_ids))
+        ).all()
+        return {tuple(row) for row in rows}
+
+    def insert_sales(sales: List[tuple]) -> None:
+        # sales: (parrot_id, sale_history_id, sold_at, follow_up_status, buyer_name, contact)
+        existing = existing_keys({sale[0] for sale in sales})
+        rows = []
+        for parrot_id, history_id, sold_at, follow_up_status, buyer_name, contact in sales:
+            for days in cadence_days():
+                if (parrot_id, sold_at, days) in existing:
+                    continue
+                due_date = sold_at.date() + timedelta(days=days)
+                status = _initial_status(follow_up_status, due_date, stale_before)
+                rows.append({
+                    "parrot_id": parrot_id,
+                    "sale_history_id": history_id,
+                    "sold_at": sold_at,
+                    "cadence_days": days,
+                    "due_date": due_date,
+                    "status": status,
+                    "buyer_name": buyer_name,
+                    "contact": contact,
+                    "follow_up_id": None,
+                    "completed_at": now if status in DONE_STATUSES else None,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+        if rows:
+            db.execute(insert(table), rows)
+        db.commit()
+        counts["sales"] += len(sales)
+        counts["created"] += len(rows)
+
+    # 当前销售
+    last_id = 0
+    while True:
+        batch = db.execute(
+            select(Parrot.id, Parrot.sold_at, Parrot.follow_up_status, Parrot.buyer_name, Parrot.contact)
+            .where(Parrot.id > last_id, Parrot.status == "sold", Parrot.sold_at.isnot(None))
+            .order_by(Parrot.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        insert_sales([(row.id, None, row.sold_at, row.follow_up_status, row.buyer_name, row.contact) for row in batch])
+
+    # 销售历史（已退货的销售）
+    last_id = 0
+    while True:
+        batch = db.execute(
+            select(
+                SalesHistory.id,
+                SalesHistory.parrot_id,
+                SalesHistory.sale_date,
+                SalesHistory.follow_up_status,
+                SalesHistory.buyer_name,
+                SalesHistory.contact,
+            )
+            .where(SalesHistory.id > last_id)
+            .order_by(SalesHistory.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        insert_sales([
+            (row.parrot_id, row.id, row.sale_date, row.follow_up_status, row.buyer_name, row.contact)
+            for row in batch
+        ])
+
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="回访待办维护")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subparsers.add_parser("backfill", help="为已有销售补建回访待办")
+    backfill_parser.add_argument("--batch-size", type=int, default=1000, help="每批处理的销售数")
+    backfill_parser.add_argument(
+        "--pending-window-days",
+        type=int,
+        help="到期日早于今天该天数之前且未回访的节点记为 cancelled，默认全部保留为 pending",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    db = SessionLocal()
+    try:
+        counts = backfill(db, batch_size=args.batch_size, pending_window_days=args.pending_window_days)
+    finally:
+        db.close()
+    logger.info("回访待办补建完成: 处理销售 %d 次，新建待办 %d 条", counts["sales"], counts["created"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""孵化日历与到期调度
+
+进程内维护一个按到期日排序的日历索引，包含：
+
+- hatch:     进行中（incubating）孵化记录的预计孵化日期
+- follow_up: 待处理回访待办（app.services.follow_up_tasks）的到期日
+
+索引在首次使用（或后台任务首次执行）时用两条带索引条件的查询建立，之后通过 ORM
+insert/update/delete 事件在事务提交后增量更新；Query.update()/delete() 等批量操作
+无法得知具体行，提交后整体重建。日历区间查询和每日任务列表都直接读索引（bisect），
+不扫描数据表。
+
+后台任务 run_scheduled_tick() 定期重建索引（纠正命令行补建数据、其他进程写入造成的偏差），
+把已过预计孵化日期仍在孵化中的记录标记为逾期（overdue_at），并生成当天的任务列表。
+"""
+import bisect
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.database import SessionLocal
+from app.models import FollowUpTask, IncubationRecord
+
+logger = logging.getLogger(__name__)
+
+HATCH = "hatch"
+FOLLOW_UP = "follow_up"
+KINDS = (HATCH, FOLLOW_UP)
+
+_OVERDUE_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class CalendarEntry:
+    """日历条目；ref_id 对 hatch 为孵化记录ID，对 follow_up 为回访待办ID"""
+    due_date: date
+    kind: str
+    ref_id: int
+    title: str
+    overdue: bool = False
+
+    @property
+    def key(self) -> Tuple[date, str, int]:
+        return (self.due_date, self.kind, self.ref_id)
+
+
+EntryKey = Tuple[str, int]
+
+
+class CalendarIndex:
+    """按 (到期日, 类型, ID) 排序的条目列表 + (类型, ID) 到条目的映射"""
+
+    def __init__(self):
+        self._keys: List[Tuple[date, str, int]] = []
+        self._entries: Dict[EntryKey, CalendarEntry] = {}
+        self._lock = threading.RLock()
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def replace_all(self, entries: Iterable[CalendarEntry]) -> None:
+        with self._lock:
+            self._entries = {(entry.kind, entry.ref_id): entry for entry in entries}
+            self._keys = sorted(entry.key for entry in self._entries.values())
+            self.built = True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.built = False
+
+    def _remove(self, ref: EntryKey) -> None:
+        entry = self._entries.pop(ref, None)
+        if entry is not None:
+            index = bisect.bisect_left(self._keys, entry.key)
+            if index < len(self._keys) and self._keys[index] == entry.key:
+                del self._keys[index]
+
+    def apply(self, changes: Dict[EntryKey, Optional[CalendarEntry]]) -> None:
+        """批量更新；值为 None 表示移除"""
+        with self._lock:
+            for ref, entry in changes.items():
+                self._remove(ref)
+                if entry is not None:
+                    self._entries[ref] = entry
+                    bisect.insort(self._keys, entry.key)
+
+    def between(self, start: date, end: date, kind: Optional[str] = None) -> List[CalendarEntry]:
+        """到期日在 [start, end] 内的条目，按到期日排序"""
+        with self._lock:
+            lo = bisect.bisect_left(self._keys, (start,))
+            hi = bisect.bisect_left(self._keys, (end + timedelta(days=1),))
+            keys = self._keys[lo:hi]
+            entries = self._entries
+        return [entries[(k, ref_id)] for _, k, ref_id in keys if kind is None or k == kind]
+
+    def before(self, day: date, kind: Optional[str] = None) -> List[CalendarEntry]:
+        """到期日早于 day 的条目"""
+        with self._lock:
+            hi = bisect.bisect_left(self._keys, (day,))
+            keys = self._keys[:hi]
+            entries = self._entries
+        return [entries[(k, ref_id)] for _, k, ref_id in keys if kind is None or k == kind]
+
+
+calendar_index = CalendarIndex()
+
+
+def hatch_entry(record) -> Optional[CalendarEntry]:
+    """孵化记录对应的日历条目，不在孵化中时返回 None"""
+    if record.status != "incubating" or record.expected_hatch_date is None:
+        return None
+    return CalendarEntry(
+        due_date=record.expected_hatch_date,
+        kind=HATCH,
+        ref_id=record.id,
+        title=f"孵化记录 #{record.id} 预计出壳",
+        overdue=record.overdue_at is not None,
+    )
+
+
+def follow_up_entry(task) -> Optional[CalendarEntry]:
+    """回访待办对应的日历条目，已处理时返回 None"""
+    if task.status != "pending":
+        return None
+    buyer = f"（{task.buyer_name}）" if task.buyer_name else ""
+    return CalendarEntry(
+        due_date=task.due_date,
+        kind=FOLLOW_UP,
+        ref_id=task.id,
+        title=f"鹦鹉 #{task.parrot_id} 售后第 {task.cadence_days} 天回访{buyer}",
+    )
+
+
+def rebuild(db: Session) -> int:
+    """从数据库重建索引，返回条目数"""
+    # 持锁查询：重建期间提交的增量更新会在重建完成后再应用，不会被旧数据覆盖
+    with calendar_index._lock:
+        records = db.execute(
+            select(
+                IncubationRecord.id,
+                IncubationRecord.status,
+                IncubationRecord.expected_hatch_date,
+                IncubationRecord.overdue_at,
+            ).where(IncubationRecord.status == "incubating")
+        ).all()
+        tasks = db.execute(
+            select(
+                FollowUpTask.id,
+                FollowUpTask.parrot_id,
+                FollowUpTask.status,
+                FollowUpTask.cadence_days,
+                FollowUpTask.due_date,
+                FollowUpTask.buyer_name,
+            ).where(FollowUpTask.status == "pending")
+        ).all()
+        entries = [hatch_entry(row) for row in records] + [follow_up_entry(row) for row in tasks]
+        calendar_index.replace_all(entry for entry in entries if entry is not None)
+    logger.info("孵化日历索引已重建: %d 条", len(calendar_index))
+    return len(calendar_index)
+
+
+def ensure_index(db: Session) -> CalendarIndex:
+    if not calendar_index.built:
+        rebuild(db)
+    return calendar_index
+
+
+@dataclass
+class DailyTasks:
+    """某一天的任务：当天到期的条目与此前到期仍未处理的条目"""
+    date: date
+    due: List[CalendarEntry] = field(default_factory=list)
+    overdue: List[CalendarEntry] = field(default_factory=list)
+
+
+def daily_tasks(db: Session, day: date) -> DailyTasks:
+    index = ensure_index(db)
+    return DailyTasks(date=day, due=index.between(day, day), overdue=index.before(day))
+
+
+def mark_overdue(db: Session, today: date) -> int:
+    """把预计孵化日期早于今天且仍在孵化中的记录标记为逾期，返回新标记的数量"""
+    index = ensure_index(db)
+    ids = [entry.ref_id for entry in index.before(today, HATCH) if not entry.overdue]
+    if not ids:
+        return 0
+
+    now = datetime.utcnow()
+    marked = 0
+    for offset in range(0, len(ids), _OVERDUE_BATCH_SIZE):
+        batch = ids[offset:offset + _OVERDUE_BATCH_SIZE]
+        records = db.query(IncubationRecord).filter(
+            IncubationRecord.id.in_(batch),
+            IncubationRecord.status == "incubating",
+            IncubationRecord.overdue_at.is_(None),
+        ).all()
+        for record in records:
+            record.overdue_at = now
+        marked += len(records)
+    # 逐条修改（而非批量 UPDATE），提交后通过 ORM 事件增量更新索引
+    db.commit()
+    return marked
+
+
+_latest_tasks: Optional[DailyTasks] = None
+
+
+def latest_daily_tasks() -> Optional[DailyTasks]:
+    """最近一次后台任务生成的当日任务列表"""
+    return _latest_tasks
+
+
+def tick(db: Session, today: Optional[date] = None) -> DailyTasks:
+    global _latest_tasks
+    today = today or date.today()
+    rebuild(db)
+    marked = mark_overdue(db, today)
+    tasks = daily_tasks(db, today)
+    _latest_tasks = tasks
+    logger.info(
+        "孵化日历: 新增逾期 %d 条，今日到期 %d 条，累计逾期 %d 条",
+        marked, len(tasks.due), len(tasks.overdue),
+    )
+    return tasks
+
+
+def run_scheduled_tick() -> None:
+    """后台定时任务入口"""
+    db = SessionLocal()
+    try:
+        tick(db)
+    finally:
+        db.close()
+
+
+# ---- 增量更新 ----
+
+_PENDING_KEY = "calendar_changes"
+_REBUILD_KEY = "calendar_rebuild"
+
+
+def _pending(target) -> Optional[Dict[EntryKey, Optional[CalendarEntry]]]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+@event.listens_for(IncubationRecord, "after_insert")
+@event.listens_for(IncubationRecord, "after_update")
+def _incubation_saved(mapper, connection, target) -> None:
+    changes = _pending(target)
+    if changes is not None:
+        changes[(HATCH, target.id)] = hatch_entry(target)
+
+
+@event.listens_for(IncubationRecord, "after_delete")
+def _incubation_deleted(mapper, connection, target) -> None:
+    changes = _pending(target)
+    if changes is not None:
+        changes[(HATCH, target.id)] = None
+
+
+@event.listens_for(FollowUpTask, "after_insert")
+@event.listens_for(FollowUpTask, "after_update")
+def _follow_up_task_saved(mapper, connection, target) -> None:
+    changes = _pending(target)
+    if changes is not None:
+        changes[(FOLLOW_UP, target.id)] = follow_up_entry(target)
+
+
+@event.listens_for(FollowUpTask, "after_delete")
+def _follow_up_task_deleted(mapper, connection, target) -> None:
+    changes = _pending(target)
+    if changes is not None:
+        changes[(FOLLOW_UP, target.id)] = None
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _bulk_execute(orm_execute_state) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in (IncubationRecord, FollowUpTask):
+            orm_execute_state.session.info[_REBUILD_KEY] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if session.info.pop(_REBUILD_KEY, False):
+        calendar_index.invalidate()
+    elif changes and calendar_index.built:
+        calendar_index.apply(changes)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_REBUILD_KEY, None)
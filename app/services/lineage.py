@@ -0,0 +1,326 @@
+"""血统（系谱）查询
+
+子代鹦鹉通过 Parrot.incubation_record_id 关联到孵化记录，孵化记录的
+father_id/mother_id 即为其父母，由此构成 子代 -> 父母 的有向边。
+
+- ancestors()/descendants(): 单条递归 CTE 查询 N 代祖先/后代，连同鹦鹉信息一次取回
+- LineageGraph: 进程内的邻接表缓存（一次查询加载全部边），供系谱树渲染、
+  亲缘系数计算等热点路径使用。本进程提交的事务修改了边（鹦鹉的 incubation_record_id、
+  孵化记录的 father_id/mother_id，或删除了相关行）时立即失效；其他进程的修改在
+  LINEAGE_CACHE_TTL_SECONDS 后通过系谱摘要比较发现
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, literal, select, union_all
+from sqlalchemy.orm import Session, attributes
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.exceptions import BadRequestException
+from app.models import IncubationRecord, Parrot
+
+FATHER = "father"
+MOTHER = "mother"
+
+
+def parent_edges():
+    """子代 -> 父母 边的子查询，列: child_id, parent_id, relation(father/mother)"""
+    fathers = (
+        select(
+            Parrot.id.label("child_id"),
+            IncubationRecord.father_id.label("parent_id"),
+            literal(FATHER).label("relation"),
+        )
+        .join(IncubationRecord, Parrot.incubation_record_id == IncubationRecord.id)
+        .where(IncubationRecord.father_id.isnot(None))
+    )
+    mothers = (
+        select(
+            Parrot.id.label("child_id"),
+            IncubationRecord.mother_id.label("parent_id"),
+            literal(MOTHER).label("relation"),
+        )
+        .join(IncubationRecord, Parrot.incubation_record_id == IncubationRecord.id)
+        .where(IncubationRecord.mother_id.isnot(None))
+    )
+    return union_all(fathers, mothers).subquery("parent_edges")
+
+
+def clamp_generations(generations: int) -> int:
+    return max(1, min(generations, settings.LINEAGE_MAX_GENERATIONS))
+
+
+@dataclass
+class LineageEdge:
+    """系谱中的一条边及该边另一端的鹦鹉"""
+    depth: int
+    parent_id: int
+    child_id: int
+    relation: str
+    parrot: Parrot
+
+
+def _walk(db: Session, parrot_id: int, generations: int, upward: bool) -> List[LineageEdge]:
+    edges = parent_edges()
+    # upward: 从子代走向父母；否则从父母走向子代
+    start_col, next_col = (edges.c.child_id, edges.c.parent_id) if upward else (edges.c.parent_id, edges.c.child_id)
+
+    seed = select(
+        next_col.label("node_id"),
+        edges.c.parent_id,
+        edges.c.child_id,
+        edges.c.relation,
+        literal(1).label("depth"),
+    ).where(start_col == parrot_id)
+    walk = seed.cte("lineage_walk", recursive=True)
+
+    step = (
+        select(
+            next_col.label("node_id"),
+            edges.c.parent_id,
+            edges.c.child_id,
+            edges.c.relation,
+            (walk.c.depth + 1).label("depth"),
+        )
+        .join(walk, start_col == walk.c.node_id)
+        .where(walk.c.depth < clamp_generations(generations))
+    )
+    walk = walk.union_all(step)
+
+    rows = db.execute(
+        select(walk.c.depth, walk.c.parent_id, walk.c.child_id, walk.c.relation, Parrot)
+        .join(Parrot, Parrot.id == walk.c.node_id)
+        .order_by(walk.c.depth, walk.c.child_id, walk.c.relation)
+    ).all()
+    return [LineageEdge(depth, parent_id, child_id, relation, parrot) for depth, parent_id, child_id, relation, parrot in rows]
+
+
+def ancestors(db: Session, parrot_id: int, generations: int) -> List[LineageEdge]:
+    """N 代以内的祖先（同一祖先经不同路径出现时各占一条）"""
+    return _walk(db, parrot_id, generations, upward=True)
+
+
+def descendants(db: Session, parrot_id: int, generations: int) -> List[LineageEdge]:
+    """N 代以内的后代"""
+    return _walk(db, parrot_id, generations, upward=False)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    parents: Dict[int, Tuple[Optional[int], Optional[int]]]
+    children: Dict[int, Tuple[int, ...]]
+    signature: tuple
+
+
+def lineage_signature(db: Session) -> tuple:
+    """
+    系谱摘要：子代关联数与加权和、孵化记录数与最后修改时间
+
+    关联、取消关联、改到其他窝、修改或删除孵化记录都会改变摘要；
+    两条聚合查询只读 incubation_record_id 索引中有值的部分和孵化记录表，比加载全部边便宜得多。
+    """
+    linked = db.execute(
+        select(func.count(Parrot.incubation_record_id), func.sum(Parrot.id * Parrot.incubation_record_id))
+        .where(Parrot.incubation_record_id.isnot(None))
+    ).one()
+    records = db.execute(select(func.count(IncubationRecord.id), func.max(IncubationRecord.updated_at))).one()
+    return tuple(linked) + tuple(records)
+
+
+class LineageGraph:
+    """
+    系谱邻接表缓存
+
+    第一次使用时用一条查询加载全部 子代 -> 父母 边，之后的系谱遍历都在内存中完成。
+    快照不可变，读取无需加锁；本进程修改了系谱的事务提交后丢弃快照，下次使用时重新加载。
+    快照使用超过 LINEAGE_CACHE_TTL_SECONDS 后比较一次系谱摘要，不一致（其他进程修改过）时重新加载。
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._snapshot = None
+
+    def snapshot(self, db: Session, verify: bool = False) -> _Snapshot:
+        """
+        Args:
+            verify: 为 True 时不论是否到期都比较系谱摘要（用于近亲过滤等不能使用旧系谱的场合）
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and not verify and time.monotonic() - self._checked_at <= settings.LINEAGE_CACHE_TTL_SECONDS:
+            return snapshot
+
+        with self._lock:
+            version = self._version
+            # 不触发 autoflush，避免把未提交的修改载入缓存
+            with db.no_autoflush:
+                signature = lineage_signature(db)
+                snapshot = self._snapshot
+                if snapshot is not None and snapshot.signature == signature:
+                    self._checked_at = time.monotonic()
+                    return snapshot
+                rows = db.execute(
+                        select(Parrot.id, IncubationRecord.father_id, IncubationRecord.mother_id)
+                        .join(IncubationRecord, Parrot.incubation_record_id == IncubationRecord.id)
+                ).all()
+            parents: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+            children: Dict[int, List[int]] = {}
+            for child_id, father_id, mother_id in rows:
+                parents[child_id] = (father_id, mother_id)
+                for parent_id in (father_id, mother_id):
+                    if parent_id is not None:
+                        children.setdefault(parent_id, []).append(child_id)
+            snapshot = _Snapshot(
+                parents=parents,
+                children={parent_id: tuple(ids) for parent_id, ids in children.items()},
+                signature=signature,
+            )
+            # 加载期间有变更提交时，本次结果只用于当前调用，不写入缓存
+            if version == self._version:
+                self._snapshot = snapshot
+                self._checked_at = time.monotonic()
+            return snapshot
+
+    def parents(self, db: Session, parrot_id: int) -> Tuple[Optional[int], Optional[int]]:
+        """(父亲ID, 母亲ID)，未知时为 None"""
+        return self.snapshot(db).parents.get(parrot_id, (None, None))
+
+    def children(self, db: Session, parrot_id: int) -> Tuple[int, ...]:
+        return self.snapshot(db).children.get(parrot_id, ())
+
+    def ancestor_ids(self, db: Session, parrot_id: int, generations: Optional[int] = None) -> Set[int]:
+        """N 代以内所有祖先的ID（不含自身）"""
+        parents = self.snapshot(db).parents
+        limit = generations if generations is not None else settings.LINEAGE_MAX_GENERATIONS
+        found: Set[int] = set()
+        frontier = [parrot_id]
+        for _ in range(limit):
+            next_frontier = []
+            for node in frontier:
+                for parent_id in parents.get(node, ()):
+                    if parent_id is not None and parent_id not in found:
+                        found.add(parent_id)
+                        next_frontier.append(parent_id)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return found
+
+    def pedigree_ids(self, db: Session, parrot_id: int, generations: int) -> FrozenSet[int]:
+        """系谱树中出现的全部鹦鹉ID（含自身）"""
+        return frozenset({parrot_id} | self.ancestor_ids(db, parrot_id, clamp_generations(generations)))
+
+
+lineage_graph = LineageGraph()
+
+
+# 只在系谱的边变化时失效：销售、状态、配对、照片统计等对 parrots 的修改不影响缓存
+_CHANGED_KEY = "lineage_changed"
+
+
+def _changes_lineage(obj, state: str) -> bool:
+    if isinstance(obj, IncubationRecord):
+        # 新建的孵化记录还没有子代
+        if state != "dirty":
+            return state == "deleted"
+        return any(attributes.get_history(obj, name).has_changes() for name in ("father_id", "mother_id"))
+    if isinstance(obj, Parrot):
+        # 删除作为父母的鹦鹉时其孵化记录随之删除，由上一分支处理
+        if state != "dirty":
+            return obj.incubation_record_id is not None
+        return attributes.get_history(obj, "incubation_record_id").has_changes()
+    return False
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    if session.info.get(_CHANGED_KEY):
+        return
+    for state, objects in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        if any(_changes_lineage(obj, state) for obj in objects):
+            session.info[_CHANGED_KEY] = True
+            return
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _do_orm_execute(orm_execute_state) -> None:
+    # Query.update()/delete() 不经过 flush：删除相关行、更新孵化记录、更新鹦鹉的来源窝时失效
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in (Parrot, IncubationRecord):
+        return
+    if orm_execute_state.is_update and mapper.class_ is Parrot:
+        values = getattr(orm_execute_state.statement, "_values", None) or {}
+        if "incubation_record_id" not in {getattr(key, "key", key) for key in values}:
+            return
+    orm_execute_state.session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        lineage_graph.invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def build_pedigree(db: Session, parrot_id: int, generations: int) -> Optional[dict]:
+    """
+    生成祖先系谱树（嵌套 dict: 鹦鹉信息 + father/mother）
+
+    结构来自邻接表缓存，鹦鹉信息用一条 IN 查询取回，不会逐层懒加载。
+    """
+    generations = clamp_generations(generations)
+    ids = lineage_graph.pedigree_ids(db, parrot_id, generations)
+    parrots = {p.id: p for p in db.query(Parrot).filter(Parrot.id.in_(ids))}
+    if parrot_id not in parrots:
+        return None
+
+    def node(node_id: Optional[int], depth: int) -> Optional[dict]:
+        parrot = parrots.get(node_id) if node_id is not None else None
+        if parrot is None:
+            return None
+        father_id, mother_id = lineage_graph.parents(db, node_id)
+        return {
+            "id": parrot.id,
+            "breed": parrot.breed,
+            "gender": parrot.gender,
+            "ring_number": parrot.ring_number,
+            "birth_date": parrot.birth_date,
+            "status": parrot.status,
+            "father": node(father_id, depth + 1) if depth < generations else None,
+            "mother": node(mother_id, depth + 1) if depth < generations else None,
+        }
+
+    return node(parrot_id, 0)
+
+
+def validate_offspring(
+    db: Session,
+    father_id: Optional[int],
+    mother_id: Optional[int],
+    parrot_ids: Iterable[int],
+) -> None:
+    """校验子代关联不会形成环（子代不能是父母本身或其祖先）"""
+    parents = {pid for pid in (father_id, mother_id) if pid is not None}
+    forbidden = set(parents)
+    # 写入前确认快照与数据库一致，其他进程刚关联的子代也参与成环检查
+    lineage_graph.snapshot(db, verify=True)
+    for parent_id in parents:
+        forbidden |= lineage_graph.ancestor_ids(db, parent_id)
+
+    for parrot_id in parrot_ids:
+        if parrot_id in forbidden:
+            raise BadRequestException(f"鹦鹉 {parrot_id} 是该窝父母或其祖先，不能设为子代")
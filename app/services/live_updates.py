@@ -0,0 +1,167 @@
+"""实时推送：数据变更通知与统计广播
+
+首页原先靠轮询 /api/statistics 和月度销售接口保持最新，每个打开的页面都单独查询数据库。
+这里把写操作转换为事件发布到 app.core.events.event_bus，由 /api/events/stream 推送：
+
+- change:     每个提交的事务一条，列出变更的鹦鹉、孵化记录、销售历史、回访记录ID；
+              照片变化会改变鹦鹉的照片数量/封面，记为鹦鹉变更。Query.update()/delete()
+              批量语句无法得知具体行，对应表的值为 null，客户端整体刷新
+- statistics: 统计相关的表变更后由 StatisticsBroadcaster 合并一个时间窗口内的变更，
+              重算一次统计，只推送内容发生变化的部分（overview / monthly_sales），
+              所有连接共享这一次计算
+
+变更在 flush 时收集，事务提交后才发布，回滚的事务不会通知。
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.change_hooks import on_commit
+from app.core.database import SessionLocal
+from app.core.events import event_bus
+from app.services.photo_stats import changed_parrots
+
+logger = logging.getLogger(__name__)
+
+TRACKED_TABLES = ("parrots", "incubation_records", "sales_history", "follow_ups")
+
+_INFO_KEY = "live_updates"
+
+# 表名 -> {"upserted": ID集合, "deleted": ID集合}；值为 None 表示批量语句修改，ID未知
+Changes = Dict[str, Optional[Dict[str, Set[int]]]]
+
+
+def _changes(session: Session) -> Changes:
+    return session.info.setdefault(_INFO_KEY, {})
+
+
+def _mark(changes: Changes, table: str, row_id: int, deleted: bool) -> None:
+    if table not in changes:
+        changes[table] = {"upserted": set(), "deleted": set()}
+    entry = changes[table]
+    if entry is None:
+        return
+    if deleted:
+        entry["upserted"].discard(row_id)
+        entry["deleted"].add(row_id)
+    else:
+        entry["upserted"].add(row_id)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    # 此时数据已写入但 new/dirty/deleted 仍是 flush 前的状态
+    changes = _changes(session)
+    for parrot_id in changed_parrots(session):
+        _mark(changes, "parrots", parrot_id, False)
+    for obj in session.new:
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES:
+            _mark(changes, obj.__tablename__, obj.id, False)
+    for obj in session.dirty:
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES and session.is_modified(obj, include_collections=False):
+            _mark(changes, obj.__tablename__, obj.id, False)
+    for obj in session.deleted:
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES:
+            _mark(changes, obj.__tablename__, obj.id, True)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _bulk_execute(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.local_table.name in TRACKED_TABLES:
+        _changes(orm_execute_state.session)[mapper.local_table.name] = None
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session: Session) -> None:
+    changes = session.info.pop(_INFO_KEY, None)
+    if not changes or not event_bus.has_listeners():
+        return
+    event_bus.publish("change", {
+        table: None if entry is None else {
+            "upserted": sorted(entry["upserted"]),
+            "deleted": sorted(entry["deleted"]),
+        }
+        for table, entry in changes.items()
+    })
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
+
+
+class StatisticsBroadcaster:
+    """
+    防抖的统计广播
+
+    notify() 可在任意线程调用；第一次变更后等待 debounce 秒，期间的变更合并为一次重算。
+    重算期间又有变更时，结束后再等待一个窗口重算一次。没有订阅者时不重算。
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]], tables: Iterable[str], debounce: float):
+        self.build = build
+        self.tables = frozenset(tables)
+        self.debounce = debounce
+        self._last: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dirty = False
+        on_commit(self._on_commit)
+
+    def start(self) -> None:
+        """在应用 lifespan 中调用，绑定当前事件循环；未启动时忽略变更通知"""
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_commit(self, tables: Set[str]) -> None:
+        if tables & self.tables:
+            self.notify()
+
+    def notify(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self) -> None:
+        if self._loop is None:
+            return
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run(), name="statistics-broadcast")
+        else:
+            self._dirty = True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.debounce)
+            self._dirty = False
+            if event_bus.has_listeners():
+                try:
+                    await asyncio.to_thread(self._broadcast)
+                except Exception:
+                    logger.exception("统计广播失败")
+            if not self._dirty:
+                return
+
+    def _broadcast(self) -> None:
+        sections = self.build()
+        delta = {name: value for name, value in sections.items() if self._last.get(name) != value}
+        self._last = sections
+        if delta:
+            event_bus.publish("statistics", delta)
+
@@ -0,0 +1,244 @@
+"""配对推荐
+
+按 亲缘系数、年龄差、品种 为候选配偶打分，返回得分最高的 K 个：
+
+- 亲缘系数 f(a, b)（= 二者后代的近交系数）用经典的递归公式计算：
+      f(a, a) = (1 + f(父a, 母a)) / 2
+      f(a, b) = (f(父a, b) + f(母a, b)) / 2      a 的世代不早于 b
+  父母未知视为无亲缘的奠基个体；中间结果按 (a, b) 记忆化，整个种群共享，
+  系谱变更前多次请求复用同一份缓存
+- 为一只种鸟推荐时，先用上面的递归求它与自身祖先的亲缘系数，其余个体按世代顺序
+  f(s, x) = (f(s, 父x) + f(s, 母x)) / 2 一次递推出整行，每次推荐只需线性遍历系谱
+- 系谱来自 app.services.lineage 的邻接表缓存，不逐只查询数据库；每次推荐前比较一次系谱摘要，
+  其他进程刚登记的子代也参与近亲过滤
+- 候选打分后用 heapq.nlargest 取前 K 个，不对全部候选排序
+"""
+import heapq
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Parrot
+from app.services.lineage import lineage_graph
+
+Parents = Dict[int, Tuple[Optional[int], Optional[int]]]
+
+# 全同胞/亲子的亲缘系数，作为亲缘得分的归一化基准
+FULL_SIBLING_KINSHIP = 0.25
+
+
+class KinshipCalculator:
+    """基于系谱的亲缘系数计算（记忆化）"""
+
+    def __init__(self, parents: Parents):
+        self._parents = parents
+        self._kinship: Dict[Tuple[int, int], float] = {}
+        self._generation: Dict[int, int] = {}
+        self._order: Optional[List[int]] = None
+
+    def generation(self, parrot_id: int) -> int:
+        """世代序号：奠基个体为 0，其余为父母世代的最大值 + 1，保证祖先的序号小于后代"""
+        cached = self._generation.get(parrot_id)
+        if cached is not None:
+            return cached
+        # 迭代计算，避免深系谱递归过深
+        stack = [parrot_id]
+        while stack:
+            node = stack[-1]
+            pending = [
+                p for p in self._parents.get(node, ())
+                if p is not None and p not in self._generation
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            parent_generations = [
+                self._generation[p] for p in self._parents.get(node, ()) if p is not None
+            ]
+            self._generation[node] = max(parent_generations) + 1 if parent_generations else 0
+        return self._generation[parrot_id]
+
+    def inbreeding(self, parrot_id: int) -> float:
+        """个体的近交系数 F = f(父, 母)"""
+        father_id, mother_id = self._parents.get(parrot_id, (None, None))
+        if father_id is None or mother_id is None:
+            return 0.0
+        return self.kinship(father_id, mother_id)
+
+    def kinship(self, a: int, b: int) -> float:
+        """亲缘系数 f(a, b)"""
+        key = (a, b) if a <= b else (b, a)
+        cached = self._kinship.get(key)
+        if cached is not None:
+            return cached
+
+        if a == b:
+            value = 0.5 * (1.0 + self.inbreeding(a))
+        else:
+            # 展开世代较晚的一方（它不可能是另一方的祖先）
+            if self.generation(a) < self.generation(b):
+                a, b = b, a
+            father_id, mother_id = self._parents.get(a, (None, None))
+            value = 0.5 * (
+                (self.kinship(father_id, b) if father_id is not None else 0.0)
+                + (self.kinship(mother_id, b) if mother_id is not None else 0.0)
+            )
+        if len(self._kinship) >= settings.MATE_KINSHIP_CACHE_SIZE:
+            self._kinship.clear()
+        self._kinship[key] = value
+        return value
+
+    def ancestors(self, parrot_id: int) -> Set[int]:
+        found: Set[int] = set()
+        stack = [parrot_id]
+        while stack:
+            for parent_id in self._parents.get(stack.pop(), ()):
+                if parent_id is not None and parent_id not in found:
+                    found.add(parent_id)
+                    stack.append(parent_id)
+        return found
+
+    def _pedigree_order(self) -> List[int]:
+        """系谱中出现的全部个体，按世代排序（父母总在子代之前）"""
+        if self._order is None:
+            ids = set(self._parents)
+            for pair in self._parents.values():
+                ids.update(p for p in pair if p is not None)
+            self._order = sorted(ids, key=self.generation)
+        return self._order
+
+    def kinship_row(self, subject_id: int) -> Dict[int, float]:
+        """subject 与系谱中所有个体的亲缘系数，只包含非零项；不在结果中的个体亲缘系数为 0"""
+        row: Dict[int, float] = {}
+        for other in self.ancestors(subject_id) | {subject_id}:
+            value = self.kinship(subject_id, other)
+            if value:
+                row[other] = value
+        fixed = set(row)
+        for node in self._pedigree_order():
+            if node in fixed or node == subject_id:
+                continue
+            father_id, mother_id = self._parents.get(node, (None, None))
+            value = 0.5 * (row.get(father_id, 0.0) + row.get(mother_id, 0.0))
+            if value:
+                row[node] = value
+        return row
+
+
+_calculator: Optional[KinshipCalculator] = None
+_calculator_source: Optional[Parents] = None
+_calculator_lock = threading.Lock()
+
+
+def get_kinship_calculator(db: Session) -> KinshipCalculator:
+    """
+    与系谱邻接表快照绑定的计算器，快照更新后重新创建
+
+    近亲过滤不能使用旧系谱，取快照时总是校验系谱摘要（一条聚合查询）；摘要未变时沿用
+    同一份快照和计算器，亲缘系数的记忆化缓存不受其他表写入影响。
+    """
+    global _calculator, _calculator_source
+    parents = lineage_graph.snapshot(db, verify=True).parents
+    with _calculator_lock:
+        if _calculator is None or _calculator_source is not parents:
+            _calculator = KinshipCalculator(parents)
+            _calculator_source = parents
+        return _calculator
+
+
+@dataclass
+class Candidate:
+    """候选配偶（只取打分和展示需要的列）"""
+    id: int
+    breed: str
+    gender: str
+    ring_number: Optional[str]
+    birth_date: Optional[date]
+    health_notes: Optional[str]
+
+
+@dataclass
+class MateScore:
+    candidate: Candidate
+    score: float
+    kinship: float
+    age_gap_days: Optional[int]
+    same_breed: bool
+
+
+def age_score(a: Optional[date], b: Optional[date]) -> Tuple[float, Optional[int]]:
+    """年龄差得分：相差为 0 得 1 分，达到 MATE_AGE_GAP_DAYS 得 0 分；出生日期未知得 0.5 分"""
+    if a is None or b is None:
+        return 0.5, None
+    gap = abs((a - b).days)
+    return max(0.0, 1.0 - gap / settings.MATE_AGE_GAP_DAYS), gap
+
+
+def rank_candidates(
+    subject: Candidate,
+    candidates: Iterable[Candidate],
+    kinship: Dict[int, float],
+    limit: int,
+    max_kinship: float,
+) -> List[MateScore]:
+    """
+    为候选打分并返回得分最高的 limit 个，亲缘系数超过 max_kinship 的候选被排除
+
+    kinship 为 subject 与各候选的亲缘系数（KinshipCalculator.kinship_row 的结果）
+    """
+    weight_total = settings.MATE_WEIGHT_KINSHIP + settings.MATE_WEIGHT_AGE + settings.MATE_WEIGHT_BREED
+
+    def scored():
+        for candidate in candidates:
+            coefficient = kinship.get(candidate.id, 0.0)
+            if coefficient > max_kinship:
+                continue
+            relatedness = max(0.0, 1.0 - coefficient / FULL_SIBLING_KINSHIP)
+            age, gap = age_score(subject.birth_date, candidate.birth_date)
+            same_breed = candidate.breed == subject.breed
+            score = (
+                settings.MATE_WEIGHT_KINSHIP * relatedness
+                + settings.MATE_WEIGHT_AGE * age
+                + settings.MATE_WEIGHT_BREED * (1.0 if same_breed else 0.0)
+            ) / weight_total
+            yield MateScore(candidate, round(score, 4), coefficient, gap, same_breed)
+
+    # 得分相同时 ID 小的在前
+    return heapq.nlargest(limit, scored(), key=lambda item: (item.score, -item.candidate.id))
+
+
+def _candidate_rows(db: Session, *criteria) -> List[Candidate]:
+    rows = db.execute(
+        select(
+            Parrot.id,
+            Parrot.breed,
+            Parrot.gender,
+            Parrot.ring_number,
+            Parrot.birth_date,
+            Parrot.health_notes,
+        ).where(*criteria)
+    ).all()
+    return [Candidate(*row) for row in rows]
+
+
+def recommend_mates(db: Session, parrot: Parrot, limit: int, max_kinship: float) -> List[MateScore]:
+    """为指定鹦鹉推荐未配对的异性种鸟"""
+    subject = Candidate(
+        parrot.id, parrot.breed, parrot.gender, parrot.ring_number, parrot.birth_date, parrot.health_notes,
+    )
+    opposite = "母" if parrot.gender == "公" else "公"
+    candidates = _candidate_rows(
+        db,
+        Parrot.gender == opposite,
+        Parrot.status == "breeding",
+        Parrot.mate_id.is_(None),
+        Parrot.id != parrot.id,
+    )
+    kinship = get_kinship_calculator(db).kinship_row(parrot.id)
+    return rank_candidates(subject, candidates, kinship, limit, max_kinship)
@@ -0,0 +1,328 @@
+"""孤儿文件与记录回收
+
+上传目录中没有对应 Photo 记录的文件（上传后数据库写入失败、删除鹦鹉时遗留等）
+以及文件已丢失的 Photo 记录都会被找出来。
+
+- 文件侧：用 os.scandir 按文件名有序遍历 uploads/，每批与 Photo 的
+  file_path/poster_path/stream_path 做集合差
+- 记录侧：按主键分批扫描 Photo，检查文件是否存在
+
+遍历断点保存在上传目录下的状态文件中，每次运行只处理有限数量的文件，
+大目录可以分多次增量完成，不会长时间占用数据库和磁盘。
+
+    python -m app.services.media_gc --dry-run          # 只报告不删除
+    python -m app.services.media_gc --max-files 0      # 一次扫完整个目录
+    python -m app.services.media_gc --delete-missing-rows
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import or_
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Photo
+from app.services import photo_stats
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".media_gc_state.json"
+LOCK_FILENAME = ".media_gc.lock"
+
+# 报告中最多列出的样例路径数量
+SAMPLE_LIMIT = 50
+
+
+@dataclass
+class GCReport:
+    """回收报告"""
+    dry_run: bool
+    scanned_files: int = 0
+    orphan_files: int = 0
+    orphan_bytes: int = 0
+    deleted_files: int = 0
+    reclaimed_bytes: int = 0
+    scanned_rows: int = 0
+    missing_rows: int = 0
+    deleted_rows: int = 0
+    files_pass_completed: bool = False
+    rows_pass_completed: bool = False
+    orphan_samples: List[str] = field(default_factory=list)
+    missing_row_samples: List[int] = field(default_factory=list)
+
+
+def _iter_files(directory: str, prefix: Tuple[str, ...], after: Tuple[str, ...]) -> Iterator[Tuple[Tuple[str, ...], os.DirEntry]]:
+    """
+    按路径分段的字典序深度优先遍历文件，跳过断点之前的部分
+
+    同一目录内按文件名排序，遍历顺序与路径元组的字典序一致，
+    因此可以用上次处理到的路径元组作为断点，并整体跳过断点之前的子目录。
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except FileNotFoundError:
+        return
+
+    for entry in entries:
+        # 跳过 .gitkeep、状态文件等隐藏文件
+        if entry.name.startswith("."):
+            continue
+
+        parts = prefix + (entry.name,)
+
+        if entry.is_dir(follow_symlinks=False):
+            if after and parts < after[:len(parts)]:
+                continue
+            yield from _iter_files(entry.path, parts, after)
+        elif entry.is_file(follow_symlinks=False):
+            if after and parts <= after:
+                continue
+            yield parts, entry
+
+
+class MediaGarbageCollector:
+    """上传目录孤儿文件回收器"""
+
+    def __init__(
+        self,
+        upload_dir: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        grace_seconds: Optional[int] = None,
+        dry_run: bool = False,
+    ):
+        self.root = Path(upload_dir or settings.UPLOAD_DIR)
+        self.batch_size = batch_size or settings.MEDIA_GC_BATCH_SIZE
+        self.grace_seconds = settings.MEDIA_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        self.dry_run = dry_run
+        self.state_path = self.root / STATE_FILENAME
+
+    # ---------- 断点状态 ----------
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: dict) -> None:
+        if self.dry_run:
+            return
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.state_path)
+
+    # ---------- 文件侧 ----------
+
+    def _referenced(self, db, paths: List[str]) -> set:
+        """查询一批路径中被 Photo 引用的部分"""
+        rows = (
+            db.query(Photo.file_path, Photo.poster_path, Photo.stream_path)
+            .filter(or_(
+                Photo.file_path.in_(paths),
+                Photo.poster_path.in_(paths),
+                Photo.stream_path.in_(paths),
+            ))
+            .all()
+        )
+        referenced = set()
+        for row in rows:
+            referenced.update(p for p in row if p)
+        return referenced
+
+    def _process_file_batch(self, db, batch: List[Tuple[str, os.DirEntry]], report: GCReport) -> None:
+        referenced = self._referenced(db, [path for path, _ in batch])
+        cutoff = time.time() - self.grace_seconds
+
+        for path, entry in batch:
+            if path in referenced:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            # 保护期内的文件可能对应尚未提交的上传
+            if stat.st_mtime > cutoff:
+                continue
+
+            report.orphan_files += 1
+            report.orphan_bytes += stat.st_size
+            if len(report.orphan_samples) < SAMPLE_LIMIT:
+                report.orphan_samples.append(path)
+
+            if not self.dry_run:
+                try:
+                    os.remove(entry.path)
+                    report.deleted_files += 1
+                    report.reclaimed_bytes += stat.st_size
+                except OSError as e:
+                    logger.warning("孤儿文件删除失败 %s: %s", path, e)
+
+    def collect_files(self, report: GCReport, max_files: int, resume: bool = True) -> None:
+        state = self._load_state()
+        after = tuple(state.get("file_cursor") or ()) if resume else ()
+
+        batch: List[Tuple[str, os.DirEntry]] = []
+        last_parts: Tuple[str, ...] = ()
+        completed = True
+
+        db = SessionLocal()
+        try:
+            for parts, entry in _iter_files(str(self.root), (), after):
+                batch.append(("/".join(parts), entry))
+                last_parts = parts
+                report.scanned_files += 1
+
+                if len(batch) >= self.batch_size:
+                    self._process_file_batch(db, batch, report)
+                    batch = []
+                    db.rollback()  # 结束只读事务，避免长事务
+
+                if max_files and report.scanned_files >= max_files:
+                    completed = False
+                    break
+
+            if batch:
+                self._process_file_batch(db, batch, report)
+        finally:
+            db.close()
+
+        report.files_pass_completed = completed
+        state["file_cursor"] = None if completed else list(last_parts)
+        self._save_state(state)
+
+    # ---------- 记录侧 ----------
+
+    def collect_rows(self, report: GCReport, max_rows: int, delete_missing: bool = False, resume: bool = True) -> None:
+        state = self._load_state()
+        last_id = (state.get("row_cursor") or 0) if resume else 0
+        completed = False
+
+        db = SessionLocal()
+        try:
+            while True:
+                rows = (
+                    db.query(Photo.id, Photo.file_path)
+                    .filter(Photo.id > last_id)
+                    .order_by(Photo.id)
+                    .limit(self.batch_size)
+                    .all()
+                )
+                if not rows:
+                    completed = True
+                    break
+
+                missing = [photo_id for photo_id, path in rows if not (self.root / path).is_file()]
+                report.scanned_rows += len(rows)
+                report.missing_rows += len(missing)
+                report.missing_row_samples.extend(missing[:SAMPLE_LIMIT - len(report.missing_row_samples)])
+
+                if missing and delete_missing and not self.dry_run:
+                    parrot_ids = {
+                        parrot_id for parrot_id, in
+                        db.query(Photo.parrot_id).filter(Photo.id.in_(missing)).distinct().all()
+                    }
+                    report.deleted_rows += (
+                        db.query(Photo).filter(Photo.id.in_(missing)).delete(synchronize_session=False)
+                    )
+                    photo_stats.refresh(db, parrot_ids)
+                    db.commit()
+                else:
+                    db.rollback()
+
+                last_id = rows[-1][0]
+                if max_rows and report.scanned_rows >= max_rows:
+                    break
+        finally:
+            db.close()
+
+        report.rows_pass_completed = completed
+        state["row_cursor"] = None if completed else last_id
+        self._save_state(state)
+
+    # ---------- 入口 ----------
+
+    def run(self, max_files: int = 0, delete_missing_rows: bool = False, resume: bool = True) -> Optional[GCReport]:
+        """
+        执行一次回收
+
+        Args:
+            max_files: 本次最多扫描的文件数(记录侧同样限制)，0 表示不限制
+            delete_missing_rows: 是否删除文件已丢失的 Photo 记录
+            resume: 是否从上次断点继续
+
+        Returns:
+            回收报告；其他进程正在执行时返回 None
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        report = GCReport(dry_run=self.dry_run)
+
+        with open(self.root / LOCK_FILENAME, "w") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    logger.info("其他进程正在执行孤儿文件回收，跳过本次")
+                    return None
+
+            self.collect_files(report, max_files, resume=resume)
+            self.collect_rows(report, max_files, delete_missing=delete_missing_rows, resume=resume)
+
+        return report
+
+
+def run_scheduled_gc() -> None:
+    """定时任务入口"""
+    collector = MediaGarbageCollector(dry_run=settings.MEDIA_GC_DRY_RUN)
+    report = collector.run(max_files=settings.MEDIA_GC_MAX_FILES_PER_RUN)
+    if report is not None:
+        logger.info(
+            "孤儿文件回收: 扫描 %s 个文件, 孤儿 %s 个(%s 字节), 已删除 %s 个; 丢失文件的记录 %s 条",
+            report.scanned_files, report.orphan_files, report.orphan_bytes,
+            report.deleted_files, report.missing_rows,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="上传目录孤儿文件与记录回收")
+    parser.add_argument("--dry-run", action="store_true", help="只输出报告，不删除文件和记录")
+    parser.add_argument("--batch-size", type=int, help="每批比对的数量")
+    parser.add_argument("--max-files", type=int, default=settings.MEDIA_GC_MAX_FILES_PER_RUN, help="本次最多扫描的文件数，0 表示扫完整个目录")
+    parser.add_argument("--grace-seconds", type=int, help="新文件保护期(秒)")
+    parser.add_argument("--delete-missing-rows", action="store_true", help="删除文件已丢失的照片记录")
+    parser.add_argument("--restart", action="store_true", help="忽略断点，从头开始扫描")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    collector = MediaGarbageCollector(
+        batch_size=args.batch_size,
+        grace_seconds=args.grace_seconds,
+        dry_run=args.dry_run,
+    )
+    report = collector.run(
+        max_files=args.max_files,
+        delete_missing_rows=args.delete_missing_rows,
+        resume=not args.restart,
+    )
+    if report is None:
+        return 1
+
+    print(json.dumps(asdict(report), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""鹦鹉事件与销售时间线
+
+销售时间线原本每次请求都从 parrots、sales_history、follow_ups 三张表拼装后再按字符串排序，
+这里改为在各写操作中向 parrot_events 追加事件（只追加、不修改），时间线接口按
+(parrot_id, occurred_at, id) 索引顺序读取一次即可。出生事件随鹦鹉的 birth_date 变化，
+不落表，读取时插入到对应位置。
+
+- 录入：record_created()
+- 售出 / 修改销售信息：record_sale()（sale_seq 为第几次销售）
+- 退货：record_return()
+- 回访：record_follow_up()
+- 状态变更：record_status_change()
+- 孵化：record_incubation_started() / record_incubation_status()
+
+已有数据通过命令行补建事件（已有事件的鹦鹉跳过，可重复执行）：
+
+    python -m app.services.parrot_events backfill
+"""
+import argparse
+import bisect
+import logging
+import sys
+from collections import defaultdict
+from datetime import datetime, time
+from typing import Dict, List, Optional
+
+from sqlalchemy import exists, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models import FollowUp, IncubationRecord, Parrot, ParrotEvent, SalesHistory
+from app.schemas.rows import TimelineEvent
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_UP_STATUS_TEXT = {
+    "pending": "待回访",
+    "completed": "已回访",
+    "no_contact": "无法联系",
+}
+
+
+def _event(
+    parrot_id: int,
+    event_type: str,
+    title: str,
+    occurred_at: datetime,
+    description: Optional[str] = None,
+    details: Optional[dict] = None,
+    sale_seq: Optional[int] = None,
+) -> dict:
+    return {
+        "parrot_id": parrot_id,
+        "event_type": event_type,
+        "title": title,
+        "occurred_at": occurred_at,
+        "description": description,
+        "details": details,
+        "sale_seq": sale_seq,
+    }
+
+
+def _append(db: Session, event: dict) -> ParrotEvent:
+    row = ParrotEvent(**event)
+    db.add(row)
+    return row
+
+
+# ---- 事件内容（写入与补建共用） ----
+
+def _created_event(parrot_id: int, created_at: datetime) -> dict:
+    return _event(parrot_id, "system", "录入系统", created_at, "鹦鹉信息录入系统")
+
+
+def _sale_event(parrot_id: int, sale_seq: int, sold_at: datetime, sale, event_type: str = "sale") -> dict:
+    """sale 为 Parrot 或 SalesHistory，两者的销售字段同名（备注分别为 sale_notes）"""
+    sale_price = float(sale.sale_price) if sale.sale_price else 0
+    title = f"第{sale_seq}次销售" if event_type == "sale" else f"修改第{sale_seq}次销售信息"
+    return _event(
+        parrot_id,
+        event_type,
+        title,
+        sold_at,
+        f"售卖人: {sale.seller}, 购买者: {sale.buyer_name}, 价格: ¥{sale_price:.2f}",
+        {
+            "seller": sale.seller,
+            "buyer_name": sale.buyer_name,
+            "sale_price": sale_price,
+            "contact": sale.contact,
+            "follow_up_status": sale.follow_up_status,
+            "notes": sale.sale_notes,
+        },
+        sale_seq,
+    )
+
+
+def _return_event(parrot_id: int, returned_at: datetime, reason: Optional[str], sale_seq: Optional[int]) -> dict:
+    return _event(parrot_id, "return", "退货", returned_at, f"退货原因: {reason}", sale_seq=sale_seq)
+
+
+def _follow_up_event(follow_up) -> dict:
+    status_text = FOLLOW_UP_STATUS_TEXT.get(follow_up.follow_up_status, follow_up.follow_up_status)
+    return _event(
+        follow_up.parrot_id,
+        "follow_up",
+        "回访",
+        follow_up.follow_up_date or follow_up.created_at,
+        f"回访状态: {status_text}, 备注: {follow_up.notes or '无'}",
+        {
+            "follow_up_status": status_text,
+            "notes": follow_up.notes,
+        },
+    )
+
+
+def _incubation_started_event(parrot_id: int, record) -> dict:
+    return _event(
+        parrot_id,
+        "incubation",
+        "开始孵化",
+        datetime.combine(record.start_date, time.min),
+        f"孵化记录 #{record.id}，蛋数: {record.eggs_count}，预计出壳: {record.expected_hatch_date.isoformat()}",
+        {"incubation_record_id": record.id},
+    )
+
+
+def _incubation_status_event(parrot_id: int, record, occurred_at: datetime, old_status: Optional[str]) -> dict:
+    change = f"{old_status} → {record.status}" if old_status else record.status
+    return _event(
+        parrot_id,
+        "incubation",
+        "孵化状态变更",
+        occurred_at,
+        f"孵化记录 #{record.id}: {change}，出壳数: {record.hatched_count}",
+        {"incubation_record_id": record.id, "status": record.status},
+    )
+
+
+# ---- 写操作调用（调用方负责提交） ----
+
+def current_sale_seq(db: Session, parrot_id: int) -> int:
+    """已记录的销售次数"""
+    db.flush()
+    return db.query(func.max(ParrotEvent.sale_seq)).filter(ParrotEvent.parrot_id == parrot_id).scalar() or 0
+
+
+def record_created(db: Session, parrot: Parrot) -> None:
+    """需在 flush 之后调用（需要鹦鹉ID）"""
+    _append(db, _created_event(parrot.id, parrot.created_at or datetime.utcnow()))
+
+
+def record_sale(db: Session, parrot: Parrot, was_sold: bool) -> None:
+    """
+    记录售出；was_sold 为修改前是否已处于售出状态，是则视为修改当前这次销售的信息
+    """
+    sale_seq = current_sale_seq(db, parrot.id)
+    if was_sold and sale_seq:
+        _append(db, _sale_event(parrot.id, sale_seq, parrot.sold_at, parrot, "sale_update"))
+    else:
+        _append(db, _sale_event(parrot.id, sale_seq + 1, parrot.sold_at, parrot))
+
+
+def record_return(db: Session, parrot: Parrot) -> None:
+    """在退货信息写入鹦鹉之后调用"""
+    sale_seq = current_sale_seq(db, parrot.id) or None
+    _append(db, _return_event(parrot.id, parrot.returned_at, parrot.return_reason, sale_seq))
+
+
+def record_follow_up(db: Session, follow_up: FollowUp) -> None:
+    _append(db, _follow_up_event(follow_up))
+
+
+def record_status_change(db: Session, parrot: Parrot, old_status: str) -> None:
+    if old_status == parrot.status:
+        return
+    _append(db, _event(
+        parrot.id,
+        "status",
+        "状态变更",
+        datetime.utcnow(),
+        f"状态: {old_status} → {parrot.status}",
+        {"from": old_status, "to": parrot.status},
+    ))
+
+
+def record_incubation_started(db: Session, record: IncubationRecord) -> None:
+    """需在 flush 之后调用（需要孵化记录ID），父母各记一条"""
+    for parrot_id in (record.father_id, record.mother_id):
+        if parrot_id:
+            _append(db, _incubation_started_event(parrot_id, record))
+
+
+def record_incubation_status(db: Session, record: IncubationRecord, old_status: str) -> None:
+    if old_status == record.status:
+        return
+    now = datetime.utcnow()
+    for parrot_id in (record.father_id, record.mother_id):
+        if parrot_id:
+            _append(db, _incubation_status_event(parrot_id, record, now, old_status))
+
+
+# ---- 读取 ----
+
+def timeline(db: Session, parrot: Parrot) -> List[TimelineEvent]:
+    """按发生时间排序的时间线（一次索引范围读取）"""
+    rows = db.execute(
+        select(
+            ParrotEvent.title,
+            ParrotEvent.event_type,
+            ParrotEvent.occurred_at,
+            ParrotEvent.description,
+            ParrotEvent.details,
+        )
+        .where(ParrotEvent.parrot_id == parrot.id)
+        .order_by(ParrotEvent.occurred_at, ParrotEvent.id)
+    ).all()
+
+    events = [
+        TimelineEvent(
+            event=row.title,
+            date=row.occurred_at.isoformat(),
+            description=row.description,
+            type=row.event_type,
+            details=row.details,
+        )
+        for row in rows
+    ]
+
+    if parrot.birth_date:
+        # 出生日期只有日期部分，排在同一天的其他事件之前
+        position = bisect.bisect_left([row.occurred_at for row in rows], datetime.combine(parrot.birth_date, time.min))
+        events.insert(position, TimelineEvent(
+            event="出生",
+            date=parrot.birth_date.isoformat(),
+            description="鹦鹉出生",
+            type="birth",
+        ))
+    return events
+
+
+# ---- 补建 ----
+
+def _parrot_events(parrot, history: List, follow_ups: List, records: List) -> List[dict]:
+    """由已有数据推算一只鹦鹉的事件（与原时间线的拼装规则一致）"""
+    events = [_created_event(parrot.id, parrot.created_at)]
+
+    sale_seq = 0
+    for sale in history:
+        # 当前销售已在鹦鹉表上，若销售历史中也有同一次（未退货）记录则跳过
+        if sale.return_date is None and parrot.sold_at is not None and sale.sale_date == parrot.sold_at:
+            continue
+        sale_seq += 1
+        events.append(_sale_event(parrot.id, sale_seq, sale.sale_date, sale))
+        if sale.return_date:
+            events.append(_return_event(parrot.id, sale.return_date, sale.return_reason, sale_seq))
+
+    if parrot.sold_at:
+        sale_seq += 1
+        events.append(_sale_event(parrot.id, sale_seq, parrot.sold_at, parrot))
+    elif parrot.returned_at and not history:
+        events.append(_return_event(parrot.id, parrot.returned_at, parrot.return_reason, None))
+
+    events.extend(_follow_up_event(follow_up) for follow_up in follow_ups)
+
+    for record in records:
+        events.append(_incubation_started_event(parrot.id, record))
+        if record.status != "incubating":
+            occurred_at = (
+                datetime.combine(record.actual_hatch_date, time.min)
+                if record.actual_hatch_date else record.updated_at
+            )
+            events.append(_incubation_status_event(parrot.id, record, occurred_at, None))
+
+    events.sort(key=lambda event: event["occurred_at"])
+    return events
+
+
+def backfill(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """为还没有事件的鹦鹉补建事件，按鹦鹉ID分批提交"""
+    counts = {"parrots": 0, "events": 0}
+    table = ParrotEvent.__table__
+    now = datetime.utcnow()
+    last_id = 0
+
+    while True:
+        parrots = db.execute(
+            select(
+                Parrot.id,
+                Parrot.created_at,
+                Parrot.sold_at,
+                Parrot.returned_at,
+                Parrot.return_reason,
+                Parrot.seller,
+                Parrot.buyer_name,
+                Parrot.sale_price,
+                Parrot.contact,
+                Parrot.follow_up_status,
+                Parrot.sale_notes,
+            )
+            .where(
+                Parrot.id > last_id,
+                ~exists().where(ParrotEvent.parrot_id == Parrot.id),
+            )
+            .order_by(Parrot.id)
+            .limit(batch_size)
+        ).all()
+        if not parrots:
+            break
+        last_id = parrots[-1].id
+        ids = {parrot.id for parrot in parrots}
+
+        history = defaultdict(list)
+        for row in db.execute(
+            select(SalesHistory).where(SalesHistory.parrot_id.in_(ids)).order_by(SalesHistory.sale_date, SalesHistory.id)
+        ).scalars():
+            history[row.parrot_id].append(row)
+
+        follow_ups = defaultdict(list)
+        for row in db.execute(select(FollowUp).where(FollowUp.parrot_id.in_(ids))).scalars():
+            follow_ups[row.parrot_id].append(row)
+
+        records = defaultdict(list)
+        for row in db.execute(
+            select(IncubationRecord).where(or_(IncubationRecord.father_id.in_(ids), IncubationRecord.mother_id.in_(ids)))
+        ).scalars():
+            for parrot_id in {row.father_id, row.mother_id}:
+                if parrot_id in ids:
+                    records[parrot_id].append(row)
+
+        rows = []
+        for parrot in parrots:
+            for event in _parrot_events(parrot, history[parrot.id], follow_ups[parrot.id], records[parrot.id]):
+                event["created_at"] = now
+                rows.append(event)
+        if rows:
+            db.execute(insert(table), rows)
+        db.commit()
+        db.expunge_all()
+        counts["parrots"] += len(parrots)
+        counts["events"] += len(rows)
+
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="鹦鹉事件维护")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subparsers.add_parser("backfill", help="为已有鹦鹉补建销售时间线事件")
+    backfill_parser.add_argument("--batch-size", type=int, default=500, help="每批处理的鹦鹉数")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    db = SessionLocal()
+    try:
+        counts = backfill(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    logger.info("鹦鹉事件补建完成: 处理鹦鹉 %d 只，新建事件 %d 条", counts["parrots"], counts["events"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""鹦鹉筛选计数
+
+筛选抽屉需要在当前筛选条件下按品种、性别、状态、价格区间、年龄区间显示数量。
+facet_counts() 在一条分组查询里算出全部维度：
+
+- PostgreSQL：GROUP BY GROUPING SETS (breed, gender, status, price_band, age_band)，
+  用 GROUPING() 位掩码区分每行属于哪个维度
+- 其他数据库（SQLite、MySQL 不支持 GROUPING SETS）：筛选结果作为 CTE，
+  每个维度一段 GROUP BY，UNION ALL 合并（SQLite 对多次引用的 CTE 只计算一次）
+
+价格区间的分界由 PARROT_PRICE_BANDS 配置，未定价的鹦鹉归入 value 为 null 的一组。
+年龄区间的分界由 PARROT_AGE_BANDS_DAYS 配置，按当天日期换算为出生日期的比较，
+与年龄筛选一样可以使用 (status, birth_date) 索引；没有出生日期的鹦鹉归入 value 为 null 的一组。
+品种按 breed_id 分组，名称取自品种字典（app.services.breeds）。
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import case, func, literal, select, union_all
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.models import Parrot
+from app.services.breeds import breed_dictionary
+
+FACETS = ("breed", "gender", "status", "price_band", "age_band")
+
+# 按区间顺序而不是数量排列的维度
+BANDED_FACETS = ("price_band", "age_band")
+
+
+def price_band_labels(bounds: Sequence[float]) -> List[str]:
+    """价格区间名称，如 [500, 1000] -> ["0-500", "500-1000", "1000+"]"""
+    edges = [0, *bounds]
+    labels = [f"{_number(low)}-{_number(high)}" for low, high in zip(edges, edges[1:])]
+    labels.append(f"{_number(edges[-1])}+")
+    return labels
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def price_band(column, bounds: Sequence[float]):
+    """价格所在区间名称的 SQL 表达式，价格为空时为 NULL"""
+    labels = price_band_labels(bounds)
+    whens = [(column < bound, label) for bound, label in zip(bounds, labels)]
+    return case((column.is_(None), None), *whens, else_=labels[-1])
+
+
+def age_band_labels(bounds: Sequence[int]) -> List[str]:
+    """年龄区间名称，如 [60, 120] -> ["0-60天", "60-120天", "120天+"]，区间含下界不含上界"""
+    edges = [0, *bounds]
+    labels = [f"{low}-{high}天" for low, high in zip(edges, edges[1:])]
+    labels.append(f"{edges[-1]}天+")
+    return labels
+
+
+def age_band(column, bounds: Sequence[int], today: date):
+    """
+    出生日期所在年龄区间名称的 SQL 表达式，出生日期为空时为 NULL
+
+    年龄 < N 天等价于 birth_date > today - N 天，分界日期在这里算好，SQL 中只做日期比较。
+    """
+    labels = age_band_labels(bounds)
+    whens = [(column > today - timedelta(days=bound), label) for bound, label in zip(bounds, labels)]
+    return case((column.is_(None), None), *whens, else_=labels[-1])
+
+
+def _grouping_sets_statement(filtered):
+    columns = [filtered.c[name] for name in FACETS]
+    return (
+        select(*columns, func.grouping(*columns).label("facet_mask"), func.count().label("facet_count"))
+        .group_by(func.grouping_sets(*columns))
+    )
+
+
+def _grouping_mask(index: int) -> int:
+    # GROUPING(a, b, c, d) 中未参与分组的列对应位为 1，第一列为最高位
+    full = (1 << len(FACETS)) - 1
+    return full ^ (1 << (len(FACETS) - 1 - index))
+
+
+def _union_all_statement(filtered):
+    return union_all(*[
+        select(literal(name).label("facet"), filtered.c[name].label("value"), func.count().label("facet_count"))
+        .group_by(filtered.c[name])
+        for name in FACETS
+    ])
+
+
+def facet_counts(
+    db: Session,
+    query: Query,
+    bounds: Optional[Sequence[float]] = None,
+    age_bounds: Optional[Sequence[int]] = None,
+    today: Optional[date] = None,
+) -> Dict[str, Any]:
+    """
+    统计已按筛选条件过滤的鹦鹉查询在各维度上的数量
+
+    Returns:
+        {"total": 120, "breed": [{"value": "玄凤", "count": 80}, ...], "gender": [...],
+         "status": [...], "price_band": [...], "age_band": [...]}
+        品种、性别、状态按数量从多到少排列，价格区间、年龄区间按区间顺序排列。
+    """
+    bounds = list(settings.PARROT_PRICE_BANDS if bounds is None else bounds)
+    age_bounds = list(settings.PARROT_AGE_BANDS_DAYS if age_bounds is None else age_bounds)
+    today = today or date.today()
+    entities = query.with_entities(
+        Parrot.breed_id.label("breed"),
+        Parrot.gender.label("gender"),
+        Parrot.status.label("status"),
+        price_band(Parrot.price, bounds).label("price_band"),
+        age_band(Parrot.birth_date, age_bounds, today).label("age_band"),
+    )
+
+    counts: Dict[str, Dict[Optional[str], int]] = {name: {} for name in FACETS}
+    if db.get_bind().dialect.name == "postgresql":
+        filtered = entities.subquery("filtered")
+        masks = {_grouping_mask(index): name for index, name in enumerate(FACETS)}
+        for row in db.execute(_grouping_sets_statement(filtered)):
+            name = masks[row.facet_mask]
+            counts[name][row[FACETS.index(name)]] = row.facet_count
+    else:
+        filtered = entities.cte("filtered")
+        for row in db.execute(_union_all_statement(filtered)):
+            counts[row.facet][row.value] = row.facet_count
+
+    names = breed_dictionary.names(db, counts["breed"])
+    breed_counts: Dict[Optional[str], int] = {}
+    for breed_id, count in counts["breed"].items():
+        name = names.get(breed_id)
+        breed_counts[name] = breed_counts.get(name, 0) + count
+    counts["breed"] = breed_counts
+
+    result: Dict[str, Any] = {"total": sum(counts["breed"].values())}
+    for name in ("breed", "gender", "status"):
+        result[name] = [
+            {"value": value, "count": count}
+            for value, count in sorted(counts[name].items(), key=lambda item: (-item[1], item[0] or ""))
+        ]
+    band_labels = {"price_band": price_band_labels(bounds), "age_band": age_band_labels(age_bounds)}
+    for name in BANDED_FACETS:
+        order = {label: index for index, label in enumerate(band_labels[name])}
+        result[name] = [
+            {"value": value, "count": count}
+            for value, count in sorted(counts[name].items(), key=lambda item: order.get(item[0], len(order)))
+        ]
+    return result
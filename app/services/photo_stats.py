@@ -0,0 +1,195 @@
+"""鹦鹉照片统计（反范式字段）
+
+Parrot.photo_count / cover_photo_id / cover_photo_path 冗余保存照片数量和封面，
+鹦鹉列表、详情、销售记录等读取路径不再逐只查询 photos 表。
+
+- ORM 方式新增、删除、修改照片（上传、删除、单张排序、转码生成封面帧）时，
+  flush 事件在同一事务内按受影响的鹦鹉重新计算
+- Query.update()/delete() 等批量语句不经过 flush，调用方需显式调用 refresh()
+- 数据出现偏差（直接改库、旧版本写入）时用命令行修复：
+
+    python -m app.services.photo_stats repair --dry-run
+    python -m app.services.photo_stats repair
+
+封面规则与原先一致：sort_order 最大、其次创建最早的一张；视频使用封面帧作为预览图。
+"""
+import argparse
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.database import SessionLocal
+from app.models import Parrot, Photo
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = ("photo_count", "cover_photo_id", "cover_photo_path")
+
+# 影响数量或封面的照片字段
+_TRACKED = ("parrot_id", "sort_order", "created_at", "file_path", "poster_path")
+
+_photos = Photo.__table__
+_parrots = Parrot.__table__
+
+
+def _cover_query(column):
+    return (
+        select(column)
+        .where(_photos.c.parrot_id == _parrots.c.id)
+        .order_by(_photos.c.sort_order.desc(), _photos.c.created_at.asc(), _photos.c.id.asc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _refresh_statement(parrot_ids: Iterable[int]):
+    return (
+        update(_parrots)
+        .where(_parrots.c.id.in_(list(parrot_ids)))
+        .values(
+            photo_count=select(func.count()).where(_photos.c.parrot_id == _parrots.c.id).scalar_subquery(),
+            cover_photo_id=_cover_query(_photos.c.id),
+            cover_photo_path=_cover_query(func.coalesce(_photos.c.poster_path, _photos.c.file_path)),
+            # 照片变化不算鹦鹉信息修改，保持 updated_at 不变
+            updated_at=_parrots.c.updated_at,
+        )
+    )
+
+
+def refresh(db: Session, parrot_ids: Iterable[int]) -> None:
+    """重新计算指定鹦鹉的照片统计（批量语句修改照片后调用，调用方负责提交）"""
+    parrot_ids = {parrot_id for parrot_id in parrot_ids if parrot_id is not None}
+    if not parrot_ids:
+        return
+    db.execute(_refresh_statement(parrot_ids))
+    _expire(db, parrot_ids)
+
+
+def _expire(db: Session, parrot_ids: Set[int]) -> None:
+    for parrot_id in parrot_ids:
+        parrot = db.identity_map.get(identity_key(Parrot, parrot_id))
+        if parrot is not None and parrot not in db.deleted:
+            db.expire(parrot, STAT_FIELDS)
+
+
+# ---- flush 事件 ----
+
+_AFFECTED_KEY = "photo_stats_parrots"
+
+
+def changed_parrots(session: Session) -> Set[int]:
+    """本次 flush 中照片发生变化的鹦鹉ID（在 after_flush 中调用）"""
+    parrot_ids = set()
+    for photo in session.new:
+        if isinstance(photo, Photo):
+            parrot_ids.add(photo.parrot_id)
+    for photo in session.deleted:
+        if isinstance(photo, Photo):
+            parrot_ids.add(photo.parrot_id)
+    for photo in session.dirty:
+        if not isinstance(photo, Photo):
+            continue
+        attrs = inspect(photo).attrs
+        for name in _TRACKED:
+            history = attrs[name].history
+            if history.has_changes():
+                parrot_ids.add(photo.parrot_id)
+                if name == "parrot_id":
+                    parrot_ids.update(history.deleted)
+    parrot_ids.discard(None)
+    return parrot_ids
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    # 此时照片已写入但 new/dirty/deleted 仍是 flush 前的状态
+    parrot_ids = changed_parrots(session)
+    if parrot_ids:
+        session.connection().execute(_refresh_statement(parrot_ids))
+        session.info.setdefault(_AFFECTED_KEY, set()).update(parrot_ids)
+
+
+@event.listens_for(SessionLocal, "after_flush_postexec")
+def _after_flush_postexec(session: Session, flush_context) -> None:
+    parrot_ids = session.info.pop(_AFFECTED_KEY, None)
+    if parrot_ids:
+        _expire(session, parrot_ids)
+
+
+# ---- 修复 ----
+
+def repair(db: Session, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+    """逐批比对冗余字段与照片表的实际值，修正不一致的鹦鹉"""
+    counts = {"scanned": 0, "mismatched": 0}
+    samples: List[int] = []
+    last_id = 0
+
+    while True:
+        parrots = db.execute(
+            select(Parrot.id, Parrot.photo_count, Parrot.cover_photo_id, Parrot.cover_photo_path)
+            .where(Parrot.id > last_id)
+            .order_by(Parrot.id)
+            .limit(batch_size)
+        ).all()
+        if not parrots:
+            break
+        first_id, last_id = parrots[0].id, parrots[-1].id
+
+        actual = {
+            row.id: (row.photo_count, row.cover_photo_id, row.cover_photo_path)
+            for row in db.execute(
+                select(
+                    _parrots.c.id,
+                    select(func.count()).where(_photos.c.parrot_id == _parrots.c.id).scalar_subquery().label("photo_count"),
+                    _cover_query(_photos.c.id).label("cover_photo_id"),
+                    _cover_query(func.coalesce(_photos.c.poster_path, _photos.c.file_path)).label("cover_photo_path"),
+                ).where(_parrots.c.id.between(first_id, last_id))
+            )
+        }
+        mismatched = [
+            row.id for row in parrots
+            if actual.get(row.id) != (row.photo_count, row.cover_photo_id, row.cover_photo_path)
+        ]
+
+        counts["scanned"] += len(parrots)
+        counts["mismatched"] += len(mismatched)
+        samples.extend(mismatched[:20 - len(samples)])
+        if mismatched and not dry_run:
+            db.execute(_refresh_statement(mismatched))
+            db.commit()
+        else:
+            db.rollback()
+
+    if samples:
+        logger.info("照片统计不一致的鹦鹉（示例）: %s", samples)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="鹦鹉照片统计维护")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    repair_parser = subparsers.add_parser("repair", help="修复 photo_count / 封面与照片表不一致的鹦鹉")
+    repair_parser.add_argument("--batch-size", type=int, default=1000, help="每批检查的鹦鹉数")
+    repair_parser.add_argument("--dry-run", action="store_true", help="只检查不修改")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    db = SessionLocal()
+    try:
+        counts = repair(db, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+    logger.info(
+        "照片统计检查完成: 检查 %d 只，不一致 %d 只%s",
+        counts["scanned"], counts["mismatched"], "（未修改）" if args.dry_run else "",
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
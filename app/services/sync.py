@@ -0,0 +1,225 @@
+"""增量同步（小程序本地副本）
+
+小程序每次显示页面都重新拉取鹦鹉、销售记录、孵化记录整页数据。这里维护一张变更日志
+sync_changes：鹦鹉或孵化记录新增/修改时写入一条变更，删除时写入墓碑，每行只保留最近一次
+变更，id 单调递增作为同步版本号。客户端保存上次的 version，调用 /api/sync?since=version
+只取回此后变化的行，合并到本地副本。
+
+- ORM flush 时在同一事务内写入变更（照片变化会改变鹦鹉的照片数量/封面，也记为鹦鹉变更）
+- Query.update()/delete() 等批量语句在执行前按其 WHERE 条件查出受影响的行ID
+- 直接执行 SQL、Core 批量插入（如基准数据生成）不会记录，可用命令行补录：
+
+    python -m app.services.sync backfill
+
+并发事务可能以与版本号不同的顺序提交，返回的 version 只推进到 SYNC_SETTLE_SECONDS
+之前的变更，更新的变更会在下次同步时重复下发（按ID覆盖，重复无副作用）。
+"""
+import argparse
+import logging
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, exists, false, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import IncubationRecord, Parrot, SyncChange
+from app.schemas.rows import SyncIncubationRow, SyncPage, SyncParrotRow
+from app.services.photo_stats import changed_parrots
+
+logger = logging.getLogger(__name__)
+
+TRACKED_MODELS = {
+    Parrot.__tablename__: Parrot,
+    IncubationRecord.__tablename__: IncubationRecord,
+}
+
+ChangeKey = Tuple[str, int]
+
+
+def _write(connection, changes: Dict[ChangeKey, bool]) -> None:
+    """写入变更（值为是否删除），同一行之前的变更记录先删除"""
+    if not changes:
+        return
+    table = SyncChange.__table__
+    keys = list(changes)
+    connection.execute(delete(table).where(tuple_(table.c.table_name, table.c.row_id).in_(keys)))
+    now = datetime.utcnow()
+    connection.execute(insert(table), [
+        {"table_name": table_name, "row_id": row_id, "deleted": changes[(table_name, row_id)], "changed_at": now}
+        for table_name, row_id in sorted(keys)
+    ])
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    # 此时数据已写入但 new/dirty/deleted 仍是 flush 前的状态
+    changes: Dict[ChangeKey, bool] = {}
+    for parrot_id in changed_parrots(session):
+        changes[(Parrot.__tablename__, parrot_id)] = False
+    for obj in session.new:
+        if getattr(obj, "__tablename__", None) in TRACKED_MODELS:
+            changes[(obj.__tablename__, obj.id)] = False
+    for obj in session.dirty:
+        if getattr(obj, "__tablename__", None) in TRACKED_MODELS and session.is_modified(obj, include_collections=False):
+            changes[(obj.__tablename__, obj.id)] = False
+    for obj in session.deleted:
+        if getattr(obj, "__tablename__", None) in TRACKED_MODELS:
+            changes[(obj.__tablename__, obj.id)] = True
+    _write(session.connection(), changes)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _bulk_execute(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    table = statement.table
+    if table.name not in TRACKED_MODELS:
+        return
+    # 语句执行前按同样的条件查出受影响的行
+    query = select(table.c.id)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    connection = orm_execute_state.session.connection()
+    row_ids = connection.execute(query).scalars().all()
+    _write(connection, {(table.name, row_id): orm_execute_state.is_delete for row_id in row_ids})
+
+
+# ---- 读取 ----
+
+def _parrot_row(parrot: Parrot) -> SyncParrotRow:
+    return SyncParrotRow(
+        id=parrot.id,
+        breed=parrot.breed,
+        price=parrot.price,
+        gender=parrot.gender,
+        birth_date=parrot.birth_date,
+        ring_number=parrot.ring_number,
+        status=parrot.status,
+        health_notes=parrot.health_notes,
+        created_at=parrot.created_at,
+        updated_at=parrot.updated_at,
+        photo_count=parrot.photo_count,
+        photo_url=parrot.cover_photo_url,
+        mate_id=parrot.mate_id,
+        paired_at=parrot.paired_at,
+        min_price=parrot.min_price,
+        max_price=parrot.max_price,
+        incubation_record_id=parrot.incubation_record_id,
+        sold_at=parrot.sold_at,
+        returned_at=parrot.returned_at,
+        return_reason=parrot.return_reason,
+        seller=parrot.seller,
+        buyer_name=parrot.buyer_name,
+        sale_price=parrot.sale_price,
+        contact=parrot.contact,
+        follow_up_status=parrot.follow_up_status,
+        sale_notes=parrot.sale_notes,
+    )
+
+
+def _incubation_row(record: IncubationRecord) -> SyncIncubationRow:
+    return SyncIncubationRow(
+        id=record.id,
+        father_id=record.father_id,
+        mother_id=record.mother_id,
+        start_date=record.start_date,
+        expected_hatch_date=record.expected_hatch_date,
+        actual_hatch_date=record.actual_hatch_date,
+        eggs_count=record.eggs_count,
+        hatched_count=record.hatched_count,
+        status=record.status,
+        notes=record.notes,
+        overdue_at=record.overdue_at,
+        created_at=record.created_at,
+        updated_at=record.updated_at,
+    )
+
+
+def changes_since(db: Session, since: int, limit: int) -> SyncPage:
+    entries = db.execute(
+        select(SyncChange.id, SyncChange.table_name, SyncChange.row_id, SyncChange.deleted, SyncChange.changed_at)
+        .where(SyncChange.id > since)
+        .order_by(SyncChange.id)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # 版本号只推进到已稳定的变更为止
+    settled_before = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    version = since
+    for entry in entries:
+        if entry.changed_at > settled_before:
+            has_more = False
+            break
+        version = entry.id
+
+    upserts: Dict[str, List[int]] = defaultdict(list)
+    deleted: Dict[str, List[int]] = {table_name: [] for table_name in TRACKED_MODELS}
+    for entry in entries:
+        (deleted if entry.deleted else upserts)[entry.table_name].append(entry.row_id)
+
+    parrots = db.query(Parrot).filter(Parrot.id.in_(upserts[Parrot.__tablename__])).all() \
+        if upserts[Parrot.__tablename__] else []
+    records = db.query(IncubationRecord).filter(IncubationRecord.id.in_(upserts[IncubationRecord.__tablename__])).all() \
+        if upserts[IncubationRecord.__tablename__] else []
+
+    # 读取变更日志之后才被删除的行，按删除下发
+    for table_name, rows in ((Parrot.__tablename__, parrots), (IncubationRecord.__tablename__, records)):
+        found = {row.id for row in rows}
+        deleted[table_name].extend(row_id for row_id in upserts[table_name] if row_id not in found)
+
+    return SyncPage(
+        version=version,
+        has_more=has_more,
+        parrots=[_parrot_row(parrot) for parrot in parrots],
+        incubation_records=[_incubation_row(record) for record in records],
+        deleted=deleted,
+    )
+
+
+# ---- 补录 ----
+
+def backfill(db: Session) -> int:
+    """为没有变更记录的鹦鹉和孵化记录补录一条变更，返回补录条数"""
+    table = SyncChange.__table__
+    total = 0
+    for table_name, model in TRACKED_MODELS.items():
+        source = model.__table__
+        result = db.execute(
+            insert(table).from_select(
+                ["table_name", "row_id", "deleted", "changed_at"],
+                select(literal(table_name), source.c.id, false(), source.c.updated_at)
+                .where(~exists().where(table.c.table_name == table_name, table.c.row_id == source.c.id))
+                .order_by(source.c.id),
+            )
+        )
+        total += result.rowcount or 0
+    db.commit()
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="增量同步变更日志维护")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("backfill", help="为没有变更记录的行补录变更")
+    parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    db = SessionLocal()
+    try:
+        total = backfill(db)
+    finally:
+        db.close()
+    logger.info("变更日志补录完成: %d 条", total)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
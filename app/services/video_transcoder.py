@@ -0,0 +1,313 @@
+"""视频转码工作器
+
+使用本地 ffmpeg/ffprobe 为上传的视频生成封面帧和 H.264 + faststart 的流媒体 MP4，
+并把衍生文件路径和时长记录到 Photo 表。上传接口通过 `enqueue_transcode` 把视频交给
+专用的转码线程池（VIDEO_TRANSCODE_WORKERS 个线程），转码不占用请求路径和请求线程池；
+也可以作为独立进程补处理积压的视频:
+
+    python -m app.services.video_transcoder              # 处理所有待转码视频
+    python -m app.services.video_transcoder --photo-id 12
+    python -m app.services.video_transcoder --retry-failed
+
+进程在转码中途被终止时，视频停留在 processing 状态；开始转码超过 3 x VIDEO_TRANSCODE_TIMEOUT
+（一次转码最多依次执行三条 ffmpeg/ffprobe 命令）仍未结束的视为中断，命令行补处理时重新转码。
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Photo
+# 导入即注册 flush 事件：封面帧生成后同步更新鹦鹉的封面预览图
+from app.services import photo_stats  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# 衍生文件存放在原文件所在目录下的子目录中
+DERIVED_SUBFOLDER = "derived"
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class TranscodeError(Exception):
+    """ffmpeg 执行失败"""
+    pass
+
+
+def ffmpeg_available() -> bool:
+    """检查 ffmpeg 和 ffprobe 是否可用"""
+    return bool(shutil.which(settings.FFMPEG_BINARY) and shutil.which(settings.FFPROBE_BINARY))
+
+
+def _run(args: List[str]) -> str:
+    try:
+        result = subprocess.run(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=settings.VIDEO_TRANSCODE_TIMEOUT,
+            check=False,
+        )
+    except subprocess.TimeoutExpired:
+        raise TranscodeError(f"执行超时: {' '.join(args[:3])}")
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace")[-500:]
+        raise TranscodeError(f"{args[0]} 退出码 {result.returncode}: {stderr}")
+
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def probe_duration(source: Path) -> Optional[float]:
+    """使用 ffprobe 读取视频时长(秒)"""
+    output = _run([
+        settings.FFPROBE_BINARY,
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(source),
+    ])
+    try:
+        return round(float(output.strip()), 3)
+    except ValueError:
+        return None
+
+
+def _scale_filter() -> str:
+    # 高度不超过上限且保持为偶数 (yuv420p 要求)，宽度按比例缩放
+    return f"scale=-2:'trunc(min({settings.VIDEO_MAX_HEIGHT},ih)/2)*2'"
+
+
+def extract_poster(source: Path, target: Path, duration: Optional[float]) -> None:
+    """截取一帧作为封面 JPEG"""
+    offset = settings.VIDEO_POSTER_OFFSET
+    if duration is not None and duration <= offset:
+        offset = 0
+
+    tmp = target.with_suffix(".tmp.jpg")
+    _run([
+        settings.FFMPEG_BINARY,
+        "-y", "-v", "error",
+        "-ss", str(offset),
+        "-i", str(source),
+        "-frames:v", "1",
+        "-vf", _scale_filter(),
+        "-q:v", "3",
+        str(tmp),
+    ])
+    os.replace(tmp, target)
+
+
+def transcode_stream(source: Path, target: Path) -> None:
+    """转码为 H.264/AAC、faststart、限制码率的 MP4"""
+    bitrate = settings.VIDEO_MAX_BITRATE
+    bufsize = f"{int(bitrate.rstrip('kK')) * 2}k" if bitrate.lower().endswith("k") else bitrate
+
+    tmp = target.with_suffix(".tmp.mp4")
+    _run([
+        settings.FFMPEG_BINARY,
+        "-y", "-v", "error",
+        "-i", str(source),
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-profile:v", "main",
+        "-pix_fmt", "yuv420p",
+        "-crf", "23",
+        "-maxrate", bitrate,
+        "-bufsize", bufsize,
+        "-vf", _scale_filter(),
+        "-c:a", "aac",
+        "-b:a", "128k",
+        "-movflags", "+faststart",
+        str(tmp),
+    ])
+    os.replace(tmp, target)
+
+
+def process_photo(db: Session, photo: Photo) -> bool:
+    """
+    为单个视频生成封面帧和流媒体版本
+
+    Returns:
+        是否处理成功
+    """
+    upload_root = Path(settings.UPLOAD_DIR)
+    source = upload_root / photo.file_path
+
+    if not source.is_file():
+        logger.warning("视频文件不存在, 跳过转码: %s", source)
+        photo.transcode_status = STATUS_FAILED
+        db.commit()
+        return False
+
+    photo.transcode_status = STATUS_PROCESSING
+    photo.transcode_started_at = datetime.utcnow()
+    db.commit()
+
+    derived_dir = source.parent / DERIVED_SUBFOLDER
+    derived_dir.mkdir(parents=True, exist_ok=True)
+    poster = derived_dir / f"{source.stem}_poster.jpg"
+    stream = derived_dir / f"{source.stem}_stream.mp4"
+
+    try:
+        duration = probe_duration(source)
+        extract_poster(source, poster, duration)
+        transcode_stream(source, stream)
+    except (TranscodeError, OSError) as e:
+        logger.error("视频转码失败 photo_id=%s: %s", photo.id, e)
+        photo.transcode_status = STATUS_FAILED
+        db.commit()
+        return False
+
+    photo.duration = duration
+    photo.poster_path = str(poster.relative_to(upload_root))
+    photo.stream_path = str(stream.relative_to(upload_root))
+    photo.transcode_status = STATUS_DONE
+    db.commit()
+
+    logger.info("视频转码完成 photo_id=%s duration=%s", photo.id, duration)
+    return True
+
+
+def transcode_photo(photo_id: int) -> None:
+    """后台任务入口：使用独立会话处理指定视频"""
+    if not settings.VIDEO_TRANSCODE_ENABLED:
+        return
+
+    if not ffmpeg_available():
+        # 保持 pending 状态，安装 ffmpeg 后可由命令行补处理
+        logger.warning("未找到 ffmpeg/ffprobe, 视频 %s 保持待转码状态", photo_id)
+        return
+
+    db = SessionLocal()
+    try:
+        photo = db.query(Photo).filter(Photo.id == photo_id).first()
+        if photo and photo.file_type == "video":
+            process_photo(db, photo)
+    finally:
+        db.close()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _run_queued(photo_id: int) -> None:
+    try:
+        transcode_photo(photo_id)
+    except Exception:
+        logger.exception("视频转码任务失败 photo_id=%s", photo_id)
+
+
+def enqueue_transcode(photo_id: int) -> None:
+    """
+    把视频交给转码线程池，立即返回
+
+    ffmpeg 最长运行 VIDEO_TRANSCODE_TIMEOUT 秒，放在请求线程池（同步接口共用）中会挤占正常请求；
+    超出 VIDEO_TRANSCODE_WORKERS 的视频排队等待。进程退出时未开始的视频保持 pending，可由命令行补处理。
+    """
+    global _executor
+    if not settings.VIDEO_TRANSCODE_ENABLED:
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.VIDEO_TRANSCODE_WORKERS),
+                thread_name_prefix="video-transcode",
+            )
+        _executor.submit(_run_queued, photo_id)
+
+
+def shutdown_transcoder() -> None:
+    """
+    应用退出时调用：取消排队的视频，立即返回
+
+    正在运行的转码不会被中断：解释器退出时会等待转码线程结束，最长约 3 x VIDEO_TRANSCODE_TIMEOUT。
+    进程被强制终止时这些视频停留在 processing，超时后由 run_pending() 重新处理。
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _abandoned_processing():
+    """开始转码后超过最长可能耗时仍为 processing 的视频（转码进程中途被终止）"""
+    deadline = datetime.utcnow() - timedelta(seconds=3 * settings.VIDEO_TRANSCODE_TIMEOUT)
+    return and_(
+        Photo.transcode_status == STATUS_PROCESSING,
+        or_(Photo.transcode_started_at.is_(None), Photo.transcode_started_at < deadline),
+    )
+
+
+def run_pending(limit: Optional[int] = None, retry_failed: bool = False) -> int:
+    """
+    处理所有待转码视频，以及转码中断（processing 超时）的视频
+
+    Returns:
+        成功处理的数量
+    """
+    statuses = [STATUS_PENDING, STATUS_FAILED] if retry_failed else [STATUS_PENDING]
+
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(Photo)
+            .filter(
+                Photo.file_type == "video",
+                or_(Photo.transcode_status.in_(statuses), _abandoned_processing()),
+            )
+            .order_by(Photo.id)
+        )
+        if limit:
+            query = query.limit(limit)
+
+        done = 0
+        for photo in query.all():
+            if process_photo(db, photo):
+                done += 1
+        return done
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="视频封面帧与流媒体转码工作器")
+    parser.add_argument("--photo-id", type=int, help="只处理指定的照片ID")
+    parser.add_argument("--limit", type=int, help="最多处理的视频数量")
+    parser.add_argument("--retry-failed", action="store_true", help="同时重试转码失败的视频")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if not ffmpeg_available():
+        logger.error("未找到 ffmpeg/ffprobe, 请先安装 ffmpeg")
+        return 1
+
+    if args.photo_id:
+        transcode_photo(args.photo_id)
+        return 0
+
+    done = run_pending(limit=args.limit, retry_failed=args.retry_failed)
+    logger.info("共处理 %s 个视频", done)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
 from app.utils.file_upload import FileUploadUtil
+from app.utils.media_sniffer import MediaInfo, sniff_media
 
-__all__ = ["FileUploadUtil"]
+__all__ = ["FileUploadUtil", "MediaInfo", "sniff_media"]
@@ -1,12 +1,19 @@
+import asyncio
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
+import aiofiles
 from fastapi import UploadFile
 
 from app.core.config import settings
 from app.core.exceptions import BadRequestException, FileUploadException
+from app.core.metrics import record_upload_bytes
+from app.utils.media_sniffer import MediaInfo, sniff_media, matches_extension
+
+# 流式写入的分块大小，第一块同时用于魔数和图片尺寸识别
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 class FileUploadUtil:
@@ -45,16 +52,50 @@ class FileUploadUtil:
         unique_filename = f"{uuid.uuid4().hex}.{ext}"
         return unique_filename, ext
 
+    @staticmethod
+    def _validate_header(file: UploadFile, header: bytes, check_content_type: bool) -> MediaInfo:
+        """
+        根据文件头校验真实类型
+
+        Args:
+            file: 上传文件
+            header: 第一个数据块
+            check_content_type: 是否同时校验客户端声明的content-type
+
+        Returns:
+            嗅探结果
+
+        Raises:
+            BadRequestException: 文件内容与扩展名不符
+        """
+        info = sniff_media(header)
+
+        if info is None:
+            raise BadRequestException("无法识别的文件内容，请上传有效的图片或视频")
+
+        if not matches_extension(info, file.filename):
+            raise BadRequestException(f"文件内容({info.mime_type})与扩展名不符")
+
+        if check_content_type and file.content_type and file.content_type != "application/octet-stream":
+            declared_kind = file.content_type.split("/")[0]
+            if declared_kind != info.kind:
+                raise BadRequestException(f"文件类型声明({file.content_type})与实际内容不符")
+
+        return info
+
     @staticmethod
     async def upload_photo(
         file: UploadFile,
         subfolder: str = "parrots",
         max_size: Optional[int] = None,
         check_content_type: bool = False,
-    ) -> tuple[str, str]:
+    ) -> tuple[str, str, MediaInfo]:
         """
         上传照片
 
+        先读取第一个数据块嗅探魔数，校验通过后才开始分块写入磁盘，
+        不合法的文件不会落盘。
+
         Args:
             file: FastAPI UploadFile对象
             subfolder: 子文件夹名称
@@ -62,7 +103,7 @@ class FileUploadUtil:
             check_content_type: 是否检查content-type
 
         Returns:
-            (目标相对路径, 原始文件名)
+            (目标相对路径, 原始文件名, 文件头嗅探结果)
 
         Raises:
             BadRequestException: 文件验证失败
@@ -91,6 +132,14 @@ class FileUploadUtil:
         # 重置文件指针
         file.file.seek(0)
 
+        # 读取第一个数据块并校验文件头
+        try:
+            first_chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            media_info = FileUploadUtil._validate_header(file, first_chunk, check_content_type)
+        except BadRequestException:
+            await file.close()
+            raise
+
         # 生成唯一文件名
         target_filename, _ = FileUploadUtil._generate_unique_filename(file.filename)
 
@@ -100,19 +149,34 @@ class FileUploadUtil:
         try:
             subfolder_path.mkdir(parents=True, exist_ok=True)
         except Exception as e:
+            await file.close()
             raise FileUploadException(f"无法创建上传目录: {e}")
 
-        # 文件保存路径
+        # 文件保存路径，先写入临时文件，完成后再重命名
         target_path = subfolder_path / target_filename
+        partial_path = subfolder_path / f"{target_filename}.part"
 
-        # 保存文件
+        # 分块保存文件
         try:
-            content = await file.read()
-
-            target_path.write_bytes(content)
+            written = 0
+            async with aiofiles.open(partial_path, "wb") as out:
+                chunk = first_chunk
+                while chunk:
+                    written += len(chunk)
+                    if written > max_size:
+                        raise BadRequestException(f"文件大小超过限制: {max_size / (1024 * 1024):.1f}MB")
+                    await out.write(chunk)
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+
+            os.replace(partial_path, target_path)
+            record_upload_bytes(written, media_info.kind)
             print(f"文件上传成功: {target_path}")
 
+        except BadRequestException:
+            partial_path.unlink(missing_ok=True)
+            raise
         except Exception as e:
+            partial_path.unlink(missing_ok=True)
             raise FileUploadException(f"文件保存失败: {e}")
         finally:
             await file.close()
@@ -120,7 +184,40 @@ class FileUploadUtil:
         # 返回相对路径
         relative_path = str(target_path.relative_to(settings.UPLOAD_DIR))
 
-        return relative_path, file.filename
+        return relative_path, file.filename, media_info
+
+    @staticmethod
+    async def upload_many(
+        files: List[UploadFile],
+        subfolder: str = "parrots",
+        max_size: Optional[int] = None,
+    ) -> List[tuple[str, str, MediaInfo]]:
+        """
+        并发上传多个文件
+
+        任意一个文件失败时，已写入的其他文件会被删除，然后抛出第一个错误。
+
+        Args:
+            files: UploadFile列表
+            subfolder: 子文件夹名称
+            max_size: 单个文件大小限制 (字节)
+
+        Returns:
+            与输入顺序一致的 (目标相对路径, 原始文件名, 文件头嗅探结果) 列表
+        """
+        results = await asyncio.gather(
+            *(FileUploadUtil.upload_photo(f, subfolder=subfolder, max_size=max_size) for f in files),
+            return_exceptions=True,
+        )
+
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            for r in results:
+                if not isinstance(r, BaseException):
+                    FileUploadUtil.delete_file(r[0])
+            raise errors[0]
+
+        return results
 
     @staticmethod
     def delete_file(file_path: str) -> bool:
@@ -0,0 +1,109 @@
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class MediaInfo:
+    """文件头嗅探结果"""
+    kind: str  # image / video
+    mime_type: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+# 扩展名允许对应的真实类型（部分容器格式互相兼容）
+EXTENSION_MIME_TYPES = {
+    "png": {"image/png"},
+    "jpg": {"image/jpeg"},
+    "jpeg": {"image/jpeg"},
+    "gif": {"image/gif"},
+    "mp4": {"video/mp4", "video/quicktime"},
+    "mov": {"video/quicktime", "video/mp4"},
+    "avi": {"video/x-msvideo"},
+    "mkv": {"video/x-matroska", "video/webm"},
+    "webm": {"video/webm", "video/x-matroska"},
+}
+
+# 旧版 QuickTime 文件可能不以 ftyp 开头
+_QUICKTIME_ATOMS = {b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+# JPEG 中携带尺寸的 SOF 标记（排除 DHT/JPG/DAC）
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(header: bytes) -> tuple[Optional[int], Optional[int]]:
+    offset = 2
+    length = len(header)
+
+    while offset + 4 <= length:
+        if header[offset] != 0xFF:
+            return None, None
+
+        marker = header[offset + 1]
+        # 填充字节
+        if marker == 0xFF:
+            offset += 1
+            continue
+        # 无长度字段的独立标记
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+
+        segment_length = struct.unpack(">H", header[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > length:
+                return None, None
+            height, width = struct.unpack(">HH", header[offset + 5:offset + 9])
+            return width, height
+
+        offset += 2 + segment_length
+
+    return None, None
+
+
+def sniff_media(header: bytes) -> Optional[MediaInfo]:
+    """
+    根据文件开头的魔数识别图片/视频类型，图片同时从文件头读取宽高
+
+    Args:
+        header: 文件开头的字节（至少几十字节，JPEG 需要包含 SOF 段）
+
+    Returns:
+        识别结果，无法识别时返回 None
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n") and len(header) >= 24:
+        width, height = struct.unpack(">II", header[16:24])
+        return MediaInfo("image", "image/png", width, height)
+
+    if header.startswith(b"\xff\xd8\xff"):
+        width, height = _jpeg_size(header)
+        return MediaInfo("image", "image/jpeg", width, height)
+
+    if header[:6] in (b"GIF87a", b"GIF89a") and len(header) >= 10:
+        width, height = struct.unpack("<HH", header[6:10])
+        return MediaInfo("image", "image/gif", width, height)
+
+    if header[4:8] == b"ftyp":
+        brand = header[8:12]
+        mime_type = "video/quicktime" if brand == b"qt  " else "video/mp4"
+        return MediaInfo("video", mime_type)
+
+    if header[4:8] in _QUICKTIME_ATOMS:
+        return MediaInfo("video", "video/quicktime")
+
+    if header[:4] == b"RIFF" and header[8:12] == b"AVI ":
+        return MediaInfo("video", "video/x-msvideo")
+
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        # EBML 头中的 DocType 区分 WebM 和 Matroska
+        mime_type = "video/webm" if b"webm" in header[:64] else "video/x-matroska"
+        return MediaInfo("video", mime_type)
+
+    return None
+
+
+def matches_extension(info: MediaInfo, filename: str) -> bool:
+    """检查嗅探出的真实类型是否与扩展名一致"""
+    ext = filename.split(".")[-1].lower()
+    return info.mime_type in EXTENSION_MIME_TYPES.get(ext, set())
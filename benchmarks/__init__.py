@@ -0,0 +1,14 @@
+"""性能基准测试
+
+用固定随机种子生成大规模模拟数据，在进程内通过 ASGI 应用回放脚本化的接口场景，
+输出 p50/p95/p99 延迟、每请求SQL条数和进程内存，并可与保存的 JSON 基线对比。
+
+    # 生成 10 万只鹦鹉的数据并保存基线
+    python -m benchmarks.run --generate --parrots 100000 --output benchmarks/baseline.json
+
+    # 修改代码后复用同一个数据库与基线对比（回归超过阈值时退出码为 1）
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+    # 只生成数据
+    python -m benchmarks.datagen --parrots 100000 --reset
+"""
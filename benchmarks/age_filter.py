@@ -0,0 +1,123 @@
+"""年龄筛选基准
+
+用鹦鹉列表的筛选逻辑（app.api.parrots._apply_parrot_filters）构造几组常见的年龄区间查询，
+输出每组计数查询和第一页查询的执行计划与耗时中位数（毫秒）。
+
+--compare-without-index 时在一个事务中删除 ix_parrots_status_birth_date 再测一遍，
+结束后回滚，索引不会真的被删除（SQLite、PostgreSQL 的 DDL 都可以回滚）。
+
+    python -m benchmarks.datagen --database-url sqlite:///./benchmarks/age.db --parrots 100000 --reset
+    python -m benchmarks.age_filter --database-url sqlite:///./benchmarks/age.db --compare-without-index
+"""
+import argparse
+import statistics
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.datagen import DEFAULT_DATABASE_URL, configure_database_url
+
+INDEX_NAME = "ix_parrots_status_birth_date"
+
+# (名称, 筛选参数)
+CASES = [
+    ("在售 300-400天", {"status": "available", "min_age_days": 300, "max_age_days": 400}),
+    ("在售 1-2岁", {"status": "available", "min_age_days": 365, "max_age_days": 730}),
+    ("繁殖 730天以上", {"status": "breeding", "min_age_days": 730}),
+    ("全部 365-730天", {"min_age_days": 365, "max_age_days": 730}),
+]
+
+
+def _median_ms(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _explain(db, query, tag: str) -> List[str]:
+    from sqlalchemy import text
+
+    statement = query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    if db.get_bind().dialect.name == "sqlite":
+        # pysqlite 缓存预编译语句，删除索引后同样文本的 EXPLAIN 仍返回旧计划，用注释区分
+        return [row[-1] for row in db.execute(text(f"/* {tag} */ EXPLAIN QUERY PLAN {statement}"))]
+    return [row[0] for row in db.execute(text(f"EXPLAIN {statement}"))]
+
+
+def run_cases(db, title: str, repeat: int, page_size: int) -> List[Tuple[str, int, float, float]]:
+    from app.api.parrots import ParrotFilters, _apply_parrot_filters
+    from app.models import Parrot
+
+    results = []
+    for name, params in CASES:
+        query = _apply_parrot_filters(db.query(Parrot), ParrotFilters(**params))
+        page = query.order_by(Parrot.created_at.desc()).limit(page_size)
+        total = query.count()
+        print(f"\n[{title}] {name}: {total} 只")
+        for line in _explain(db, query.with_entities(Parrot.id), title):
+            print(f"  count: {line}")
+        for line in _explain(db, page, title):
+            print(f"  page:  {line}")
+        count_ms = _median_ms(query.count, repeat)
+        page_ms = _median_ms(page.all, repeat)
+        results.append((name, total, count_ms, page_ms))
+    return results
+
+
+def _transactional_ddl(engine) -> None:
+    """pysqlite 默认不为 DDL 开启事务，改为由 SQLAlchemy 显式 BEGIN，DROP INDEX 才能回滚"""
+    from sqlalchemy import event
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def _print_table(title: str, results: List[Tuple[str, int, float, float]]) -> None:
+    print(f"\n{title}")
+    print(f"{'查询':<16}{'数量':>8}{'count(ms)':>12}{'page(ms)':>12}")
+    for name, total, count_ms, page_ms in results:
+        print(f"{name:<16}{total:>8}{count_ms:>12.2f}{page_ms:>12.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="年龄筛选基准")
+    parser.add_argument("--database-url", help=f"datagen 生成的数据库，默认 {DEFAULT_DATABASE_URL}")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的计时次数")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--compare-without-index", action="store_true", help="在回滚的事务中删除索引再测一遍")
+    args = parser.parse_args(argv)
+
+    configure_database_url(args.database_url)
+
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app.core.database import engine
+
+    _transactional_ddl(engine)
+    with Session(engine) as db:
+        results = [("使用索引", run_cases(db, "使用索引", args.repeat, args.page_size))]
+        if args.compare_without_index:
+            db.execute(text(f"DROP INDEX {INDEX_NAME}"))
+            try:
+                results.append(("删除索引后", run_cases(db, "删除索引后", args.repeat, args.page_size)))
+            finally:
+                db.rollback()
+    for title, rows in results:
+        _print_table(title, rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""基准测试数据生成器
+
+按固定随机种子批量写入鹦鹉、多次销售/退货历史、照片、回访、孵化记录和分享链接，
+同一组参数每次生成的数据完全一致，便于在不同代码版本之间比较。
+
+使用 Core 层 executemany 批量插入并显式指定主键，10 万只鹦鹉在 SQLite 上
+通常一分钟内完成。默认写入 benchmarks/bench.db，也可以指定 --database-url。
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = "sqlite:///./benchmarks/bench.db"
+
+# 每次 executemany 的行数
+CHUNK_SIZE = 5000
+
+BREEDS = [
+    "虎皮鹦鹉", "玄凤鹦鹉", "牡丹鹦鹉", "和尚鹦鹉", "太阳锥尾鹦鹉", "金太阳",
+    "非洲灰鹦鹉", "亚马逊鹦鹉", "金刚鹦鹉", "折衷鹦鹉", "凯克鹦鹉", "小太阳",
+    "吸蜜鹦鹉", "葵花凤头鹦鹉", "粉红凤头鹦鹉", "月轮鹦鹉",
+]
+SELLERS = ["张三", "李四", "王五", "赵六", "门店", "线上"]
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN_NAMES = ["伟", "芳", "娜", "敏", "静", "强", "磊", "洋", "艳", "勇", "军", "杰", "娟", "涛", "明"]
+RETURN_REASONS = ["健康问题", "家人过敏", "不适应饲养", "品相不符", "搬家无法饲养"]
+
+# 状态分布（累计权重）
+STATUS_WEIGHTS = [("available", 0.55), ("sold", 0.30), ("returned", 0.05), ("breeding", 0.10)]
+
+
+@dataclass
+class DatasetSummary:
+    """生成结果统计"""
+    seed: int
+    parrots: int = 0
+    sales_history: int = 0
+    photos: int = 0
+    follow_ups: int = 0
+    incubation_records: int = 0
+    offspring_links: int = 0
+    share_links: int = 0
+    follow_up_tasks: int = 0
+    parrot_events: int = 0
+    seconds: float = 0.0
+
+
+def share_token(seed: int, index: int) -> str:
+    """分享链接令牌，基准场景按同样规则构造"""
+    return f"bench{seed}{index:08d}"
+
+
+class _Inserter:
+    """按表缓存待插入的行，满一批后 executemany"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.pending: Dict[object, List[dict]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, table, row: dict) -> None:
+        rows = self.pending.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= CHUNK_SIZE:
+            self.flush(table)
+
+    def flush(self, table=None) -> None:
+        from sqlalchemy import insert
+
+        tables = [table] if table is not None else list(self.pending)
+        for t in tables:
+            rows = self.pending.get(t)
+            if rows:
+                self.connection.execute(insert(t), rows)
+                self.counts[t.name] = self.counts.get(t.name, 0) + len(rows)
+                self.pending[t] = []
+
+
+def _customer(rng: random.Random) -> dict:
+    return {
+        "buyer_name": rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES),
+        "contact": "1" + "".join(rng.choice("3456789") for _ in range(2)) + f"{rng.randrange(10 ** 8):08d}",
+        "seller": rng.choice(SELLERS),
+    }
+
+
+def generate(engine, parrots: int = 100_000, seed: int = 42, share_links: int = 1000) -> DatasetSummary:
+    """
+    向空数据库写入模拟数据
+
+    Args:
+        engine: 目标数据库引擎（表需已创建且为空）
+        parrots: 鹦鹉数量，其余数据量按比例生成
+        seed: 随机种子
+        share_links: 分享链接数量
+    """
+    from sqlalchemy import bindparam, insert, update
+
+    from app.models import Breed, BreedAlias, FollowUp, IncubationRecord, Parrot, Photo, SalesHistory, ShareLink
+    from app.services.breeds import breed_key
+
+    rng = random.Random(seed)
+    summary = DatasetSummary(seed=seed)
+    started = time.perf_counter()
+
+    now = datetime(2026, 1, 1)
+    today = now.date()
+
+    sale_id = 0
+    follow_up_id = 0
+    photo_id = 0
+    breeders: Dict[str, List[int]] = {"公": [], "母": []}
+    sold_ids: List[int] = []
+
+    breed_ids = {name: index for index, name in enumerate(BREEDS, start=1)}
+
+    with engine.begin() as connection:
+        # 品种维表先于鹦鹉写入（外键）
+        connection.execute(insert(Breed.__table__), [
+            {"id": breed_id, "name": name, "created_at": now} for name, breed_id in breed_ids.items()
+        ])
+        connection.execute(insert(BreedAlias.__table__), [
+            {"id": breed_id, "alias": breed_key(name), "breed_id": breed_id} for name, breed_id in breed_ids.items()
+        ])
+
+        inserter = _Inserter(connection)
+
+        for parrot_id in range(1, parrots + 1):
+            breed = rng.choice(BREEDS)
+            base_price = Decimal(rng.randrange(200, 30000, 50))
+            birth_date = today - timedelta(days=rng.randrange(30, 3650))
+            created_at = datetime.combine(birth_date, datetime.min.time()) + timedelta(days=rng.randrange(0, 30))
+            gender = rng.choice(["公", "母", "未验卡"])
+
+            roll = rng.random()
+            cumulative = 0.0
+            status = "available"
+            for name, weight in STATUS_WEIGHTS:
+                cumulative += weight
+                if roll < cumulative:
+                    status = name
+                    break
+
+            row = {
+                "id": parrot_id,
+                "breed": breed,
+                "breed_id": breed_ids[breed],
+                "price": base_price,
+                "min_price": base_price * Decimal("0.9"),
+                "max_price": base_price * Decimal("1.2"),
+                "gender": gender,
+                "birth_date": birth_date,
+                "ring_number": f"BN{parrot_id:07d}",
+                "status": status,
+                "health_notes": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "sold_at": None,
+                "returned_at": None,
+                "return_reason": None,
+                "seller": None,
+                "buyer_name": None,
+                "sale_price": None,
+                "contact": None,
+                "follow_up_status": "pending",
+                "sale_notes": None,
+            }
+
+            # 销售历史：已售/已退货的鹦鹉有 1~3 次销售，除最后一次外都已退货
+            if status in ("sold", "returned"):
+                sales = rng.choice([1, 1, 1, 2, 2, 3])
+                sale_date = created_at + timedelta(days=rng.randrange(30, 200))
+                for n in range(sales):
+                    sale_id += 1
+                    customer = _customer(rng)
+                    price = base_price * Decimal(rng.choice(["0.9", "1.0", "1.1"]))
+                    is_last = n == sales - 1
+                    returned = not is_last or status == "returned"
+                    return_date = sale_date + timedelta(days=rng.randrange(3, 60)) if returned else None
+                    follow_up_status = rng.choice(["pending", "completed", "no_contact"])
+                    inserter.add(SalesHistory.__table__, {
+                        "id": sale_id,
+                        "parrot_id": parrot_id,
+                        "sale_price": price,
+                        "follow_up_status": follow_up_status,
+                        "sale_notes": None,
+                        "sale_date": sale_date,
+                        "return_date": return_date,
+                        "return_reason": rng.choice(RETURN_REASONS) if returned else None,
+                        "created_at": sale_date,
+                        "updated_at": return_date or sale_date,
+                        **customer,
+                    })
+
+                    for _ in range(rng.choice([0, 1, 1, 2])):
+                        follow_up_id += 1
+                        follow_up_date = sale_date + timedelta(days=rng.randrange(1, 30))
+                        inserter.add(FollowUp.__table__, {
+                            "id": follow_up_id,
+                            "parrot_id": parrot_id,
+                            "follow_up_date": follow_up_date,
+                            "follow_up_status": rng.choice(["completed", "no_contact"]),
+                            "notes": "回访记录",
+                            "created_at": follow_up_date,
+                            "updated_at": follow_up_date,
+                        })
+
+                    if is_last:
+                        if status == "sold":
+                            row.update(
+                                sold_at=sale_date,
+                                sale_price=price,
+                                follow_up_status=follow_up_status,
+                                **customer,
+                            )
+                            sold_ids.append(parrot_id)
+                        else:
+                            row.update(
+                                sold_at=None,
+                                returned_at=return_date,
+                                return_reason=rng.choice(RETURN_REASONS),
+                            )
+                    if return_date:
+                        sale_date = return_date + timedelta(days=rng.randrange(5, 90))
+
+            if status == "breeding" and gender in breeders:
+                breeders[gender].append(parrot_id)
+
+            inserter.add(Parrot.__table__, row)
+
+            # 照片：平均每只 2 个媒体文件，少量为视频
+            for sort_order in range(rng.choice([0, 1, 2, 2, 3, 4])):
+                photo_id += 1
+                is_video = rng.random() < 0.1
+                ext = "mp4" if is_video else "jpg"
+                inserter.add(Photo.__table__, {
+                    "id": photo_id,
+                    "parrot_id": parrot_id,
+                    "file_path": f"parrots/bench-{photo_id:08d}.{ext}",
+                    "file_name": f"IMG_{photo_id:08d}.{ext}",
+                    "file_type": "video" if is_video else "image",
+                    "sort_order": sort_order,
+                    "created_at": created_at,
+                    "mime_type": "video/mp4" if is_video else "image/jpeg",
+                    "width": 1280 if is_video else 1080,
+                    "height": 720 if is_video else 1440,
+                    "poster_path": None,
+                    "stream_path": None,
+                    "duration": round(rng.uniform(5, 60), 1) if is_video else None,
+                    "transcode_status": "done" if is_video else None,
+                })
+
+        # 父母记录必须先于孵化记录写入
+        inserter.flush()
+
+        # 孵化记录：每 50 只鹦鹉一条，父母取自种鸟
+        litters: List[tuple] = []
+        if breeders["公"] and breeders["母"]:
+            for record_id in range(1, parrots // 50 + 1):
+                start_date = today - timedelta(days=rng.randrange(0, 730))
+                expected = start_date + timedelta(days=rng.choice([18, 21, 24, 28]))
+                eggs = rng.randrange(1, 7)
+                status = "incubating" if expected >= today else rng.choice(["hatched", "completed", "failed"])
+                hatched = 0 if status in ("incubating", "failed") else rng.randrange(0, eggs + 1)
+                father_id = rng.choice(breeders["公"])
+                mother_id = rng.choice(breeders["母"])
+                litters.append((record_id, max(father_id, mother_id), hatched))
+                inserter.add(IncubationRecord.__table__, {
+                    "id": record_id,
+                    "father_id": father_id,
+                    "mother_id": mother_id,
+                    "start_date": start_date,
+                    "expected_hatch_date": expected,
+                    "actual_hatch_date": expected if hatched else None,
+                    "eggs_count": eggs,
+                    "hatched_count": hatched,
+                    "status": status,
+                    "notes": None,
+                    "created_at": datetime.combine(start_date, datetime.min.time()),
+                    "updated_at": datetime.combine(start_date, datetime.min.time()),
+                })
+
+        inserter.flush()
+
+        # 子代登记：每窝的成功孵化数登记为子代，半数取自种鸟以形成多代系谱；
+        # 子代ID大于父母ID，保证系谱无环
+        linked = set()
+        links = []
+        all_breeders = breeders["公"] + breeders["母"]
+        for record_id, oldest_parent, hatched in litters:
+            if oldest_parent >= parrots:
+                continue
+            for _ in range(hatched):
+                if rng.random() < 0.5:
+                    child_id = rng.choice(all_breeders)
+                else:
+                    child_id = rng.randrange(oldest_parent + 1, parrots + 1)
+                if child_id > oldest_parent and child_id not in linked:
+                    linked.add(child_id)
+                    links.append({"child_id": child_id, "record_id": record_id})
+        if links:
+            parrots_table = Parrot.__table__
+            connection.execute(
+                update(parrots_table)
+                .where(parrots_table.c.id == bindparam("child_id"))
+                .values(incubation_record_id=bindparam("record_id")),
+                links,
+            )
+        summary.offspring_links = len(links)
+
+        # 分享链接：长期有效，令牌可由种子推算
+        for index in range(min(share_links, parrots)):
+            inserter.add(ShareLink.__table__, {
+                "id": index + 1,
+                "parrot_id": rng.randrange(1, parrots + 1),
+                "token": share_token(seed, index),
+                "created_at": now,
+                "expires_at": datetime(2099, 1, 1),
+                "is_active": True,
+            })
+
+        inserter.flush()
+
+    summary.parrots = inserter.counts.get("parrots", 0)
+    summary.sales_history = inserter.counts.get("sales_history", 0)
+    summary.photos = inserter.counts.get("photos", 0)
+    summary.follow_ups = inserter.counts.get("follow_ups", 0)
+    summary.incubation_records = inserter.counts.get("incubation_records", 0)
+    summary.share_links = inserter.counts.get("share_links", 0)
+    summary.seconds = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def prepare_database(engine, reset: bool = False) -> None:
+    """建表；reset 时先删除所有表。数据库非空且未指定 reset 时报错，避免主键冲突"""
+    from sqlalchemy import func, select
+
+    from app.core.database import Base
+    from app.models import Parrot
+
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as connection:
+        existing = connection.execute(select(func.count()).select_from(Parrot.__table__)).scalar()
+    if existing:
+        raise RuntimeError(f"数据库中已有 {existing} 只鹦鹉，请使用 --reset 重新生成")
+
+
+def backfill_derived(summary: DatasetSummary) -> None:
+    """用应用自带的补建命令生成派生数据（回访待办、鹦鹉事件、照片统计、同步变更日志），与线上升级后的数据一致"""
+    from app.core.database import SessionLocal
+    from app.services import follow_up_tasks, parrot_events, photo_stats, sync
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        summary.follow_up_tasks = follow_up_tasks.backfill(db, pending_window_days=30)["created"]
+        summary.parrot_events = parrot_events.backfill(db)["events"]
+        photo_stats.repair(db)
+        sync.backfill(db)
+    finally:
+        db.close()
+    summary.seconds = round(summary.seconds + time.perf_counter() - started, 2)
+
+
+def configure_database_url(database_url: Optional[str]) -> str:
+    """在导入 app 之前设置 DATABASE_URL，app 的配置在导入时读取"""
+    url = database_url or os.environ.get("BENCH_DATABASE_URL") or DEFAULT_DATABASE_URL
+    os.environ["DATABASE_URL"] = url
+    if url.startswith("sqlite:///"):
+        directory = os.path.dirname(url[len("sqlite:///"):])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    return url
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--database-url", help=f"目标数据库，默认 {DEFAULT_DATABASE_URL}")
+    parser.add_argument("--parrots", type=int, default=100_000, help="鹦鹉数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--share-links", type=int, default=1000, help="分享链接数量")
+    parser.add_argument("--reset", action="store_true", help="删除已有表后重新生成")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="生成性能基准测试数据")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    url = configure_database_url(args.database_url)
+
+    from app.core.database import engine
+
+    prepare_database(engine, reset=args.reset)
+    logger.info("开始生成数据: %s", url)
+    summary = generate(engine, parrots=args.parrots, seed=args.seed, share_links=args.share_links)
+    backfill_derived(summary)
+    logger.info("数据生成完成: %s", asdict(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
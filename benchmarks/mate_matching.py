@@ -0,0 +1,115 @@
+"""配对推荐微基准
+
+在内存中生成多代种群系谱（不访问数据库），测量 app.services.mate_matching 的打分耗时：
+
+- cold:     新建计算器，为一只种鸟计算亲缘系数行，给全部异性候选打分并取前 K 个
+- warm:     同一计算器上依次为多只种鸟推荐（共享祖先间的亲缘系数缓存，即服务运行中的常态）
+- pairwise: 不用整行递推，逐对调用记忆化递归 kinship(a, b)（同一计算器，共享缓存）
+
+    python -m benchmarks.mate_matching --breeders 5000 --generations 8
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.services.mate_matching import Candidate, KinshipCalculator, rank_candidates
+
+
+def build_population(breeders: int, generations: int, seed: int) -> Tuple[Dict[int, tuple], List[Candidate]]:
+    """生成种群：第 0 代为奠基个体，之后每代的父母取自前两代"""
+    rng = random.Random(seed)
+    per_generation = max(2, breeders // generations)
+    parents: Dict[int, tuple] = {}
+    candidates: List[Candidate] = []
+    by_generation: List[Dict[str, List[int]]] = []
+    next_id = 1
+    for generation in range(generations):
+        members: Dict[str, List[int]] = {"公": [], "母": []}
+        for _ in range(per_generation):
+            gender = "公" if rng.random() < 0.5 else "母"
+            parrot_id = next_id
+            next_id += 1
+            if generation > 0:
+                pool = by_generation[max(0, generation - 2):generation]
+                fathers = [pid for g in pool for pid in g["公"]]
+                mothers = [pid for g in pool for pid in g["母"]]
+                if fathers and mothers and rng.random() < 0.9:
+                    parents[parrot_id] = (rng.choice(fathers), rng.choice(mothers))
+            members[gender].append(parrot_id)
+            candidates.append(Candidate(
+                id=parrot_id,
+                breed=rng.choice(["玄凤鹦鹉", "虎皮鹦鹉", "牡丹鹦鹉"]),
+                gender=gender,
+                ring_number=f"BN{parrot_id:07d}",
+                birth_date=date(2016, 1, 1) + timedelta(days=generation * 365 + rng.randrange(0, 365)),
+                health_notes=None,
+            ))
+        by_generation.append(members)
+    return parents, candidates
+
+
+def _timed(func) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="配对推荐微基准")
+    parser.add_argument("--breeders", type=int, default=5000, help="种鸟数量")
+    parser.add_argument("--generations", type=int, default=8, help="系谱代数")
+    parser.add_argument("--subjects", type=int, default=50, help="warm 阶段推荐的种鸟数")
+    parser.add_argument("--limit", type=int, default=10, help="每次返回的候选数")
+    parser.add_argument("--max-kinship", type=float, default=0.0625)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    parents, population = build_population(args.breeders, args.generations, args.seed)
+    rng = random.Random(args.seed)
+    youngest = population[-len(population) // args.generations:]
+    subjects = rng.sample(youngest, min(args.subjects, len(youngest)))
+
+    def candidates_for(subject: Candidate) -> List[Candidate]:
+        return [c for c in population if c.gender != subject.gender]
+
+    print(f"种鸟 {len(population)} 只，已知父母 {len(parents)} 只，{args.generations} 代")
+
+    def recommend(calculator: KinshipCalculator, subject: Candidate):
+        row = calculator.kinship_row(subject.id)
+        return rank_candidates(subject, candidates_for(subject), row, args.limit, args.max_kinship)
+
+    subject = subjects[0]
+    cold_ms, ranked = _timed(lambda: recommend(KinshipCalculator(parents), subject))
+    print(f"cold      {cold_ms:>9.2f} ms  候选 {len(candidates_for(subject))} 只，返回 {len(ranked)} 只")
+
+    calculator = KinshipCalculator(parents)
+    recommend(calculator, subject)
+    warm_total = 0.0
+    for other in subjects[1:]:
+        elapsed, _ = _timed(lambda: recommend(calculator, other))
+        warm_total += elapsed
+    warm_ms = warm_total / max(1, len(subjects) - 1)
+    print(f"warm      {warm_ms:>9.2f} ms/次（{len(subjects) - 1} 只种鸟的平均值）")
+
+    pairwise = KinshipCalculator(parents)
+    pool = candidates_for(subject)
+    pairwise_ms, values = _timed(lambda: {c.id: pairwise.kinship(subject.id, c.id) for c in pool})
+    print(f"pairwise  {pairwise_ms:>9.2f} ms  （逐对递归）")
+
+    row = calculator.kinship_row(subject.id)
+    mismatches = sum(1 for cid, value in values.items() if abs(row.get(cid, 0.0) - value) > 1e-12)
+    if mismatches:
+        print(f"警告: 整行递推与逐对递归有 {mismatches} 个结果不一致")
+        return 1
+
+    best = ranked[0] if ranked else None
+    if best:
+        print(f"最佳候选 #{best.candidate.id} score={best.score} kinship={best.kinship:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
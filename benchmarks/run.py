@@ -0,0 +1,273 @@
+"""基准测试运行器
+
+在进程内通过 TestClient 调用 ASGI 应用（包含全部中间件），每个场景先预热再计时，
+每请求SQL条数从 QueryStatsMiddleware 输出的 Server-Timing 响应头解析。
+
+结果写成 JSON，--compare 时与基线逐场景比较 p50/p95，回归超过阈值时退出码为 1。
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import re
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from benchmarks import datagen
+from benchmarks.scenarios import SCENARIOS, SCENARIOS_BY_NAME, BenchContext, Scenario
+
+logger = logging.getLogger(__name__)
+
+_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    queries_per_request: float
+    max_queries: int
+    rss_mb: float
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def current_rss_mb() -> float:
+    """当前进程常驻内存；没有 /proc 时退回峰值 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _query_count(response) -> Optional[int]:
+    match = _QUERIES_RE.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else None
+
+
+def run_scenario(client, scenario: Scenario, ctx: BenchContext, rng: random.Random, requests: int, warmup: int) -> ScenarioResult:
+    def request(path: str):
+        body = scenario.body(rng, ctx) if scenario.body else None
+        return client.request(scenario.method, path, json=body)
+
+    for _ in range(warmup):
+        request(scenario.path(rng, ctx))
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    for _ in range(requests):
+        path = scenario.path(rng, ctx)
+        start = time.perf_counter()
+        response = request(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if response.status_code >= 400:
+            errors += 1
+            if errors == 1:
+                logger.warning("%s 请求失败: %s %s -> %s", scenario.name, scenario.method, path, response.status_code)
+        count = _query_count(response)
+        if count is not None:
+            queries.append(count)
+
+    latencies.sort()
+    return ScenarioResult(
+        name=scenario.name,
+        requests=requests,
+        errors=errors,
+        p50_ms=round(percentile(latencies, 50), 3),
+        p95_ms=round(percentile(latencies, 95), 3),
+        p99_ms=round(percentile(latencies, 99), 3),
+        mean_ms=round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        max_ms=round(latencies[-1], 3) if latencies else 0.0,
+        queries_per_request=round(sum(queries) / len(queries), 2) if queries else 0.0,
+        max_queries=max(queries) if queries else 0,
+        rss_mb=round(current_rss_mb(), 1),
+    )
+
+
+def load_context(seed: int) -> BenchContext:
+    from sqlalchemy import func
+
+    from app.core.database import SessionLocal
+    from app.models import Parrot, ShareLink
+
+    db = SessionLocal()
+    try:
+        # 固定顺序抽样，保证同一数据集上请求序列一致
+        parrot_ids = [row[0] for row in db.query(Parrot.id).order_by(Parrot.id).limit(10000)]
+        sold_ids = [
+            row[0]
+            for row in db.query(Parrot.id).filter(Parrot.status == "sold").order_by(Parrot.id).limit(10000)
+        ]
+        breeder_ids = [
+            row[0]
+            for row in db.query(Parrot.id)
+            .filter(Parrot.status == "breeding", Parrot.gender.in_(["公", "母"]))
+            .order_by(Parrot.id)
+            .limit(10000)
+        ]
+        share_links = db.query(func.count(ShareLink.id)).scalar() or 0
+    finally:
+        db.close()
+    return BenchContext(
+        seed=seed,
+        parrot_ids=parrot_ids,
+        sold_parrot_ids=sold_ids,
+        share_links=share_links,
+        breeder_ids=breeder_ids,
+    )
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """逐场景对比，返回回归的描述"""
+    regressions = []
+    print(f"\n{'场景':<28}{'p50 基线':>12}{'p50 当前':>12}{'变化':>10}{'p95 变化':>10}{'SQL 基线':>10}{'SQL 当前':>10}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28}{'-':>12}{current['p50_ms']:>12.2f}")
+            continue
+
+        def change(key: str) -> float:
+            return (current[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+
+        p50_change = change("p50_ms")
+        p95_change = change("p95_ms")
+        print(
+            f"{name:<28}{base['p50_ms']:>12.2f}{current['p50_ms']:>12.2f}{p50_change:>+9.1f}%{p95_change:>+9.1f}%"
+            f"{base['queries_per_request']:>10.1f}{current['queries_per_request']:>10.1f}"
+        )
+        if p50_change > threshold or p95_change > threshold:
+            regressions.append(f"{name}: p50 {p50_change:+.1f}%, p95 {p95_change:+.1f}%")
+        if current["queries_per_request"] > base["queries_per_request"]:
+            regressions.append(
+                f"{name}: 每请求SQL {base['queries_per_request']} -> {current['queries_per_request']}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="运行接口性能基准测试")
+    datagen.add_arguments(parser)
+    parser.add_argument("--generate", action="store_true", help="运行前生成数据（数据库需为空或配合 --reset）")
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的计时请求数")
+    parser.add_argument("--warmup", type=int, default=10, help="每个场景的预热请求数")
+    parser.add_argument("--scenario", action="append", dest="scenarios", help="只运行指定场景，可重复")
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    parser.add_argument("--compare", help="与基线 JSON 对比")
+    parser.add_argument("--threshold", type=float, default=10.0, help="判定为回归的延迟增幅(%%)")
+    parser.add_argument("--list", action="store_true", help="列出所有场景")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<28}{scenario.description}")
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # TestClient 每个请求都会输出一行 httpx 日志
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # 必须在导入 app 之前设置，避免请求日志影响计时
+    url = datagen.configure_database_url(args.database_url)
+    os.environ.setdefault("REQUEST_LOG_ENABLED", "false")
+
+    if args.generate:
+        from app.core.database import engine
+
+        datagen.prepare_database(engine, reset=args.reset)
+        summary = datagen.generate(engine, parrots=args.parrots, seed=args.seed, share_links=args.share_links)
+        # 与 datagen 命令相同：补建回访待办、鹦鹉事件、照片统计、同步变更日志，否则相关场景测的是空数据
+        datagen.backfill_derived(summary)
+        logger.info("数据生成完成: %s", asdict(summary))
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+
+    scenarios = SCENARIOS
+    if args.scenarios:
+        unknown = [name for name in args.scenarios if name not in SCENARIOS_BY_NAME]
+        if unknown:
+            parser.error(f"未知场景: {', '.join(unknown)}")
+        scenarios = [SCENARIOS_BY_NAME[name] for name in args.scenarios]
+
+    ctx = load_context(args.seed)
+    if not ctx.parrot_ids:
+        logger.error("数据库中没有数据，请先使用 --generate 生成")
+        return 1
+
+    results: Dict[str, dict] = {}
+    rss_start = current_rss_mb()
+    with TestClient(app_main.app, raise_server_exceptions=False) as client:
+        for scenario in scenarios:
+            rng = random.Random(f"{args.seed}:{scenario.name}")
+            result = run_scenario(client, scenario, ctx, rng, args.requests, args.warmup)
+            results[scenario.name] = asdict(result)
+            logger.info(
+                "%-28s p50 %8.2fms  p95 %8.2fms  p99 %8.2fms  SQL %5.1f  RSS %6.1fMB%s",
+                result.name, result.p50_ms, result.p95_ms, result.p99_ms,
+                result.queries_per_request, result.rss_mb,
+                f"  错误 {result.errors}" if result.errors else "",
+            )
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database": url.split("@")[-1],
+            "seed": args.seed,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rss_start_mb": round(rss_start, 1),
+            "rss_end_mb": round(current_rss_mb(), 1),
+        },
+        "scenarios": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info("结果已写入 %s", args.output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("scenarios", {}), args.threshold)
+        if regressions:
+            print("\n性能回归:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n未发现性能回归")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
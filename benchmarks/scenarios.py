@@ -0,0 +1,239 @@
+"""基准测试场景
+
+每个场景描述一类接口请求，路径由随机数发生器和数据集上下文生成，
+相同的种子在不同代码版本上回放完全相同的请求序列。
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.datagen import BREEDS, share_token
+
+
+@dataclass
+class BenchContext:
+    """场景生成请求时可用的数据集信息"""
+    seed: int
+    parrot_ids: List[int]
+    sold_parrot_ids: List[int]
+    share_links: int
+    breeder_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    path: Callable[[random.Random, BenchContext], str]
+    method: str = "GET"
+    description: str = ""
+    tags: List[str] = field(default_factory=list)
+    # POST 场景的 JSON 请求体
+    body: Optional[Callable[[random.Random, BenchContext], Any]] = None
+
+
+def _pick(rng: random.Random, ids: List[int]) -> int:
+    return rng.choice(ids) if ids else 1
+
+
+def _detail_page_batch(rng: random.Random, ctx: BenchContext) -> dict:
+    parrot_id = _pick(rng, ctx.parrot_ids)
+    return {"requests": [
+        {"id": "detail", "path": f"/api/parrots/{parrot_id}"},
+        {"id": "photos", "path": f"/api/parrots/{parrot_id}/photos"},
+        {"id": "mate", "path": f"/api/parrots/{parrot_id}/mate"},
+        {"id": "sale", "path": f"/api/parrots/{parrot_id}/sale-info"},
+        {"id": "timeline", "path": f"/api/parrots/{parrot_id}/sales-timeline"},
+        {"id": "share", "path": f"/api/share/list/{parrot_id}"},
+    ]}
+
+
+def _calendar_range(rng: random.Random) -> str:
+    month = rng.randrange(1, 11)
+    return f"/api/incubation/calendar?from=2025-{month:02d}-01&to=2025-{month + 2:02d}-28"
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        "parrots_list",
+        lambda rng, ctx: f"/api/parrots?page={rng.randrange(1, 50)}&size=20",
+        description="鹦鹉列表分页",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_facets",
+        lambda rng, ctx: f"/api/parrots/facets?breed={rng.choice(BREEDS)}&min_price={rng.choice([0, 1000, 5000])}",
+        description="筛选抽屉的品种/性别/状态/价格区间/年龄区间计数",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_age_range",
+        lambda rng, ctx: "/api/parrots?status=available&min_age_days={0}&max_age_days={1}".format(
+            *rng.choice([(300, 400), (365, 730), (730, 1460)])
+        ),
+        description="按状态和年龄区间筛选（(status, birth_date) 索引范围查询）",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_picker",
+        lambda rng, ctx: f"/api/parrots?page={rng.randrange(1, 50)}&size=100&fields=id,ring_number,breed,gender,birth_date",
+        description="选择器只取少数字段（fields=）",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "breeds_suggest",
+        lambda rng, ctx: f"/api/breeds?q={rng.choice(BREEDS)[:rng.randrange(1, 3)]}",
+        description="品种自动补全（进程内品种字典）",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_deep_page",
+        lambda rng, ctx: f"/api/parrots?page={rng.randrange(1000, 2000)}&size=50",
+        description="鹦鹉列表深分页",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_filtered",
+        lambda rng, ctx: (
+            f"/api/parrots?breed={rng.choice(BREEDS)}&status=available"
+            f"&min_price={rng.randrange(200, 5000, 100)}&size=20"
+        ),
+        description="按品种/状态/价格筛选",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_age_filter",
+        lambda rng, ctx: f"/api/parrots?min_age_days={rng.randrange(30, 365)}&max_age_days={rng.randrange(400, 2000)}&size=20",
+        description="按年龄筛选",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_keyword",
+        lambda rng, ctx: f"/api/parrots?keyword=BN{rng.randrange(0, 100):02d}&size=20",
+        description="圈号关键词搜索",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrots_with_mate",
+        lambda rng, ctx: f"/api/parrots?status=breeding&include_mate=true&size=50",
+        description="种鸟列表并带出配偶",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrot_detail",
+        lambda rng, ctx: f"/api/parrots/{_pick(rng, ctx.parrot_ids)}",
+        description="鹦鹉详情",
+        tags=["parrots"],
+    ),
+    Scenario(
+        "parrot_photos",
+        lambda rng, ctx: f"/api/parrots/{_pick(rng, ctx.parrot_ids)}/photos",
+        description="鹦鹉媒体列表",
+        tags=["parrots", "photos"],
+    ),
+    Scenario(
+        "detail_page_batch",
+        lambda rng, ctx: "/api/batch",
+        method="POST",
+        body=_detail_page_batch,
+        description="详情页 6 个请求合并为一次批量请求",
+        tags=["detail"],
+    ),
+    Scenario(
+        "sales_timeline",
+        lambda rng, ctx: f"/api/parrots/{_pick(rng, ctx.sold_parrot_ids)}/sales-timeline",
+        description="销售流程时间线",
+        tags=["sales"],
+    ),
+    Scenario(
+        "sales_history",
+        lambda rng, ctx: f"/api/sales-history?page={rng.randrange(1, 50)}&size=20",
+        description="销售历史分页",
+        tags=["sales"],
+    ),
+    Scenario(
+        "sales_history_returns",
+        lambda rng, ctx: f"/api/sales-history?has_return=true&page={rng.randrange(1, 20)}&size=20",
+        description="已退货的销售历史",
+        tags=["sales"],
+    ),
+    Scenario(
+        "sales_records",
+        lambda rng, ctx: f"/api/sales-records?page={rng.randrange(1, 50)}&size=20",
+        description="在售销售记录",
+        tags=["sales"],
+    ),
+    Scenario(
+        "sales_records_slim",
+        lambda rng, ctx: f"/api/sales-records?page={rng.randrange(1, 50)}&size=20&fields=id,buyer_name,sale_price,sale_date,parrot",
+        description="销售记录只取列表展示字段（fields=）",
+        tags=["sales"],
+    ),
+    Scenario(
+        "statistics_overview",
+        lambda rng, ctx: "/api/statistics",
+        description="统计概览",
+        tags=["statistics"],
+    ),
+    Scenario(
+        "statistics_monthly_sales",
+        lambda rng, ctx: "/api/statistics/monthly-sales",
+        description="月度销售",
+        tags=["statistics"],
+    ),
+    Scenario(
+        "statistics_sales",
+        lambda rng, ctx: "/api/statistics/sales",
+        description="销售统计",
+        tags=["statistics"],
+    ),
+    Scenario(
+        "statistics_returns",
+        lambda rng, ctx: "/api/statistics/returns",
+        description="退货统计",
+        tags=["statistics"],
+    ),
+    Scenario(
+        "incubation_list",
+        lambda rng, ctx: f"/api/incubation?page={rng.randrange(1, 20)}&size=20",
+        description="孵化记录列表",
+        tags=["incubation"],
+    ),
+    Scenario(
+        "incubation_calendar",
+        lambda rng, ctx: _calendar_range(rng),
+        description="孵化日历区间查询",
+        tags=["incubation"],
+    ),
+    Scenario(
+        "follow_ups_due",
+        lambda rng, ctx: "/api/follow-ups/due?until=2099-12-31&limit=50",
+        description="待回访列表首页（键集分页，需先执行 follow_up_tasks backfill）",
+        tags=["sales"],
+    ),
+    Scenario(
+        "lineage_tree",
+        lambda rng, ctx: f"/api/lineage/{_pick(rng, ctx.breeder_ids)}/tree?generations=4",
+        description="种鸟四代系谱树",
+        tags=["lineage"],
+    ),
+    Scenario(
+        "mate_recommendations",
+        lambda rng, ctx: f"/api/parrots/{_pick(rng, ctx.breeder_ids)}/mate-recommendations?limit=10",
+        description="种鸟配对推荐（亲缘系数 + top-K）",
+        tags=["lineage"],
+    ),
+    Scenario(
+        "sync_page",
+        lambda rng, ctx: f"/api/sync?since={rng.randrange(max(len(ctx.parrot_ids) - 500, 1))}&limit=500",
+        description="增量同步一页（500 条变更）",
+        tags=["sync"],
+    ),
+    Scenario(
+        "share_lookup",
+        lambda rng, ctx: f"/api/share/{share_token(ctx.seed, rng.randrange(max(ctx.share_links, 1)))}",
+        description="公开分享页数据",
+        tags=["share"],
+    ),
+]
+
+SCENARIOS_BY_NAME: Dict[str, Scenario] = {scenario.name: scenario for scenario in SCENARIOS}
@@ -0,0 +1,162 @@
+"""响应序列化微基准
+
+对比同一页数据的三种序列化路径，输出每行耗时（微秒）：
+
+- dict_jsonable:  手写 dict + FastAPI jsonable_encoder + 标准库 json（原 get_parrots/get_sales_history 路径）
+- pydantic_model: Pydantic 模型构造 + response_model 校验与序列化（原 get_sales_records 路径）
+- dataclass_fast: app.schemas.rows 的 dataclass + FastJSONResponse（orjson）
+
+    python -m benchmarks.serialization --rows 100 --repeat 2000
+"""
+import argparse
+import json
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+
+def _sample_rows(count: int) -> List[dict]:
+    base = datetime(2025, 6, 1, 12, 30, 15, 123456)
+    return [
+        {
+            "id": i,
+            "parrot_id": i,
+            "seller": "张三",
+            "buyer_name": "王伟",
+            "sale_price": Decimal("1288.00") + i,
+            "contact": "13800000000",
+            "follow_up_status": "pending",
+            "sale_notes": None,
+            "sale_date": base - timedelta(days=i),
+            "photo_url": f"/uploads/parrots/{i:08d}.jpg",
+            "created_at": base - timedelta(days=i + 30),
+            "updated_at": base,
+            "breed": "玄凤鹦鹉",
+            "ring_number": f"BN{i:07d}",
+            "gender": "公",
+            "birth_date": date(2024, 1, 1) + timedelta(days=i),
+        }
+        for i in range(count)
+    ]
+
+
+def dict_jsonable(rows: List[dict]) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    items = [
+        {
+            "id": r["id"],
+            "parrot_id": r["parrot_id"],
+            "seller": r["seller"],
+            "buyer_name": r["buyer_name"],
+            "sale_price": float(r["sale_price"]) if r["sale_price"] else None,
+            "contact": r["contact"],
+            "follow_up_status": r["follow_up_status"],
+            "sale_notes": r["sale_notes"],
+            "sale_date": r["sale_date"].isoformat(),
+            "payment_method": None,
+            "photo_url": r["photo_url"],
+            "created_at": r["created_at"].isoformat(),
+            "updated_at": r["updated_at"].isoformat(),
+            "parrot": {"breed": r["breed"], "ring_number": r["ring_number"], "gender": r["gender"]},
+        }
+        for r in rows
+    ]
+    content = jsonable_encoder({"total": len(items), "items": items, "page": 1, "size": len(items)})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def pydantic_model(rows: List[dict]) -> bytes:
+    from pydantic import TypeAdapter
+
+    from app.schemas import SaleRecordList, SaleRecordResponse
+
+    items = [
+        SaleRecordResponse(
+            id=r["id"],
+            parrot_id=r["parrot_id"],
+            seller=r["seller"],
+            buyer_name=r["buyer_name"],
+            sale_price=float(r["sale_price"]) if r["sale_price"] else None,
+            contact=r["contact"],
+            follow_up_status=r["follow_up_status"],
+            sale_notes=r["sale_notes"],
+            sale_date=r["sale_date"].isoformat(),
+            payment_method=None,
+            photo_url=r["photo_url"],
+            created_at=r["created_at"].isoformat(),
+            updated_at=r["updated_at"].isoformat(),
+            parrot={"breed": r["breed"], "ring_number": r["ring_number"], "gender": r["gender"]},
+        )
+        for r in rows
+    ]
+    result = SaleRecordList(total=len(items), items=items, page=1, size=len(items))
+    # FastAPI 对 response_model 的处理：先转 dict 再按模型校验并序列化
+    adapter = _adapter(SaleRecordList, TypeAdapter)
+    content = adapter.dump_python(adapter.validate_python(result.model_dump()), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+_adapters = {}
+
+
+def _adapter(model, type_adapter):
+    if model not in _adapters:
+        _adapters[model] = type_adapter(model)
+    return _adapters[model]
+
+
+def dataclass_fast(rows: List[dict]) -> bytes:
+    from app.core.responses import FastJSONResponse
+    from app.schemas.rows import Page, SaleParrotInfo, SaleRecordRow
+
+    items = [
+        SaleRecordRow(
+            id=r["id"],
+            parrot_id=r["parrot_id"],
+            seller=r["seller"],
+            buyer_name=r["buyer_name"],
+            sale_price=r["sale_price"] or None,
+            contact=r["contact"],
+            follow_up_status=r["follow_up_status"],
+            sale_notes=r["sale_notes"],
+            sale_date=r["sale_date"],
+            payment_method=None,
+            photo_url=r["photo_url"],
+            created_at=r["created_at"],
+            updated_at=r["updated_at"],
+            parrot=SaleParrotInfo(breed=r["breed"], ring_number=r["ring_number"], gender=r["gender"]),
+        )
+        for r in rows
+    ]
+    return FastJSONResponse(Page(total=len(items), items=items, page=1, size=len(items))).body
+
+
+PATHS = {
+    "dict_jsonable": dict_jsonable,
+    "pydantic_model": pydantic_model,
+    "dataclass_fast": dataclass_fast,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="响应序列化微基准")
+    parser.add_argument("--rows", type=int, default=100, help="每页行数")
+    parser.add_argument("--repeat", type=int, default=1000, help="重复次数")
+    args = parser.parse_args(argv)
+
+    rows = _sample_rows(args.rows)
+    baseline = None
+    for name, func in PATHS.items():
+        func(rows)  # 预热
+        best = min(timeit.repeat(lambda: func(rows), number=args.repeat, repeat=3))
+        per_row_us = best / args.repeat / args.rows * 1e6
+        baseline = baseline or per_row_us
+        print(f"{name:<18}{per_row_us:>8.2f} µs/行  ({baseline / per_row_us:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""冷启动基准测试
+
+在全新的子进程中用 `python -X importtime` 导入 main，统计：
+
+- import_ms:  导入 main 的总耗时（importtime 的累计时间）
+- startup_ms: 从进程启动到执行完 lifespan 并响应第一个 /health 请求的耗时
+- 累计耗时最多的模块，便于找出拖慢启动的导入
+
+    python -m benchmarks.startup --runs 5 --output benchmarks/startup.json
+    python -m benchmarks.startup --compare benchmarks/startup.json
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# 子进程中执行：导入应用、跑完 lifespan 并请求一次 /health
+_STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    assert client.get("/health").status_code == 200
+    ready = time.perf_counter()
+print("STARTUP", (imported - start) * 1000, (ready - start) * 1000)
+"""
+
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """解析 -X importtime 输出，返回 顶层模块 -> 累计微秒"""
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def run_once(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url, REQUEST_LOG_ENABLED="false")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("STARTUP"))
+    _, import_ms, startup_ms = line.split()
+    modules = _parse_importtime(completed.stderr)
+    return {
+        "import_ms": float(import_ms),
+        "startup_ms": float(startup_ms),
+        "main_import_ms": modules.get("main", 0) / 1000,
+        "modules": modules,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="应用冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="重复次数，取中位数")
+    parser.add_argument("--database-url", help="默认使用临时 SQLite 文件")
+    parser.add_argument("--top", type=int, default=15, help="列出累计耗时最多的模块数")
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    parser.add_argument("--compare", help="与基线 JSON 对比")
+    parser.add_argument("--threshold", type=float, default=15.0, help="判定为回归的启动耗时增幅(%%)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        runs = [run_once(database_url) for _ in range(args.runs)]
+
+    result = {
+        "runs": args.runs,
+        "import_ms": round(statistics.median(r["import_ms"] for r in runs), 1),
+        "startup_ms": round(statistics.median(r["startup_ms"] for r in runs), 1),
+        "main_import_ms": round(statistics.median(r["main_import_ms"] for r in runs), 1),
+    }
+
+    # 只统计第三方和应用的顶层包，按中位数排序
+    packages: Dict[str, List[int]] = {}
+    for run in runs:
+        for module, micros in run["modules"].items():
+            if "." not in module:
+                packages.setdefault(module, []).append(micros)
+    top = sorted(
+        ((name, statistics.median(values) / 1000) for name, values in packages.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:args.top]
+    result["top_modules_ms"] = {name: round(ms, 1) for name, ms in top}
+
+    print(f"导入 main: {result['import_ms']:.1f}ms  首个请求就绪: {result['startup_ms']:.1f}ms  (中位数, {args.runs} 次)")
+    for name, ms in top:
+        print(f"  {name:<32}{ms:>9.1f}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        logger.info("结果已写入 %s", args.output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressed = False
+        for key in ("import_ms", "startup_ms"):
+            base, current = baseline.get(key), result[key]
+            if not base:
+                continue
+            change = (current - base) / base * 100
+            print(f"{key}: {base:.1f}ms -> {current:.1f}ms ({change:+.1f}%)")
+            regressed = regressed or change > args.threshold
+        if regressed:
+            print("启动耗时回归")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,81 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
-from app.api import parrots, photos, statistics, incubation, sales, share
-from app.core.database import engine, Base
+from sqlalchemy.orm.exc import StaleDataError
+from app.api import parrots, photos, statistics, incubation, sales, share, lineage, follow_ups, sync, events, batch, breeds
+from app.core.config import settings
+from app.core.database import engine
+from app.core.events import event_bus
 from app.core.exceptions import exception_handler
 from app.core.exceptions import ParrotManagementException
+from app.core.idempotency import IdempotencyMiddleware, purge_expired as purge_expired_idempotency_keys
+from app.core.responses import FastJSONResponse
+from app.core.schema import prepare_schema
+from app.core.tasks import PeriodicTask
+from app.core.query_stats import QueryStatsMiddleware, install_query_hooks
+from app.core.compression import CompressionMiddleware
+from app.core import metrics as app_metrics
+from app.services.breeds import load_dictionary as load_breed_dictionary
+from app.services.video_transcoder import shutdown_transcoder
 import os
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+# SQL计时与慢查询日志
+install_query_hooks(engine)
+if settings.METRICS_ENABLED:
+    app_metrics.install_pool_metrics(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：检查数据库结构，启动和停止后台定时任务"""
+    prepare_schema(engine)
+
+    # 品种字典（别名归并、自动补全）在启动时加载
+    load_breed_dictionary()
+
+    periodic_tasks = []
+
+    if settings.MEDIA_GC_INTERVAL_SECONDS > 0:
+        from app.services.media_gc import run_scheduled_gc
+        periodic_tasks.append(PeriodicTask("media-gc", settings.MEDIA_GC_INTERVAL_SECONDS, run_scheduled_gc))
+
+    if settings.INCUBATION_SCHEDULER_INTERVAL_SECONDS > 0:
+        from app.services.incubation_scheduler import run_scheduled_tick
+        # 启动后立即执行一次：建立日历索引并标记逾期记录
+        periodic_tasks.append(PeriodicTask(
+            "incubation-scheduler",
+            settings.INCUBATION_SCHEDULER_INTERVAL_SECONDS,
+            run_scheduled_tick,
+            initial_delay=0,
+        ))
+
+    if settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS > 0:
+        periodic_tasks.append(PeriodicTask(
+            "idempotency-cleanup", settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS, purge_expired_idempotency_keys,
+        ))
+
+    for task in periodic_tasks:
+        task.start()
+
+    # 实时推送：事件总线与统计广播
+    event_bus.start()
+    events.statistics_broadcaster.start()
+
+    yield
+
+    for task in periodic_tasks:
+        await task.stop()
+
+    await events.statistics_broadcaster.stop()
+    event_bus.stop()
+
+    shutdown_transcoder()
+
+    app_metrics.mark_process_dead()
+
 
 app = FastAPI(
     title="鹦鹉管理系统API",
@@ -23,6 +90,7 @@ app = FastAPI(
     - **退货管理**：处理退货、查询退货历史
     - **回访管理**：创建和查询回访记录
     - **统计分析**：销售统计、退货统计、月度趋势
+    - **实时推送**：SSE 推送统计变化和数据变更通知
     
     ### 数据库设计
     - **Parrot表**：存储鹦鹉基本信息和当前销售状态
@@ -41,12 +109,21 @@ app = FastAPI(
     license_info={
         "name": "MIT",
     },
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # 注册全局异常处理器
+# 应用异常和版本冲突按类注册，由中间件栈内层的 ExceptionMiddleware 转换为 4xx 响应，
+# 外层中间件（指标、请求日志、幂等）记录到的是实际状态码；Exception 只处理未预期的错误（500）
+app.add_exception_handler(ParrotManagementException, exception_handler)
+app.add_exception_handler(StaleDataError, exception_handler)
 app.add_exception_handler(Exception, exception_handler)
 
 
+# 写请求幂等（Idempotency-Key），需在 CORS 内层
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS配置
 # 从环境变量获取允许的域名，生产环境需要设置 ALLOWED_ORIGINS
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
@@ -57,8 +134,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# 请求延迟与处理中请求数指标（需在 QueryStatsMiddleware 内层）
+if settings.METRICS_ENABLED:
+    app.add_middleware(app_metrics.MetricsMiddleware)
+
+# 请求级SQL统计（Server-Timing 响应头 + 结构化日志）
+app.add_middleware(QueryStatsMiddleware)
+
+# 响应压缩（gzip，安装 brotli 后优先 br）
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # 挂载静态文件目录
 uploads_dir = "uploads"
 if not os.path.exists(uploads_dir):
@@ -72,6 +161,12 @@ app.include_router(statistics.router, tags=["统计数据"])
 app.include_router(incubation.router, tags=["孵化管理"])
 app.include_router(sales.router, tags=["销售管理"])
 app.include_router(share.router, tags=["分享管理"])
+app.include_router(lineage.router, tags=["血统管理"])
+app.include_router(follow_ups.router, tags=["回访管理"])
+app.include_router(sync.router, tags=["增量同步"])
+app.include_router(events.router, tags=["实时推送"])
+app.include_router(batch.router, tags=["批量请求"])
+app.include_router(breeds.router, tags=["品种"])
 
 @app.get("/")
 def read_root():
@@ -84,3 +179,8 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(app_metrics.render_metrics(), media_type=app_metrics.PROMETHEUS_CONTENT_TYPE)
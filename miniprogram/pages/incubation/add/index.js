@@ -47,9 +47,11 @@ Page({
   async loadParents() {
     if (!this) return
     try {
+      // 选择器只需要少数字段
+      const fields = 'id,breed,ring_number,gender,birth_date'
       const [paired, incubating] = await Promise.all([
-        api.getParrots({ status: 'paired' }),
-        api.getParrots({ status: 'incubating' })
+        api.getParrots({ status: 'paired', fields }),
+        api.getParrots({ status: 'incubating', fields })
       ])
       const pairedData = Array.isArray(paired) ? paired : (paired.items || [])
       const incubatingData = Array.isArray(incubating) ? incubating : (incubating.items || [])
@@ -35,16 +35,21 @@ Page({
     if (!this) return
     this.setData({ loading: true })
     try {
-      const parrot = await api.getParrot(this.data.id)
+      // 详情、照片、时间线、分享链接合并为一次请求
+      const id = this.data.id
+      const results = await api.batch([
+        { path: `/api/parrots/${id}` },
+        { path: `/api/parrots/${id}/photos` },
+        { path: `/api/parrots/${id}/sales-timeline` },
+        { path: `/api/share/list/${id}` }
+      ])
+      const [parrot, photosRes, timelineRes, shareLinksRes] = results.map(
+        (res, index) => (res.status < 300 ? res.body : (index === 0 ? null : []))
+      )
       if (!parrot) {
         wx.showToast({ title: '鹦鹉不存在', icon: 'none' })
         return
       }
-      const [photosRes, timelineRes, shareLinksRes] = await Promise.all([
-        api.getPhotos(this.data.id).catch(() => []),
-        api.getSalesTimeline(this.data.id).catch(() => []),
-        api.getShareLinks(this.data.id).catch(() => [])
-      ])
       const photos = Array.isArray(photosRes) ? photosRes : (photosRes?.items || [])
       // 构建完整的图片URL并判断文件类型
       const app = getApp()
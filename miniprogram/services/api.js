@@ -3,6 +3,8 @@ const { request, uploadFile } = require('../utils/request')
 module.exports = {
   getParrots: (params) => request({ url: '/parrots', data: params }),
   getParrot: (id) => request({ url: `/parrots/${id}` }),
+  getParrotFacets: (params) => request({ url: '/parrots/facets', data: params, loading: false }),
+  suggestBreeds: (q, limit = 10) => request({ url: '/breeds', data: { q, limit }, loading: false }),
   createParrot: (data) => request({ url: '/parrots', method: 'POST', data }),
   updateParrot: (id, data) => request({ url: `/parrots/${id}`, method: 'PUT', data }),
   deleteParrot: (id) => request({ url: `/parrots/${id}`, method: 'DELETE' }),
@@ -11,15 +13,15 @@ module.exports = {
 
   getSalesRecords: (params) => request({ url: '/sales-records', data: params }),
   getSalesHistory: (params) => request({ url: '/sales-history', data: params }),
-  updateSaleInfo: (id, data) => request({ url: `/parrots/${id}/sale-info`, method: 'PUT', data }),
+  updateSaleInfo: (id, data) => request({ url: `/parrots/${id}/sale-info`, method: 'PUT', data, idempotent: true }),
   getSaleInfo: (id) => request({ url: `/parrots/${id}/sale-info` }),
   getSalesTimeline: (id) => request({ url: `/parrots/${id}/sales-timeline` }),
-  returnParrot: (id, data) => request({ url: `/parrots/${id}/return`, method: 'PUT', data }),
+  returnParrot: (id, data) => request({ url: `/parrots/${id}/return`, method: 'PUT', data, idempotent: true }),
 
   createFollowUp: (id, data) => request({ url: `/parrots/${id}/follow-ups`, method: 'POST', data }),
   getFollowUps: (id) => request({ url: `/parrots/${id}/follow-ups` }),
 
-  pairParrots: (data) => request({ url: '/parrots/pair', method: 'POST', data }),
+  pairParrots: (data) => request({ url: '/parrots/pair', method: 'POST', data, idempotent: true }),
   unpairParrot: (id) => request({ url: `/parrots/unpair/${id}`, method: 'POST' }),
   getEligibleFemales: (maleId) => request({ url: `/parrots/eligible-females/${maleId}` }),
   getEligibleMales: (femaleId) => request({ url: `/parrots/eligible-males/${femaleId}` }),
@@ -43,5 +45,8 @@ module.exports = {
   createShareLink: (id, data) => request({ url: `/share/generate/${id}`, method: 'POST', data }),
   getShareInfo: (token) => request({ url: `/share/${token}` }),
   getShareLinks: (id) => request({ url: `/share/list/${id}` }),
-  deleteShareLink: (token) => request({ url: `/share/${token}`, method: 'DELETE' })
+  deleteShareLink: (token) => request({ url: `/share/${token}`, method: 'DELETE' }),
+
+  // 批量请求：requests 为 [{ path: '/api/...', method, body }]，按顺序返回 [{ status, body }]
+  batch: (requests) => request({ url: '/batch', method: 'POST', data: { requests } }).then(res => res.responses)
 }
@@ -15,22 +15,46 @@ function hideLoading() {
   }
 }
 
+// 写操作网络失败时的重试次数；重试沿用同一个 Idempotency-Key，服务端不会重复执行
+const IDEMPOTENT_RETRIES = 2
+const RETRY_DELAY_MS = 1000
+
+function idempotencyKey() {
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`
+}
+
+// options.idempotent 为 true 时带上幂等键，网络失败或服务端仍在处理（409）时自动重试
+function withRetry(options, key, send) {
+  let attempt = 0
+  const run = (resolve, reject) => send(key, (retryable, settle) => {
+    if (options.idempotent && retryable && attempt < IDEMPOTENT_RETRIES) {
+      attempt++
+      setTimeout(() => run(resolve, reject), RETRY_DELAY_MS)
+    } else {
+      settle(resolve, reject)
+    }
+  })
+  return new Promise(run)
+}
+
 function request(options) {
   const app = getApp()
-  return new Promise((resolve, reject) => {
-    // 默认显示 loading，除非明确 set loading: false
-    const showLoad = options.loading !== false
-    if (showLoad) showLoading()
+  const key = options.idempotent ? idempotencyKey() : null
+  // 默认显示 loading，除非明确 set loading: false
+  const showLoad = options.loading !== false
+  if (showLoad) showLoading()
 
+  return withRetry(options, key, (key, done) => {
     wx.request({
       url: app.globalData.baseUrl + options.url,
       method: options.method || 'GET',
       data: options.data,
       header: {
         'Content-Type': 'application/json',
+        ...(key ? { 'Idempotency-Key': key } : {}),
         ...options.header
       },
-      success: (res) => {
+      success: (res) => done(res.statusCode === 409, (resolve, reject) => {
         if (showLoad) hideLoading()
 
         if (res.statusCode >= 200 && res.statusCode < 300) {
@@ -40,8 +64,8 @@ function request(options) {
           handleError(res)
           reject(res.data)
         }
-      },
-      fail: (err) => {
+      }),
+      fail: (err) => done(true, (resolve, reject) => {
         if (showLoad) hideLoading()
 
         // 区分是网络断开还是连接被拒绝
@@ -52,7 +76,7 @@ function request(options) {
           wx.showToast({ title: '网络请求失败', icon: 'none' })
         }
         reject(err)
-      }
+      })
     })
   })
 }
@@ -71,13 +95,14 @@ function handleError(res) {
 
 function uploadFile(url, filePath, name = 'file') {
   const app = getApp()
-  return new Promise((resolve, reject) => {
-    wx.showLoading({ title: '上传中', mask: true })
+  wx.showLoading({ title: '上传中', mask: true })
+  return withRetry({ idempotent: true }, idempotencyKey(), (key, done) => {
     wx.uploadFile({
       url: app.globalData.baseUrl + url,
       filePath,
       name,
-      success: (res) => {
+      header: { 'Idempotency-Key': key },
+      success: (res) => done(res.statusCode === 409, (resolve, reject) => {
         wx.hideLoading()
         if (res.statusCode >= 200 && res.statusCode < 300) {
           resolve(JSON.parse(res.data))
@@ -85,12 +110,12 @@ function uploadFile(url, filePath, name = 'file') {
           wx.showToast({ title: '上传失败', icon: 'none' })
           reject(res)
         }
-      },
-      fail: (err) => {
+      }),
+      fail: (err) => done(true, (resolve, reject) => {
         wx.hideLoading()
         wx.showToast({ title: '上传失败', icon: 'none' })
         reject(err)
-      }
+      })
     })
   })
 }